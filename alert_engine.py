@@ -0,0 +1,540 @@
+"""
+運用アラートエンジン（DB差分の追尾 → ルール評価 → まとめて通知）
+
+SYSTEM_SPEC §10 の通知イベント（実行失敗 / シグナル発生 / 売買実行 / 非売買 /
+日次サマリ）を、ダッシュボードを開かなくても届くように同期DBの差分から作る。
+
+- system_runs / signals / trades の新しい行だけを rowid ウォーターマークで読む
+  （決済と実行終了は後から行が更新されるため、終了時刻 + rowid のキーセットで追う）
+- ルールは data/alert_rules.json で有効/無効としきい値を上書きできる
+- 通知はバッチ単位でシンクに渡す（Discord Webhook / ログ / 任意の send() 実装）
+- 行は batch_size 件ずつ読んで通知してからウォーターマークを進めるので、
+  未処理の行数に関係なくメモリはバッチ1つ分。通知に失敗したバッチは次回やり直す
+
+ウォーターマークはサイドカーDB（alert_watermarks）に置く。初回と、DB差し替えで
+rowid が食い違った場合は過去分を通知せず現在の末尾から始める（--replay で全件）。
+
+CLI:
+    python alert_engine.py run --once                       # 1回だけ追いつく（ログ出力）
+    python alert_engine.py run --interval 60 --webhook-url https://discord.com/api/webhooks/...
+    python alert_engine.py stub --port 8765                 # Discord の代わりのローカルHTTPスタブ
+    python alert_engine.py run --once --replay --webhook-url http://127.0.0.1:8765/webhook
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Protocol
+
+import dashboard_data as _dm
+
+logger = logging.getLogger(__name__)
+
+ALERT_CONFIG_PATH = _dm.PROJECT_ROOT / "data" / "alert_rules.json"
+
+# 1回の読み出し・通知の行数（メモリ上限はこれで決まる）
+DEFAULT_BATCH_SIZE = 1_000
+# Discord のメッセージ長上限
+DISCORD_MAX_CHARS = 2_000
+# 1バッチ・1ルールあたり本文に並べる件数（超えた分は「他 N 件」にまとめる）
+MAX_LINES_PER_RULE = 15
+WEBHOOK_TIMEOUT = 10.0
+WEBHOOK_MAX_RETRIES = 3
+
+# source → (テーブル, タイムスタンプ列, 追尾方法)
+#   "append":    新しい rowid の行（挿入後に変わらない行）
+#   "completed": タイムスタンプ列が埋まった行を (時刻, rowid) 順に（後から更新される行）
+ALERT_SOURCES = {
+    "system_runs": ("system_runs", "ended_at", "completed"),
+    "signals": ("signals", "detected_at", "append"),
+    "trades": ("trades", "entry_timestamp", "append"),
+    "trade_exits": ("trades", "exit_timestamp", "completed"),
+}
+
+DEFAULT_ALERT_CONFIG = {
+    "run_failure": {"enabled": True, "statuses": ["failed", "interrupted"]},
+    "signal": {"enabled": True, "types": ["BUY", "SELL"], "min_confidence": 0.0},
+    "execution": {"enabled": True},
+    "close": {"enabled": True},
+    "non_trade": {"enabled": True, "run_modes": ["full"]},
+    "daily_summary": {"enabled": True, "run_mode": "daily_summary"},
+}
+
+
+@dataclass(frozen=True)
+class Alert:
+    """通知1件。rule は AlertRule.name、ts はイベント時刻（ISO文字列）。"""
+
+    rule: str
+    ts: str
+    text: str
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """ソース1つの行に対するルール。check は通知文（対象外なら None）を返す。"""
+
+    name: str
+    label: str
+    source: str
+    check: Callable[[sqlite3.Row, dict, sqlite3.Connection], str | None]
+
+
+class AlertSink(Protocol):
+    """通知先。send が例外を送出したバッチはウォーターマークを進めずに再送する。
+
+    再送は同じ alerts で send を呼び直すので、途中まで届けたバッチの重複を
+    避けたいシンクは送信済みの位置を自分で覚えておく（WebhookSink 参照）。
+    """
+
+    def send(self, alerts: list[Alert]) -> None: ...
+
+
+# ============================================================
+# ルール
+# ============================================================
+
+
+def _hm(ts: str | None) -> str:
+    return (ts or "")[:16].replace("T", " ")
+
+
+def _money(value) -> str:
+    return f"${value:,.2f}" if value is not None else "-"
+
+
+def _clip(text: str | None, width: int = 80) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= width else text[: width - 1] + "…"
+
+
+def _check_run_failure(row, params, conn):
+    if row["status"] not in params["statuses"]:
+        return None
+    error = _clip(row["error_message"]) or f"errors={row['errors_count'] or 0}"
+    return f"{row['run_mode']} {row['run_id']} {row['status']} ({_hm(row['started_at'])}) — {error}"
+
+
+def _check_signal(row, params, conn):
+    if row["signal_type"] not in params["types"]:
+        return None
+    confidence = row["confidence"] or 0.0
+    if confidence < params["min_confidence"]:
+        return None
+    text = (
+        f"{row['signal_type']} {row['ticker']} 確信度 {confidence:.2f} "
+        f"@ {_money(row['price'])}"
+    )
+    reason = _clip(row["reasoning"])
+    return f"{text} — {reason}" if reason else text
+
+
+def _check_execution(row, params, conn):
+    text = (
+        f"{row['action']} {row['ticker']} {row['shares'] or 0}株 "
+        f"@ {_money(row['entry_price'])} ({_hm(row['entry_timestamp'])})"
+    )
+    strategy = row["strategy_used"] or row["engine"]
+    return f"{text} — {strategy}" if strategy else text
+
+
+def _check_close(row, params, conn):
+    pnl, pct = row["profit_loss"], row["profit_loss_pct"]
+    result = f"P/L {pnl:+,.2f}" if pnl is not None else "P/L -"
+    if pct is not None:
+        result += f" ({pct:+.1f}%)"
+    text = (
+        f"決済 {row['ticker']} {row['shares'] or 0}株 @ {_money(row['exit_price'])} "
+        f"{result} ({_hm(row['exit_timestamp'])})"
+    )
+    reason = _clip(row["exit_reason"])
+    return f"{text} — {reason}" if reason else text
+
+
+def _check_non_trade(row, params, conn):
+    if row["status"] != "completed" or row["run_mode"] not in params["run_modes"]:
+        return None
+    if row["trades_executed"]:
+        return None
+    signals = row["signals_detected"] or 0
+    reason = (
+        "シグナル無し"
+        if signals == 0
+        else f"シグナル {signals} 件・約定 0 件（リスク制約などで見送り）"
+    )
+    return f"{row['run_mode']} {row['run_id']} ({_hm(row['started_at'])}) — {reason}"
+
+
+def _check_daily_summary(row, params, conn):
+    if row["run_mode"] != params["run_mode"]:
+        return None
+    day = (row["started_at"] or "")[:10]
+    counts = conn.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM signals WHERE date(detected_at) = :d),
+            (SELECT COUNT(*) FROM trades WHERE date(entry_timestamp) = :d),
+            (SELECT COUNT(*) FROM trades WHERE date(exit_timestamp) = :d),
+            (SELECT COUNT(*) FROM system_runs
+             WHERE date(started_at) = :d AND status != 'completed')
+        """,
+        {"d": day},
+    ).fetchone()
+    outcome = "成功" if row["status"] == "completed" else f"失敗（{row['status']}）"
+    return (
+        f"{day} {outcome}: シグナル {counts[0]} / 約定 {counts[1]} / "
+        f"決済 {counts[2]} / 異常run {counts[3]}"
+    )
+
+
+ALERT_RULES = [
+    AlertRule("run_failure", "実行失敗", "system_runs", _check_run_failure),
+    AlertRule("signal", "シグナル発生", "signals", _check_signal),
+    AlertRule("execution", "売買実行", "trades", _check_execution),
+    AlertRule("close", "決済", "trade_exits", _check_close),
+    AlertRule("non_trade", "非売買", "system_runs", _check_non_trade),
+    AlertRule("daily_summary", "日次サマリ", "system_runs", _check_daily_summary),
+]
+RULE_LABELS = {rule.name: rule.label for rule in ALERT_RULES}
+
+
+def load_alert_config(path: Path | None = None) -> dict:
+    """ルール設定（DEFAULT_ALERT_CONFIG にJSONの値をルール単位で上書き）。"""
+    config = {name: dict(params) for name, params in DEFAULT_ALERT_CONFIG.items()}
+    path = path or ALERT_CONFIG_PATH
+    if not path.exists():
+        return config
+    try:
+        overrides = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"alert config の読み込みに失敗、既定値を使用: {e}")
+        return config
+    for name, params in overrides.items():
+        if name not in config:
+            logger.warning(f"alert config: 未知のルール {name} を無視")
+            continue
+        config[name].update(params)
+    return config
+
+
+# ============================================================
+# 通知先
+# ============================================================
+
+
+def format_messages(
+    alerts: list[Alert],
+    max_chars: int = DISCORD_MAX_CHARS,
+    max_lines: int = MAX_LINES_PER_RULE,
+) -> list[str]:
+    """バッチをルールごとにまとめ、max_chars 以下のメッセージに分ける。"""
+    groups: dict[str, list[Alert]] = {}
+    for alert in alerts:
+        groups.setdefault(alert.rule, []).append(alert)
+
+    lines = []
+    for rule, items in groups.items():
+        lines.append(f"**{RULE_LABELS.get(rule, rule)}** ({len(items)}件)")
+        lines.extend(f"- {_clip(a.text, max_chars - 10)}" for a in items[:max_lines])
+        if len(items) > max_lines:
+            lines.append(f"- … 他 {len(items) - max_lines} 件")
+
+    messages, current = [], ""
+    for line in lines:
+        if current and len(current) + 1 + len(line) > max_chars:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
+
+
+class LogSink:
+    """ログ（標準エラー）に出すだけのシンク。Webhook 未設定時の既定。"""
+
+    def send(self, alerts: list[Alert]) -> None:
+        for message in format_messages(alerts):
+            logger.info(f"alert:\n{message}")
+
+
+class WebhookSink:
+    """Discord 互換の Webhook に {"content": ...} を POST するシンク。
+
+    429 は retry_after 秒待って再送し、それ以外の失敗は例外にして
+    エンジンにバッチの再送を任せる。バッチが複数メッセージに分かれて途中で
+    失敗した場合は送信済みの件数を覚えておき、同じバッチの再送では続きから送る。
+    """
+
+    def __init__(self, url: str, timeout: float = WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        # 途中で失敗したバッチ: (メッセージ列, 送信済みの件数)
+        self._partial: tuple[list[str], int] | None = None
+
+    def send(self, alerts: list[Alert]) -> None:
+        messages = format_messages(alerts)
+        sent = 0
+        if self._partial is not None and self._partial[0] == messages:
+            sent = self._partial[1]
+        self._partial = None
+        for i in range(sent, len(messages)):
+            try:
+                self._post({"content": messages[i]})
+            except Exception:
+                self._partial = (messages, i)
+                raise
+
+    def _post(self, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        for attempt in range(WEBHOOK_MAX_RETRIES + 1):
+            request = urllib.request.Request(
+                self.url,
+                data=body,
+                headers={"Content-Type": "application/json", "User-Agent": "ai-investor-alerts"},
+                method="POST",
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    return
+            except urllib.error.HTTPError as e:
+                if e.code != 429 or attempt == WEBHOOK_MAX_RETRIES:
+                    raise
+                try:
+                    wait = float(json.loads(e.read() or b"{}").get("retry_after", 1.0))
+                except (ValueError, AttributeError):
+                    wait = 1.0
+                time.sleep(min(wait, 30.0))
+
+
+# ============================================================
+# エンジン
+# ============================================================
+
+
+def _ensure_alert_schema(cache: sqlite3.Connection) -> None:
+    cache.execute(
+        """
+        CREATE TABLE IF NOT EXISTS alert_watermarks (
+            source TEXT PRIMARY KEY,
+            last_rowid INTEGER NOT NULL,
+            last_ts TEXT
+        )
+        """
+    )
+
+
+def _tail_mark(src: sqlite3.Connection, source: str) -> tuple[int, str | None]:
+    """ソースの現在の末尾（ここから先を通知する位置）。"""
+    table, ts_col, mode = ALERT_SOURCES[source]
+    if mode == "append":
+        sql = f"SELECT rowid, {ts_col} FROM {table} ORDER BY rowid DESC LIMIT 1"
+    else:
+        sql = (
+            f"SELECT rowid, {ts_col} FROM {table} WHERE {ts_col} IS NOT NULL "
+            f"ORDER BY {ts_col} DESC, rowid DESC LIMIT 1"
+        )
+    row = src.execute(sql).fetchone()
+    return (row[0], row[1]) if row else (0, None)
+
+
+def _fetch_batch(
+    src: sqlite3.Connection, source: str, mark: tuple[int, str | None], limit: int
+) -> list[sqlite3.Row]:
+    table, ts_col, mode = ALERT_SOURCES[source]
+    last_rowid, last_ts = mark
+    if mode == "append":
+        return src.execute(
+            f"SELECT rowid AS _rowid, * FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (last_rowid, limit),
+        ).fetchall()
+    return src.execute(
+        f"SELECT rowid AS _rowid, * FROM {table} "
+        f"WHERE {ts_col} IS NOT NULL AND ({ts_col} > :ts OR ({ts_col} = :ts AND rowid > :rid)) "
+        f"ORDER BY {ts_col}, rowid LIMIT :limit",
+        {"ts": last_ts or "", "rid": last_rowid, "limit": limit},
+    ).fetchall()
+
+
+class AlertEngine:
+    """同期DBの差分を追尾してルールを評価し、シンクに通知する。"""
+
+    def __init__(
+        self,
+        sink: AlertSink,
+        config: dict | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.sink = sink
+        self.config = config or load_alert_config()
+        self.batch_size = batch_size
+        self.rules: dict[str, list[tuple[AlertRule, dict]]] = {s: [] for s in ALERT_SOURCES}
+        for rule in ALERT_RULES:
+            params = self.config.get(rule.name, {})
+            if params.get("enabled", True):
+                self.rules[rule.source].append((rule, params))
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load_marks(self, src, cache, replay: bool) -> dict[str, tuple[int, str | None]]:
+        marks = {
+            r["source"]: (r["last_rowid"], r["last_ts"])
+            for r in cache.execute("SELECT source, last_rowid, last_ts FROM alert_watermarks")
+        }
+        sources = {s: (table, ts_col) for s, (table, ts_col, _) in ALERT_SOURCES.items()}
+        if replay:
+            marks = {s: (0, None) for s in ALERT_SOURCES}
+        elif _dm._watermarks_stale(src, marks, sources):
+            if marks:
+                logger.warning("alert watermarks がDBと一致しないため、現在の末尾から追尾し直します")
+            marks = {s: _tail_mark(src, s) for s in ALERT_SOURCES}
+        with cache:
+            cache.executemany(
+                "INSERT OR REPLACE INTO alert_watermarks (source, last_rowid, last_ts) "
+                "VALUES (?, ?, ?)",
+                [(s, rowid, ts) for s, (rowid, ts) in marks.items()],
+            )
+        return marks
+
+    def poll(self, replay: bool = False) -> dict[str, dict]:
+        """未処理の行をすべて評価して通知する。
+
+        Returns:
+            source → {"rows", "alerts", "error"}（error は通知失敗時のメッセージ）
+        """
+        version = _dm.get_db_version()
+        stats = {s: {"rows": 0, "alerts": 0, "error": None} for s in ALERT_SOURCES}
+        if self._version == version and not replay:
+            return stats
+        with self._lock, _dm._connect() as src, _dm._connect_cache() as cache:
+            _ensure_alert_schema(cache)
+            marks = self._load_marks(src, cache, replay)
+            failed = False
+            for source in ALERT_SOURCES:
+                failed |= not self._drain(src, cache, source, marks[source], stats[source])
+            if not failed:
+                self._version = version
+        return stats
+
+    def _drain(self, src, cache, source: str, mark, stat: dict) -> bool:
+        rules = self.rules[source]
+        ts_col = ALERT_SOURCES[source][1]
+        while True:
+            rows = _fetch_batch(src, source, mark, self.batch_size)
+            if not rows:
+                return True
+            alerts = []
+            for row in rows:
+                for rule, params in rules:
+                    text = rule.check(row, params, src)
+                    if text is not None:
+                        alerts.append(Alert(rule.name, row[ts_col] or "", text))
+            if alerts:
+                try:
+                    self.sink.send(alerts)
+                except Exception as e:
+                    logger.warning(f"alert 通知に失敗（{source}、次回再送）: {e}")
+                    stat["error"] = str(e)[:200]
+                    return False
+            mark = (rows[-1]["_rowid"], rows[-1][ts_col])
+            with cache:
+                cache.execute(
+                    "UPDATE alert_watermarks SET last_rowid = ?, last_ts = ? WHERE source = ?",
+                    (mark[0], mark[1], source),
+                )
+            stat["rows"] += len(rows)
+            stat["alerts"] += len(alerts)
+            if len(rows) < self.batch_size:
+                return True
+
+
+# ============================================================
+# ローカル Webhook スタブ
+# ============================================================
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_response(400)
+            self.end_headers()
+            return
+        self.server.received += 1
+        print(f"--- webhook #{self.server.received} ---\n{payload.get('content', '')}", flush=True)
+        # Discord の Webhook は ?wait=true でなければ 204 No Content を返す
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_stub_server(host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Discord Webhook の代わりに受信内容を標準出力に出すHTTPサーバー。"""
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.received = 0
+    return server
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="同期DBの差分から運用アラートを通知")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="差分を追尾して通知する")
+    run.add_argument("--once", action="store_true", help="1回追いついたら終了")
+    run.add_argument("--interval", type=float, default=60.0, help="ポーリング間隔（秒）")
+    run.add_argument("--webhook-url", help="通知先（省略時は DISCORD_WEBHOOK_URL、なければログ出力）")
+    run.add_argument("--config", type=Path, help=f"ルール設定JSON（既定: {ALERT_CONFIG_PATH}）")
+    run.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    run.add_argument("--replay", action="store_true", help="ウォーターマークを捨てて全件から通知")
+
+    stub = sub.add_parser("stub", help="ローカルの Webhook スタブを起動")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "stub":
+        server = make_stub_server(args.host, args.port)
+        print(f"webhook stub: http://{args.host}:{args.port}/webhook", flush=True)
+        with contextlib.suppress(KeyboardInterrupt):
+            server.serve_forever()
+        return 0
+
+    url = args.webhook_url or _dm._get_secret("DISCORD_WEBHOOK_URL")
+    sink = WebhookSink(url) if url else LogSink()
+    engine = AlertEngine(sink, load_alert_config(args.config), args.batch_size)
+    replay = args.replay
+    while True:
+        stats = engine.poll(replay=replay)
+        replay = False
+        rows = sum(s["rows"] for s in stats.values())
+        if rows:
+            logger.info(
+                "alerts: "
+                + ", ".join(f"{k} {v['rows']} rows / {v['alerts']} alerts" for k, v in stats.items())
+            )
+        if args.once:
+            return 1 if any(s["error"] for s in stats.values()) else 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
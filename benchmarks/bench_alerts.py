@@ -0,0 +1,99 @@
+"""
+alert_engine ベンチマーク（スループットとメモリ）
+
+シグナル N 件（既定 10,000 / 100,000）を持つ合成DB（benchmarks/synthetic_db.py）に対して
+ウォーターマーク 0 から全件を評価・通知し、1秒あたりのイベント数とピークメモリを出す。
+シンクは件数を数えて Discord 形式のメッセージ組み立てまで行う（HTTP は含めない）。
+ピークメモリがイベント数に比例せずバッチサイズで頭打ちになることを確認する。
+
+    python benchmarks/bench_alerts.py [--events 10000,100000] [--batch-size 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import alert_engine
+import dashboard_data as _dm
+from benchmarks.synthetic_db import SyntheticScale, generate_db
+
+DAYS = 20
+
+
+class CountingSink:
+    """受け取った件数とメッセージ数だけ数えるシンク。"""
+
+    def __init__(self):
+        self.alerts = 0
+        self.messages = 0
+
+    def send(self, alerts):
+        self.alerts += len(alerts)
+        self.messages += len(alert_engine.format_messages(alerts))
+
+
+def run(n_events: int, batch_size: int, tmp: Path) -> dict:
+    db_path = tmp / f"alerts_{n_events}.db"
+    scale = SyntheticScale(
+        days=DAYS,
+        tickers=60,
+        news_per_day=10,
+        analyses_per_day=5,
+        signals_per_day=max(1, n_events // DAYS),
+        content_chars=0,
+    )
+    generate_db(db_path, scale, seed=7)
+    _dm.DB_PATH = db_path
+    os.environ["DASHBOARD_CACHE_DB_PATH"] = str(tmp / f"alerts_{n_events}.cache.db")
+
+    sink = CountingSink()
+    engine = alert_engine.AlertEngine(
+        sink, dict(alert_engine.DEFAULT_ALERT_CONFIG), batch_size=batch_size
+    )
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    stats = engine.poll(replay=True)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = sum(s["rows"] for s in stats.values())
+    return {
+        "rows": rows,
+        "alerts": sink.alerts,
+        "messages": sink.messages,
+        "seconds": elapsed,
+        "events_per_s": rows / elapsed if elapsed else 0.0,
+        "peak_kb": peak / 1024,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", default="10000,100000", help="シグナル件数（カンマ区切り）")
+    parser.add_argument("--batch-size", type=int, default=alert_engine.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'alerts':>8} {'msgs':>6} {'sec':>7} {'events/s':>10} {'peak KB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(x) for x in args.events.split(",")):
+            r = run(n, args.batch_size, Path(tmp))
+            print(
+                f"{r['rows']:>8} {r['alerts']:>8} {r['messages']:>6} {r['seconds']:>7.2f} "
+                f"{r['events_per_s']:>10,.0f} {r['peak_kb']:>9,.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,440 @@
+"""
+データ層ベンチマーク（回帰しきい値つき）
+
+dashboard_data.py の公開 getter（get_* / search_text）と build_daily_portfolio を、
+合成DB（benchmarks/synthetic_db.py）の small / medium / large で計測する。
+
+- 価格は yfinance の代わりにオフラインの決定的な価格フィクスチャを使う
+- 各関数は1回ウォームアップ（サイドカーDBの構築を含む）した後、
+  プロセス内キャッシュを毎回リセットして --repeat 回計測し p50 / p95 を出す
+- 別の1回で tracemalloc のピーク（Python ヒープ）を計測する
+- 基準ファイル（既定: benchmarks/baseline_data_layer.json）と比較し、
+  p50 が基準の (1 + --tolerance) 倍を超えた関数は --confirm 回計測し直す。
+  やり直しても最小の p50 が超えたまま、または基準に無い関数があれば終了コード1
+
+    python benchmarks/bench_data_layer.py                       # small, medium
+    python benchmarks/bench_data_layer.py --sizes large --repeat 3
+    python benchmarks/bench_data_layer.py --only "ticker|flow" --tolerance 0.5
+    python benchmarks/bench_data_layer.py --update-baseline     # 基準を書き換える（失敗した計測があれば書かない）
+
+Alpaca 系（資格情報とネットワークが必要）と副作用のみの関数は対象外。
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import inspect
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dashboard_data as _dm
+from benchmarks import synthetic_db
+from benchmarks.synthetic_db import SCALES, generate_db
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline_data_layer.json"
+DEFAULT_SIZES = ["small", "medium"]
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_MEM_TOLERANCE = 0.5
+# しきい値を超えた関数を計測し直す回数（最小の p50 で判定し、単発のノイズを除く）
+DEFAULT_CONFIRM = 2
+# これ未満のメモリ増加はノイズとして回帰扱いしない
+MIN_DELTA_KB = 256.0
+SEED = 0
+
+# 計測対象外（ネットワーク・資格情報が必要 / 計測に意味がない）
+EXCLUDED = {
+    "get_alpaca_portfolio",
+    "get_alpaca_positions",
+    "get_alpaca_latency_stats",
+    "get_db_version",
+}
+
+
+# ============================================================
+# オフライン価格フィクスチャ
+# ============================================================
+
+
+class OfflinePrices:
+    """yf.download 互換の決定的な価格データを返す（ネットワーク不要）。
+
+    銘柄名から初期値とドリフトを決め、営業日ごとの終値をランダムウォークで作る。
+    """
+
+    def download(self, tickers, start=None, end=None, period=None, **_kwargs) -> pd.DataFrame:
+        names = [tickers] if isinstance(tickers, str) else list(tickers)
+        end_ts = pd.Timestamp(end) if end is not None else pd.Timestamp.now().normalize()
+        if start is not None:
+            start_ts = pd.Timestamp(start)
+        else:
+            start_ts = end_ts - pd.Timedelta(days=int(str(period or "5d").rstrip("d")) + 2)
+        # yf.download と同じく end は含まない
+        index = pd.bdate_range(start_ts, end_ts, inclusive="left" if end is not None else "both")
+        closes = {}
+        for t in names:
+            rng = np.random.default_rng(sum(map(ord, t)))
+            base = rng.uniform(20, 600)
+            steps = rng.normal(0.0004, 0.018, len(index))
+            closes[t] = base * np.exp(np.cumsum(steps))
+        close = pd.DataFrame(closes, index=index)
+        close.index.name = "Date"
+        if len(names) == 1:
+            return pd.concat({"Close": close[names[0]]}, axis=1)
+        return pd.concat({"Close": close}, axis=1)
+
+
+# ============================================================
+# 計測対象と引数
+# ============================================================
+
+
+def _context(db_end: date) -> dict:
+    """DB内容から引数を決める（最も活発な日・銘柄など）。"""
+    with _dm._connect() as conn:
+        busiest = conn.execute(
+            "SELECT date(created_at) AS d FROM news GROUP BY d ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()
+        top = conn.execute(
+            "SELECT ticker FROM signals GROUP BY ticker ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()
+        news_ids = [r[0] for r in conn.execute("SELECT id FROM news ORDER BY id DESC LIMIT 50")]
+        analysis_ids = [r[0] for r in conn.execute("SELECT id FROM ai_analysis ORDER BY id DESC LIMIT 50")]
+        signal_ids = [r[0] for r in conn.execute("SELECT id FROM signals ORDER BY id DESC LIMIT 50")]
+    target = busiest["d"] if busiest else db_end.isoformat()
+    return {
+        "target_date": target,
+        "ticker": top["ticker"] if top else "NVDA",
+        "end_date": db_end.isoformat(),
+        "news_ids": news_ids,
+        "analysis_ids": analysis_ids,
+        "signal_ids": signal_ids,
+        # DataFrame / dict を受け取る関数の入力（計測外で用意）
+        "trades_df": _dm.get_trades(),
+        "runs_df": _dm.get_system_runs(),
+        "kpi": _dm.get_kpi_summary(),
+    }
+
+
+# 関数名 → ctx から kwargs を作る関数（既定引数で呼べるものは登録不要）
+CALL_ARGS = {
+    "build_daily_portfolio": lambda c: {},
+    "get_date_ticker_analyses": lambda c: {"target_date": c["target_date"], "ticker": c["ticker"]},
+    "get_date_ticker_flow": lambda c: {"target_date": c["target_date"]},
+    "get_date_ticker_news": lambda c: {"target_date": c["target_date"], "ticker": c["ticker"]},
+    "get_day_bundle": lambda c: {"target_date": c["target_date"]},
+    "get_go_nogo_verdict": lambda c: {"kpi": c["kpi"]},
+    "get_latest_prices": lambda c: {"tickers": [c["ticker"], "SPY", "QQQ"]},
+    "get_log_analyses": lambda c: {"target_date": c["target_date"]},
+    "get_log_analyses_detail": lambda c: {"ids": c["analysis_ids"]},
+    "get_log_day_summary": lambda c: {"target_date": c["target_date"]},
+    "get_log_news": lambda c: {"target_date": c["target_date"]},
+    "get_log_news_detail": lambda c: {"ids": c["news_ids"]},
+    "get_log_signals": lambda c: {"target_date": c["target_date"]},
+    "get_log_signals_detail": lambda c: {"ids": c["signal_ids"]},
+    "get_log_system_runs": lambda c: {"target_date": c["target_date"]},
+    "get_log_trades": lambda c: {"target_date": c["target_date"]},
+    "get_pipeline_status": lambda c: {"target_date": c["target_date"]},
+    "get_signal_block_reasons": lambda c: {"target_date": c["target_date"]},
+    "get_system_health_summary": lambda c: {"runs_df": c["runs_df"]},
+    "get_ticker_flow_funnel": lambda c: {"end_date": c["end_date"]},
+    "get_ticker_flow_range": lambda c: {
+        "start_date": (date.fromisoformat(c["end_date"]) - timedelta(days=13)).isoformat(),
+        "end_date": c["end_date"],
+    },
+    "get_ticker_event_counts": lambda c: {"ticker": c["ticker"]},
+    "get_ticker_timeline": lambda c: {"ticker": c["ticker"]},
+    "get_trade_summary": lambda c: {"trades_df": c["trades_df"]},
+    "search_text": lambda c: {"query": "データセンター"},
+}
+
+
+def discover_targets() -> list[str]:
+    """計測対象の関数名（公開 getter + build_daily_portfolio + search_text）。
+
+    必須引数があるのに CALL_ARGS に無い getter は登録漏れとしてエラーにする。
+    """
+    names = []
+    for name, fn in inspect.getmembers(_dm, inspect.isfunction):
+        if fn.__module__ != _dm.__name__ or name in EXCLUDED:
+            continue
+        if not (name.startswith("get_") or name in ("build_daily_portfolio", "search_text")):
+            continue
+        required = [
+            p for p in inspect.signature(fn).parameters.values()
+            if p.default is inspect.Parameter.empty
+        ]
+        if required and name not in CALL_ARGS:
+            raise SystemExit(f"{name} の引数が CALL_ARGS に未登録です")
+        names.append(name)
+    return names
+
+
+def reset_caches() -> None:
+    """プロセス内キャッシュを捨てる（サイドカーDBは残すので差分チェックのみ走る）。"""
+    _dm._trade_cube_cache.clear()
+    _dm._day_bundles.clear()
+    _dm._price_cache.clear()
+    _dm._snapshot_bars_cache.clear()
+    _dm._calendar_version = None
+    _dm._ticker_events_version = None
+    _dm._search_version = None
+    _dm._block_reasons_version = None
+    _dm._day_bundle_signatures = None
+
+
+# ============================================================
+# 計測
+# ============================================================
+
+
+def _prepare_db(size: str, db_dir: Path) -> tuple[Path, date]:
+    """サイズごとの合成DBを作る（同じ条件のDBがあれば再利用）。データは今日で終わる。"""
+    scale = SCALES[size]
+    end = date.today()
+    start = end - timedelta(days=scale.days - 1)
+    path = db_dir / f"bench_{size}_{start.isoformat()}_s{SEED}.db"
+    meta = path.with_suffix(".json")
+    # 生成器が変わったら作り直す（同じ seed でも中身が変わるため）
+    generator = hashlib.sha256(Path(synthetic_db.__file__).read_bytes()).hexdigest()[:12]
+    signature = {
+        "scale": asdict(scale),
+        "start": start.isoformat(),
+        "seed": SEED,
+        "generator": generator,
+    }
+    if not (path.exists() and meta.exists() and json.loads(meta.read_text()) == signature):
+        for stale in db_dir.glob(f"bench_{size}_*"):
+            stale.unlink()
+        t0 = time.perf_counter()
+        generate_db(path, scale, seed=SEED, start_date=start.isoformat())
+        meta.write_text(json.dumps(signature))
+        print(f"  generated {path.name} in {time.perf_counter() - t0:.1f}s")
+    return path, end
+
+
+def measure(fn, kwargs: dict, repeat: int) -> dict:
+    fn(**kwargs)  # ウォームアップ（サイドカー構築・接続確立）
+    samples = []
+    for _ in range(repeat):
+        reset_caches()
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(**kwargs)
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    reset_caches()
+    gc.collect()
+    tracemalloc.start()
+    fn(**kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_size(
+    size: str,
+    db_dir: Path,
+    repeat: int,
+    only: re.Pattern | None,
+    names: set[str] | None = None,
+) -> dict:
+    """1サイズ分を計測する。names を渡すとその関数だけ（再計測用）。"""
+    path, end = _prepare_db(size, db_dir)
+    _dm.DB_PATH = path
+    os.environ["DASHBOARD_CACHE_DB_PATH"] = str(path.with_name(f"{path.stem}.cache.db"))
+    reset_caches()
+    ctx = _context(end)
+
+    results = {}
+    for name in discover_targets():
+        if only and not only.search(name):
+            continue
+        if names is not None and name not in names:
+            continue
+        kwargs = CALL_ARGS.get(name, lambda c: {})(ctx)
+        try:
+            results[name] = measure(getattr(_dm, name), kwargs, repeat)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        r = results[name]
+        if "error" in r:
+            print(f"  {name:<34} ERROR {r['error']}")
+        else:
+            print(
+                f"  {name:<34} p50 {r['p50_ms']:9.2f} ms  p95 {r['p95_ms']:9.2f} ms  "
+                f"peak {r['peak_kb']:10.1f} KB"
+            )
+    return results
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    tolerance: float,
+    mem_tolerance: float,
+) -> list[tuple[str, str, str]]:
+    """基準より悪化した項目を (size, name, 説明) で返す。基準に無い関数も回帰扱い。"""
+    regressions = []
+    for size, funcs in results.items():
+        base_funcs = baseline.get("results", {}).get(size, {})
+        for name, r in funcs.items():
+            b = base_funcs.get(name)
+            if "error" in r:
+                regressions.append((size, name, r["error"]))
+                continue
+            if not b or "error" in b:
+                regressions.append((size, name, "基準がありません（--update-baseline で追加）"))
+                continue
+            limit = b["p50_ms"] * (1 + tolerance)
+            if r["p50_ms"] > limit:
+                regressions.append((
+                    size,
+                    name,
+                    f"p50 {b['p50_ms']:.2f} → {r['p50_ms']:.2f} ms "
+                    f"(+{(r['p50_ms'] / b['p50_ms'] - 1) * 100:.0f}%)",
+                ))
+            mem_limit = b["peak_kb"] * (1 + mem_tolerance)
+            if r["peak_kb"] > mem_limit and r["peak_kb"] - b["peak_kb"] > MIN_DELTA_KB:
+                regressions.append(
+                    (size, name, f"peak {b['peak_kb']:.0f} → {r['peak_kb']:.0f} KB")
+                )
+    return regressions
+
+
+def confirm(
+    results: dict,
+    regressions: list[tuple[str, str, str]],
+    db_dir: Path,
+    repeat: int,
+    rounds: int,
+) -> None:
+    """しきい値を超えた関数を rounds 回計測し直し、p50 / ピークの最小値で results を更新する。"""
+    suspects: dict[str, set[str]] = {}
+    for size, name, _ in regressions:
+        r = results[size][name]
+        if "error" not in r:
+            suspects.setdefault(size, set()).add(name)
+    for size, names in suspects.items():
+        for i in range(rounds):
+            print(f"[{size}] confirm {i + 1}/{rounds}: {', '.join(sorted(names))}")
+            rerun = run_size(size, db_dir, repeat, None, names)
+            for name, r in rerun.items():
+                best = results[size][name]
+                if "error" in r:
+                    continue
+                for key in ("p50_ms", "p95_ms", "peak_kb"):
+                    best[key] = min(best[key], r[key])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="dashboard_data.py のベンチマーク")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="small,medium,large から選択")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（p50/p95 の母数）")
+    parser.add_argument("--only", help="関数名の正規表現で絞り込み")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="p50 の許容悪化率")
+    parser.add_argument("--mem-tolerance", type=float, default=DEFAULT_MEM_TOLERANCE, help="ピークメモリの許容増加率")
+    parser.add_argument(
+        "--confirm",
+        type=int,
+        default=DEFAULT_CONFIRM,
+        help="しきい値を超えた関数を計測し直す回数（0 で再計測しない）",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="結果で基準ファイルを更新する")
+    parser.add_argument(
+        "--db-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "ai_investor_bench",
+        help="合成DBの置き場（再利用される）",
+    )
+    parser.add_argument("--json", type=Path, help="結果を JSON で書き出す")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown size: {', '.join(unknown)}")
+    only = re.compile(args.only) if args.only else None
+    args.db_dir.mkdir(parents=True, exist_ok=True)
+
+    _dm.yf = OfflinePrices()
+    results = {}
+    for size in sizes:
+        print(f"[{size}]")
+        results[size] = run_size(size, args.db_dir, args.repeat, only)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        merged = baseline.get("results", {})
+        for size, funcs in results.items():
+            merged.setdefault(size, {}).update(funcs)
+        # 失敗した計測は基準にしない（比較では常に回帰扱いになり、実測値の基準も失われる）
+        errors = [
+            (size, name, r["error"])
+            for size, funcs in merged.items()
+            for name, r in funcs.items()
+            if "error" in r
+        ]
+        if errors:
+            print(f"\nbaseline not updated: {len(errors)} 件の計測が失敗しています")
+            for size, name, detail in errors:
+                print(f"  {size}/{name}: {detail}")
+            return 1
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "machine": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+                    "repeat": args.repeat,
+                    "results": merged,
+                },
+                indent=2,
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+        print(f"baseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"baseline not found: {args.baseline}（--update-baseline で作成）")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline, args.tolerance, args.mem_tolerance)
+    if regressions and args.confirm > 0:
+        confirm(results, regressions, args.db_dir, args.repeat, args.confirm)
+        regressions = compare(results, baseline, args.tolerance, args.mem_tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS ({len(regressions)}):")
+        for size, name, detail in regressions:
+            print(f"  {size}/{name}: {detail}")
+        return 1
+    print(f"\nno regressions (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+ページ描画ベンチマーク（Streamlit AppTest）
+
+合成DB（benchmarks/synthetic_db.py）の small / medium / large に対して、
+streamlit_app.py をマルチページのまま AppTest で実行し、ページごとに
+描画時間と要素数（＝ブラウザへ送るデルタの数）を計測する。
+
+- 1回ウォームアップした後、st.cache_data を残したまま --repeat 回実行して p50 / p95 を出す
+  （データ読み込みではなく、ページスクリプトと要素の組み立てにかかる時間を見る）
+- --cold を付けると毎回 st.cache_data とプロセス内キャッシュを捨てて計測する
+- 一覧系カードは表1つで描画するので、要素数はデータ量によらずほぼ一定になるはず
+
+    python benchmarks/bench_render.py                        # small, medium
+    python benchmarks/bench_render.py --sizes large --repeat 3
+    python benchmarks/bench_render.py --pages pipeline,date_detail --cold
+
+価格はオフラインの価格フィクスチャ（bench_data_layer.OfflinePrices）を使う。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dashboard_data as _dm
+from benchmarks.bench_data_layer import (
+    OfflinePrices,
+    _prepare_db,
+    reset_caches,
+)
+from benchmarks.synthetic_db import SCALES
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SIZES = ["small", "medium"]
+PAGES = {
+    "home": "pages/home.py",
+    "pipeline": "pages/pipeline.py",
+    "date_detail": "pages/date_detail.py",
+}
+TIMEOUT_SEC = 300
+
+
+# ============================================================
+# 要素数
+# ============================================================
+
+
+def count_elements(node) -> Counter:
+    """AppTest の要素ツリーを辿り、種類ごとの要素数を数える。"""
+    counts: Counter = Counter()
+    children = getattr(node, "children", None)
+    if children is None:
+        counts[getattr(node, "type", "unknown")] += 1
+        return counts
+    counts["block"] += 1
+    for child in children.values():
+        counts.update(count_elements(child))
+    return counts
+
+
+# ============================================================
+# 計測
+# ============================================================
+
+
+def _run_page(at: AppTest, page: str) -> float:
+    at.switch_page(page)
+    t0 = time.perf_counter()
+    at.run(timeout=TIMEOUT_SEC)
+    ms = (time.perf_counter() - t0) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return ms
+
+
+def measure_page(page: str, date_param: str, repeat: int, cold: bool) -> dict:
+    at = AppTest.from_file(str(ROOT / "streamlit_app.py"), default_timeout=TIMEOUT_SEC)
+    at.query_params["date"] = date_param
+    at.run()
+    _run_page(at, page)  # ウォームアップ（サイドカーDBの構築・キャッシュ投入）
+
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            st.cache_data.clear()
+            reset_caches()
+        samples.append(_run_page(at, page))
+
+    counts = count_elements(at._tree)
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 1),
+        "p95_ms": round(float(np.percentile(samples, 95)), 1),
+        "elements": sum(counts.values()),
+        "markdown": counts.get("markdown", 0),
+        "blocks": counts.get("block", 0),
+    }
+
+
+def run_size(size: str, db_dir: Path, pages: list[str], repeat: int, cold: bool) -> dict:
+    path, end = _prepare_db(size, db_dir)
+    _dm.DB_PATH = path
+    os.environ["DASHBOARD_CACHE_DB_PATH"] = str(path.with_name(f"{path.stem}.cache.db"))
+    st.cache_data.clear()
+    reset_caches()
+
+    results = {}
+    for name in pages:
+        try:
+            results[name] = measure_page(PAGES[name], end.isoformat(), repeat, cold)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        r = results[name]
+        if "error" in r:
+            print(f"  {name:<12} ERROR {r['error']}")
+        else:
+            print(
+                f"  {name:<12} p50 {r['p50_ms']:8.1f} ms  p95 {r['p95_ms']:8.1f} ms  "
+                f"elements {r['elements']:5d}  (markdown {r['markdown']}, blocks {r['blocks']})"
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ページ描画のベンチマーク（AppTest）")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="small,medium,large から選択")
+    parser.add_argument("--pages", default=",".join(PAGES), help=f"{','.join(PAGES)} から選択")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（p50/p95 の母数）")
+    parser.add_argument("--cold", action="store_true", help="毎回キャッシュを捨てて計測する")
+    parser.add_argument(
+        "--db-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "ai_investor_bench",
+        help="合成DBの置き場（bench_data_layer.py と共用）",
+    )
+    parser.add_argument("--json", type=Path, help="結果を JSON で書き出す")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    pages = [p.strip() for p in args.pages.split(",") if p.strip()]
+    unknown = [s for s in sizes if s not in SCALES] + [p for p in pages if p not in PAGES]
+    if unknown:
+        parser.error(f"unknown size/page: {', '.join(unknown)}")
+    args.db_dir.mkdir(parents=True, exist_ok=True)
+
+    _dm.yf = OfflinePrices()
+    results = {}
+    for size in sizes:
+        print(f"[{size}]")
+        results[size] = run_size(size, args.db_dir, pages, args.repeat, args.cold)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
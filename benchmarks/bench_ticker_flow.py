@@ -0,0 +1,149 @@
+"""
+get_date_ticker_flow ベンチマーク
+
+1日にニュース 5,000件（既定）を持つ合成DB（benchmarks/synthetic_db.py）を作り、旧実装（行ループ）と
+現行実装（SQL展開 + groupby 集計）の所要時間を比較する。
+件数・ソース・最終状態が一致することも確認する。
+
+    python benchmarks/bench_ticker_flow.py [--news 5000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dashboard_data as _dm
+from benchmarks.synthetic_db import SyntheticScale, generate_db
+
+TARGET_DATE = "2026-02-03"
+
+
+def build_db(path: Path, n_news: int) -> None:
+    """対象日1日分（ニュース n_news 件・120銘柄）の合成DBを作る。"""
+    scale = SyntheticScale(
+        days=1,
+        tickers=120,
+        news_per_day=n_news,
+        analyses_per_day=n_news // 20,
+        signals_per_day=n_news // 100,
+        content_chars=0,
+    )
+    generate_db(path, scale, seed=42, start_date=TARGET_DATE)
+
+
+def legacy_ticker_flow(target_date: str) -> list[dict]:
+    """行ループ版（比較用。同日に複数あるシグナル・取引は最後の1件のみ保持）"""
+    with _dm._connect() as conn:
+        ticker_news: dict[str, dict] = {}
+        for tj, src in conn.execute(
+            "SELECT tickers_json, source FROM news WHERE date(created_at) = ?",
+            (target_date,),
+        ):
+            try:
+                tickers = json.loads(tj) if tj else []
+            except (json.JSONDecodeError, TypeError):
+                continue
+            for t in tickers:
+                info = ticker_news.setdefault(t, {"count": 0, "sources": set()})
+                info["count"] += 1
+                if src:
+                    info["sources"].add(src)
+
+        analysis_rows = pd.read_sql_query(
+            "SELECT ticker, score, direction FROM ai_analysis "
+            "WHERE date(analyzed_at) = ? AND ticker IS NOT NULL",
+            conn,
+            params=(target_date,),
+        )
+        ticker_analysis = {
+            str(t): len(g) for t, g in analysis_rows.groupby("ticker")
+        }
+        signal_rows = pd.read_sql_query(
+            "SELECT ticker, signal_type FROM signals WHERE date(detected_at) = ?",
+            conn,
+            params=(target_date,),
+        )
+        ticker_signals = {s["ticker"]: s["signal_type"] for _, s in signal_rows.iterrows()}
+        trade_rows = pd.read_sql_query(
+            "SELECT ticker, action FROM trades "
+            "WHERE date(entry_timestamp) = ? OR date(exit_timestamp) = ?",
+            conn,
+            params=(target_date, target_date),
+        )
+        ticker_trades = {t["ticker"]: t["action"] for _, t in trade_rows.iterrows()}
+
+    all_tickers = set(ticker_news) | set(ticker_analysis) | set(ticker_signals) | set(ticker_trades)
+    result = []
+    for tk in sorted(all_tickers):
+        news_info = ticker_news.get(tk, {"count": 0, "sources": set()})
+        result.append(
+            {
+                "ticker": tk,
+                "news_count": news_info["count"],
+                "news_sources": sorted(news_info["sources"]),
+                "analysis_count": ticker_analysis.get(tk, 0),
+                "signal": ticker_signals.get(tk),
+                "trade": ticker_trades.get(tk),
+            }
+        )
+    return result
+
+
+def _timeit(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(TARGET_DATE)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--news", type=int, default=5000, help="対象日のニュース件数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（中央値を表示）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        build_db(db_path, args.news)
+        _dm.DB_PATH = db_path
+
+        legacy = {r["ticker"]: r for r in legacy_ticker_flow(TARGET_DATE)}
+        current = {r["ticker"]: r for r in _dm.get_date_ticker_flow(TARGET_DATE)}
+        mismatched = [
+            tk
+            for tk in set(legacy) | set(current)
+            if tk not in legacy
+            or tk not in current
+            or legacy[tk]["news_count"] != current[tk]["news_count"]
+            or legacy[tk]["news_sources"] != current[tk]["news_sources"]
+            or legacy[tk]["analysis_count"] != current[tk]["analysis_count"]
+            or (legacy[tk]["trade"] is not None) != (current[tk]["trade_count"] > 0)
+            or (legacy[tk]["signal"] is not None) != (current[tk]["signal_count"] > 0)
+        ]
+
+        legacy_ms = _timeit(legacy_ticker_flow, args.repeat)
+        current_ms = _timeit(_dm.get_date_ticker_flow, args.repeat)
+
+    print(f"news rows      : {args.news} (mean)")
+    print(f"tickers        : {len(current)}")
+    print(f"legacy (loops) : {legacy_ms:8.1f} ms")
+    print(f"vectorized     : {current_ms:8.1f} ms")
+    print(f"speedup        : {legacy_ms / current_ms:8.2f}x")
+    print(f"mismatches     : {len(mismatched)}")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
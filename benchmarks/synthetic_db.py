@@ -0,0 +1,442 @@
+"""
+スケール検証用の合成DBジェネレーター
+
+dashboard_data.py が参照する8テーブル（news / ai_analysis / signals / trades /
+system_runs / portfolio_snapshots / positions / signal_tracking）を持つ
+ai_investor.db 互換のSQLiteを生成する。乱数はシード固定で再現可能。
+
+- 銘柄は data/portfolio.json の監視銘柄（不足分は SYN001... を補う）、人気度は Zipf 分布
+- ニュースは平日に多く週末に少なく、市場時間帯に集中
+- trades.signal_id → signals.id、signal_tracking.signal_id → signals.id、
+  positions は未決済の trades と一致（外部キー整合）
+
+使い方:
+    python benchmarks/synthetic_db.py /tmp/large.db --scale large
+    python benchmarks/synthetic_db.py /tmp/x.db --days 90 --tickers 60 --news-per-day 800 --seed 7
+
+コードから:
+    from benchmarks.synthetic_db import SCALES, generate_db
+    generate_db(path, SCALES["medium"], seed=0)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+import zlib
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PORTFOLIO_CONFIG = PROJECT_ROOT / "data" / "portfolio.json"
+
+SCHEMA = """
+CREATE TABLE news (
+    id INTEGER PRIMARY KEY, title TEXT, content TEXT, source TEXT, url TEXT,
+    published_at TEXT, sentiment_score REAL, quality_score REAL, importance TEXT,
+    theme TEXT, tickers_json TEXT, created_at TEXT
+);
+CREATE TABLE ai_analysis (
+    id INTEGER PRIMARY KEY, theme TEXT, ticker TEXT, analysis_type TEXT, score REAL,
+    direction TEXT, summary TEXT, detailed_analysis TEXT, key_points_json TEXT,
+    recommendation TEXT, tickers_analyzed_json TEXT, news_count INTEGER,
+    model_used TEXT, analyzed_at TEXT
+);
+CREATE TABLE signals (
+    id INTEGER PRIMARY KEY, signal_id TEXT, ticker TEXT, signal_type TEXT,
+    detected_at TEXT, price REAL, rsi REAL, macd REAL, macd_signal REAL, ma200 REAL,
+    ma200_position TEXT, volume_ratio REAL, confidence REAL, conviction INTEGER,
+    target_price REAL, stop_loss REAL, status TEXT, reasoning TEXT,
+    decision_factors_json TEXT
+);
+CREATE TABLE trades (
+    id INTEGER PRIMARY KEY, trade_id TEXT, signal_id INTEGER REFERENCES signals(id),
+    ticker TEXT, action TEXT, entry_price REAL, exit_price REAL, shares INTEGER,
+    total_value REAL, profit_loss REAL, profit_loss_pct REAL, status TEXT,
+    holding_days INTEGER, entry_timestamp TEXT, exit_timestamp TEXT,
+    strategy_used TEXT, exit_reason TEXT, engine TEXT, notes TEXT
+);
+CREATE TABLE system_runs (
+    id INTEGER PRIMARY KEY, run_id TEXT, run_mode TEXT, environment TEXT,
+    started_at TEXT, ended_at TEXT, status TEXT, signals_detected INTEGER,
+    trades_executed INTEGER, news_collected INTEGER, errors_count INTEGER,
+    error_message TEXT, host_name TEXT
+);
+CREATE TABLE portfolio_snapshots (
+    id INTEGER PRIMARY KEY, timestamp TEXT, total_value REAL, cash_balance REAL,
+    equity_value REAL
+);
+CREATE TABLE positions (
+    id INTEGER PRIMARY KEY, ticker TEXT, side TEXT, shares INTEGER, entry_price REAL,
+    current_price REAL, stop_loss_price REAL, take_profit_price REAL,
+    unrealized_pnl REAL, unrealized_pnl_pct REAL, entry_timestamp TEXT,
+    last_updated TEXT
+);
+CREATE TABLE signal_tracking (
+    id INTEGER PRIMARY KEY, signal_id INTEGER REFERENCES signals(id), ticker TEXT,
+    strategy_type TEXT, tier INTEGER, conviction INTEGER, signal_price REAL,
+    target_price REAL, stop_loss REAL, outcome TEXT, exit_price REAL,
+    return_pct REAL, holding_days INTEGER, max_drawdown_pct REAL,
+    max_gain_pct REAL, signal_timestamp TEXT
+);
+"""
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    """生成規模（1日あたりの件数は平均値。平日/週末で増減する）。"""
+
+    days: int = 30
+    tickers: int = 40
+    news_per_day: int = 200
+    analyses_per_day: int = 20
+    signals_per_day: int = 4
+    runs_per_day: int = 6
+    snapshots_per_day: int = 24
+    # ニュース本文の平均文字数（行数が多いときは小さくしてDBサイズを抑える）
+    content_chars: int = 400
+
+
+SCALES = {
+    "small": SyntheticScale(days=14, tickers=20, news_per_day=50),
+    "medium": SyntheticScale(days=90, tickers=60, news_per_day=500, analyses_per_day=40),
+    # 1年運用・ニュース約100万行
+    "large": SyntheticScale(
+        days=365, tickers=120, news_per_day=3000, analyses_per_day=80,
+        signals_per_day=8, content_chars=200,
+    ),
+}
+
+NEWS_SOURCES = ["finnhub", "google_news_rss", "yahoo_finance", "reuters", "marketwatch", "seeking_alpha"]
+NEWS_SOURCE_WEIGHTS = [0.32, 0.25, 0.18, 0.1, 0.09, 0.06]
+RUN_MODES = ["full", "medium", "light", "news_only", "analysis_only"]
+STRATEGIES = ["dip_buy", "trend_follow", "vix_contrarian"]
+EXIT_REASONS = ["take_profit", "stop_loss", "trailing_stop", "time_exit"]
+ANALYSIS_TYPES = ["ticker", "theme", "sector", "macro", "sentiment", "risk"]
+WORDS = [
+    "決算", "ガイダンス", "需要", "供給", "データセンター", "半導体", "規制", "受注", "利下げ", "利上げ", "関税",
+    "AI", "売上", "利益率", "成長", "減速", "上方修正", "下方修正", "買収", "提携", "新製品", "在庫", "出荷",
+    "demand", "margin", "guidance", "revenue", "growth", "outlook",
+    "upgrade", "downgrade", "capex", "chips", "cloud",
+]
+
+
+def _load_universe(n: int) -> tuple[list[str], dict[str, str]]:
+    """監視銘柄とテーマの対応を portfolio.json から作る（足りなければ合成銘柄）。"""
+    tickers: list[str] = []
+    theme_of: dict[str, str] = {}
+    try:
+        config = json.loads(PORTFOLIO_CONFIG.read_text())
+        for theme in config.get("monitoring_themes", []):
+            for t in theme.get("tickers", []):
+                if t not in theme_of:
+                    theme_of[t] = theme["name"]
+                    tickers.append(t)
+    except (OSError, json.JSONDecodeError):
+        pass
+    i = 1
+    while len(tickers) < n:
+        t = f"SYN{i:03d}"
+        tickers.append(t)
+        theme_of[t] = "Synthetic"
+        i += 1
+    tickers = tickers[:n]
+    return tickers, {t: theme_of[t] for t in tickers}
+
+
+def _texts(rng: np.random.Generator, n: int, chars: int) -> list[str]:
+    """平均 chars 文字前後（対数正規）のダミー文を n 件まとめて作る。"""
+    lengths = np.maximum(rng.lognormal(np.log(max(chars, 8) / 6), 0.5, n).astype(int), 1)
+    words = np.array(WORDS, dtype=object)[rng.integers(0, len(WORDS), int(lengths.sum()))]
+    bounds = np.cumsum(lengths)
+    return [" ".join(words[b - k:b]) for b, k in zip(bounds, lengths, strict=True)]
+
+
+def _text(rng: np.random.Generator, chars: int) -> str:
+    return _texts(rng, 1, chars)[0]
+
+
+def _ts(day: datetime, seconds: float) -> str:
+    return (day + timedelta(seconds=float(seconds))).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def generate_db(
+    path: str | Path,
+    scale: SyntheticScale | None = None,
+    seed: int = 0,
+    start_date: str = "2026-01-24",
+    overwrite: bool = True,
+) -> dict[str, int]:
+    """合成DBを path に書き出し、テーブルごとの行数を返す。"""
+    path = Path(path)
+    if path.exists():
+        if not overwrite:
+            raise FileExistsError(path)
+        path.unlink()
+    scale = scale or SyntheticScale()
+    rng = np.random.default_rng(seed)
+    tickers, theme_of = _load_universe(scale.tickers)
+    # Zipf 型の人気度（上位銘柄にニュース・分析が集中）
+    popularity = 1.0 / np.arange(1, len(tickers) + 1) ** 1.1
+    popularity /= popularity.sum()
+    price0 = {t: float(rng.uniform(20, 600)) for t in tickers}
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = start + timedelta(days=scale.days)
+
+    conn = sqlite3.connect(str(path))
+    conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + SCHEMA)
+
+    def day_factor(day: datetime) -> float:
+        return 1.0 if day.weekday() < 5 else 0.35
+
+    def price_at(ticker: str, day_idx: int) -> float:
+        drift = 1 + 0.0004 * day_idx + 0.02 * np.sin(day_idx / 9 + zlib.crc32(ticker.encode()) % 7)
+        return round(price0[ticker] * drift, 2)
+
+    # ── news ──
+    def news_rows():
+        for d in range(scale.days):
+            day = start + timedelta(days=d)
+            n = rng.poisson(scale.news_per_day * day_factor(day))
+            # 市場時間帯（UTC 13:30-20:00 前後）に集中
+            secs = np.sort(np.clip(rng.normal(15.5 * 3600, 4 * 3600, n), 0, 86399))
+            n_tk = rng.integers(1, 4, n)
+            sources = rng.choice(NEWS_SOURCES, size=n, p=NEWS_SOURCE_WEIGHTS)
+            sentiment = np.clip(rng.normal(0.05, 0.35, n), -1, 1)
+            quality = rng.beta(5, 2, n)
+            # 1記事あたり最大3銘柄（人気度に比例して重複なしに近い形で抽出）
+            picks = rng.choice(len(tickers), size=(n, 3), p=popularity)
+            titles = _texts(rng, n, 40)
+            contents = _texts(rng, n, scale.content_chars)
+            for i in range(n):
+                tks = [tickers[j] for j in dict.fromkeys(picks[i, : n_tk[i]])]
+                ts = _ts(day, secs[i])
+                yield (
+                    f"{tks[0]} {titles[i]}",
+                    contents[i],
+                    sources[i],
+                    f"https://news.example.com/{d}/{i}",
+                    ts,
+                    round(float(sentiment[i]), 3),
+                    round(float(quality[i]), 3),
+                    "high" if quality[i] > 0.85 else ("medium" if quality[i] > 0.55 else "low"),
+                    theme_of[tks[0]],
+                    json.dumps(tks),
+                    ts,
+                )
+
+    conn.executemany(
+        "INSERT INTO news (title, content, source, url, published_at, sentiment_score, "
+        "quality_score, importance, theme, tickers_json, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        news_rows(),
+    )
+
+    # ── ai_analysis ──
+    def analysis_rows():
+        for d in range(scale.days):
+            day = start + timedelta(days=d)
+            n = rng.poisson(scale.analyses_per_day * day_factor(day))
+            for i in range(n):
+                t = str(rng.choice(tickers, p=popularity))
+                score = float(np.clip(rng.normal(55, 15), 0, 100))
+                direction = "bullish" if score >= 62 else ("bearish" if score < 42 else "neutral")
+                yield (
+                    theme_of[t], t, str(rng.choice(ANALYSIS_TYPES)), round(score, 1), direction,
+                    _text(rng, 60), _text(rng, 600),
+                    json.dumps([_text(rng, 20) for _ in range(3)], ensure_ascii=False),
+                    {"bullish": "buy", "bearish": "sell"}.get(direction, "hold"),
+                    json.dumps([t]), int(rng.integers(1, 15)), "gemini-pro",
+                    _ts(day, 12 * 3600 + i * 240),
+                )
+
+    conn.executemany(
+        "INSERT INTO ai_analysis (theme, ticker, analysis_type, score, direction, summary, "
+        "detailed_analysis, key_points_json, recommendation, tickers_analyzed_json, "
+        "news_count, model_used, analyzed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        analysis_rows(),
+    )
+
+    # ── signals → trades / signal_tracking / positions ──
+    signal_rows, trade_rows, tracking_rows, position_rows = [], [], [], []
+    signal_id = 0
+    for d in range(scale.days):
+        day = start + timedelta(days=d)
+        if day.weekday() >= 5:
+            continue
+        for i in range(rng.poisson(scale.signals_per_day)):
+            signal_id += 1
+            t = str(rng.choice(tickers, p=popularity))
+            price = price_at(t, d)
+            conviction = int(rng.integers(5, 16))
+            status = str(rng.choice(["executed", "pending", "cancelled", "expired"], p=[0.45, 0.15, 0.25, 0.15]))
+            strategy = str(rng.choice(STRATEGIES, p=[0.5, 0.35, 0.15]))
+            detected = _ts(day, 14 * 3600 + i * 600)
+            signal_rows.append((
+                signal_id, f"sig_{signal_id:06d}", t, "BUY", detected, price,
+                round(float(rng.uniform(25, 75)), 1), round(float(rng.normal(0, 1)), 3),
+                round(float(rng.normal(0, 1)), 3), round(price * 0.95, 2),
+                "above" if rng.random() < 0.7 else "below",
+                round(float(rng.lognormal(0, 0.3)), 2), round(float(rng.uniform(0.5, 0.95)), 2),
+                conviction, round(price * 1.12, 2), round(price * 0.93, 2), status,
+                _text(rng, 120),
+                json.dumps({"news_score": round(float(rng.uniform(0, 1)), 2),
+                            "technical_score": round(float(rng.uniform(0, 1)), 2)}),
+            ))
+
+            outcome, ret, hold, exit_price = "OPEN", None, None, None
+            if status == "executed":
+                hold = int(rng.integers(1, 11))
+                exit_day = day + timedelta(days=hold)
+                ret = float(np.clip(rng.normal(0.6, 5.0), -7, 12))
+                shares = max(int(5000 // price), 1)
+                entry_ts = _ts(day, 14 * 3600 + i * 600 + 120)
+                if exit_day < end:
+                    exit_price = round(price * (1 + ret / 100), 2)
+                    pnl = round((exit_price - price) * shares, 2)
+                    outcome = "WIN" if pnl > 0 else "LOSS"
+                    reason = "take_profit" if ret > 8 else ("stop_loss" if ret < -5 else str(rng.choice(EXIT_REASONS[2:])))
+                    trade_rows.append((
+                        f"trd_{signal_id:06d}", signal_id, t, "BUY", price, exit_price, shares,
+                        round(price * shares, 2), pnl, round(ret, 2), "CLOSED", hold, entry_ts,
+                        _ts(exit_day, 15 * 3600), strategy, reason, "v2", "",
+                    ))
+                else:
+                    trade_rows.append((
+                        f"trd_{signal_id:06d}", signal_id, t, "BUY", price, None, shares,
+                        round(price * shares, 2), None, None, "OPEN", None, entry_ts,
+                        None, strategy, None, "v2", "",
+                    ))
+                    current = price_at(t, scale.days - 1)
+                    position_rows.append((
+                        t, "long", shares, price, current, round(price * 0.93, 2),
+                        round(price * 1.12, 2), round((current - price) * shares, 2),
+                        round((current / price - 1) * 100, 2), entry_ts,
+                        _ts(end - timedelta(days=1), 20 * 3600),
+                    ))
+            tracking_rows.append((
+                signal_id, t, strategy, 1 if conviction >= 12 else 2, conviction, price,
+                round(price * 1.12, 2), round(price * 0.93, 2), outcome, exit_price,
+                round(ret, 2) if ret is not None and outcome != "OPEN" else None, hold,
+                round(-abs(float(rng.normal(2, 1.5))), 2), round(abs(float(rng.normal(3, 2))), 2),
+                detected,
+            ))
+
+    conn.executemany(f"INSERT INTO signals VALUES ({', '.join('?' * 19)})", signal_rows)
+    conn.executemany(
+        "INSERT INTO trades (trade_id, signal_id, ticker, action, entry_price, exit_price, "
+        "shares, total_value, profit_loss, profit_loss_pct, status, holding_days, "
+        "entry_timestamp, exit_timestamp, strategy_used, exit_reason, engine, notes) "
+        f"VALUES ({', '.join('?' * 18)})",
+        trade_rows,
+    )
+    conn.executemany(
+        "INSERT INTO signal_tracking (signal_id, ticker, strategy_type, tier, conviction, "
+        "signal_price, target_price, stop_loss, outcome, exit_price, return_pct, "
+        "holding_days, max_drawdown_pct, max_gain_pct, signal_timestamp) "
+        f"VALUES ({', '.join('?' * 15)})",
+        tracking_rows,
+    )
+    conn.executemany(
+        "INSERT INTO positions (ticker, side, shares, entry_price, current_price, "
+        "stop_loss_price, take_profit_price, unrealized_pnl, unrealized_pnl_pct, "
+        f"entry_timestamp, last_updated) VALUES ({', '.join('?' * 11)})",
+        position_rows,
+    )
+
+    # ── system_runs ──
+    def run_rows():
+        n_run = 0
+        for d in range(scale.days):
+            day = start + timedelta(days=d)
+            for i in range(scale.runs_per_day):
+                n_run += 1
+                started = 3600 * (24 * i / scale.runs_per_day) + float(rng.uniform(0, 300))
+                status = str(rng.choice(["completed", "failed", "interrupted"], p=[0.93, 0.05, 0.02]))
+                errors = 0 if status == "completed" and rng.random() < 0.9 else int(rng.integers(1, 4))
+                yield (
+                    f"run_{n_run:06d}", str(rng.choice(RUN_MODES, p=[0.3, 0.2, 0.2, 0.2, 0.1])),
+                    "gcp", _ts(day, started), _ts(day, started + float(rng.uniform(120, 1500))),
+                    status, int(rng.poisson(1)), int(rng.poisson(0.5)),
+                    int(rng.poisson(scale.news_per_day / max(scale.runs_per_day, 1))),
+                    errors, "timeout: upstream API" if errors else "", "ai-investor-phase3",
+                )
+
+    conn.executemany(
+        "INSERT INTO system_runs (run_id, run_mode, environment, started_at, ended_at, status, "
+        "signals_detected, trades_executed, news_collected, errors_count, error_message, "
+        "host_name) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        run_rows(),
+    )
+
+    # ── portfolio_snapshots（ランダムウォーク） ──
+    def snapshot_rows():
+        value = 100_000.0
+        step = 86400 / scale.snapshots_per_day
+        for d in range(scale.days):
+            day = start + timedelta(days=d)
+            for i in range(scale.snapshots_per_day):
+                value *= 1 + float(rng.normal(0.00005, 0.002))
+                cash = value * 0.45
+                yield (_ts(day, i * step), round(value, 2), round(cash, 2), round(value - cash, 2))
+
+    conn.executemany(
+        "INSERT INTO portfolio_snapshots (timestamp, total_value, cash_balance, equity_value) "
+        "VALUES (?, ?, ?, ?)",
+        snapshot_rows(),
+    )
+    conn.commit()
+
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in (
+            "news", "ai_analysis", "signals", "trades", "system_runs",
+            "portfolio_snapshots", "positions", "signal_tracking",
+        )
+    }
+    conn.close()
+    return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ai_investor.db 互換の合成DBを生成する")
+    parser.add_argument("path", help="出力先 .db")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--days", type=int)
+    parser.add_argument("--tickers", type=int)
+    parser.add_argument("--news-per-day", type=int)
+    parser.add_argument("--analyses-per-day", type=int)
+    parser.add_argument("--signals-per-day", type=int)
+    parser.add_argument("--start-date", default="2026-01-24")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    overrides = {
+        k: v
+        for k, v in {
+            "days": args.days,
+            "tickers": args.tickers,
+            "news_per_day": args.news_per_day,
+            "analyses_per_day": args.analyses_per_day,
+            "signals_per_day": args.signals_per_day,
+        }.items()
+        if v is not None
+    }
+    scale = replace(SCALES[args.scale], **overrides)
+    t0 = time.perf_counter()
+    counts = generate_db(args.path, scale, seed=args.seed, start_date=args.start_date)
+    print(f"scale: {asdict(scale)}")
+    for table, n in counts.items():
+        print(f"  {table:<20} {n:>10,}")
+    print(f"{args.path} ({Path(args.path).stat().st_size / 1e6:.1f} MB, {time.perf_counter() - t0:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
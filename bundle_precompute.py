@@ -0,0 +1,190 @@
+"""
+date_detail の日付バンドルの事前計算（プロセスプールで並列に作って保存）
+
+全日付のバンドル（サマリ・実行ログ・Ticker別フロー・各タブの一覧・見送り理由）を
+dashboard_data._build_day_bundle で作り、サイドカーDBの day_bundle_store に
+（日付, 入力の指紋）で保存する。date_detail はメモリのLRUになければ、指紋が一致する
+保存済みのバンドルを読むだけで表示できる。指紋はDBの中身から作るので、git で配布し直して
+mtime が変わった同じDBでも使える。
+
+差分だけを作り直す:
+- 日ごとの入力の指紋（day_bundle_signatures）が前回と同じ日はそのまま
+- 指紋が変わった日・新しい日だけをプロセスプール（既定: CPUコア数）で作る
+- 書き込みはメインプロセスだけが行う（SQLite の書き込みを直列化するため）
+
+保存先のサイドカーDB（data/*.cache.db）は gitignore されているため、ダッシュボードを
+配信するホストで実行する必要がある:
+- sync_db.sh を実行するマシン: 同期の最後に自動で実行される
+- git checkout から配信するホスト: デプロイ（git pull）のたびに実行する
+- デプロイ時に処理を挟めないホスト（Streamlit Cloud など）: 保存は作られず、
+  date_detail は従来どおりその場で作る
+
+CLI:
+    python bundle_precompute.py                   # 変わった日だけ（コア数ぶん並列）
+    python bundle_precompute.py --workers 4 --force
+    python bundle_precompute.py --dates 2026-02-03 2026-02-04
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import dashboard_data as _dm
+
+logger = logging.getLogger(__name__)
+
+# 1回の書き込みトランザクションにまとめるバンドル数
+WRITE_BATCH = 32
+# これ未満の件数ならプロセスを起動せずにその場で作る
+MIN_PARALLEL_DATES = 4
+
+
+def _ensure_store_schema(cache) -> None:
+    columns = {
+        r["name"]
+        for r in cache.execute(f"PRAGMA table_info({_dm.DAY_BUNDLE_STORE_TABLE})")
+    }
+    if "db_version" in columns:
+        # DBバージョンで引いていた旧形式は作り直す
+        cache.execute(f"DROP TABLE {_dm.DAY_BUNDLE_STORE_TABLE}")
+    cache.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_dm.DAY_BUNDLE_STORE_TABLE} (
+            date TEXT PRIMARY KEY,
+            signature TEXT NOT NULL,
+            payload BLOB NOT NULL
+        )
+        """
+    )
+
+
+def _init_worker(db_path: str, cache_path: str, version: tuple) -> None:
+    """ワーカーの初期化。親が派生テーブルを更新済みなので、各ワーカーでは再確認しない。"""
+    _dm.DB_PATH = Path(db_path)
+    os.environ["DASHBOARD_CACHE_DB_PATH"] = cache_path
+    _dm._calendar_version = version
+    _dm._block_reasons_version = version
+
+
+def _build(target_date: str) -> tuple[str, bytes]:
+    bundle = _dm._build_day_bundle(target_date)
+    return target_date, pickle.dumps(bundle, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def precompute_day_bundles(
+    workers: int | None = None,
+    dates: list[str] | None = None,
+    force: bool = False,
+) -> dict:
+    """日付バンドルを事前計算して保存する。
+
+    Args:
+        workers: プロセス数（None ならCPUコア数）
+        dates: 対象日（None なら全日付）
+        force: 指紋が同じ日も作り直す
+
+    Returns:
+        dict with keys: dates（対象日数）, built, removed, workers, seconds
+    """
+    t0 = time.perf_counter()
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    # 接続時の journal_mode 切り替えでファイルが変わる前にバージョンを取らないよう、先に1回開く
+    with _dm._connect():
+        pass
+    version = _dm.get_db_version()
+
+    signatures = _dm.day_bundle_signatures()
+    targets = sorted(signatures) if dates is None else sorted(d for d in dates if d in signatures)
+
+    with _dm._connect_cache() as cache:
+        _ensure_store_schema(cache)
+        stored = {
+            r["date"]: r["signature"]
+            for r in cache.execute(f"SELECT date, signature FROM {_dm.DAY_BUNDLE_STORE_TABLE}")
+        }
+    todo = [d for d in targets if force or stored.get(d) != signatures[d]]
+    removed = [d for d in stored if d not in signatures] if dates is None else []
+
+    # ワーカーが共有する派生テーブル（日次カレンダー・見送り理由）は親で先に追いつかせる
+    _dm._refresh_activity_calendar()
+    _dm.refresh_signal_block_reasons()
+
+    built = 0
+    with _dm._connect_cache() as cache:
+        pending: list[tuple[str, str, bytes]] = []
+
+        def flush() -> None:
+            with cache:
+                cache.executemany(
+                    f"INSERT OR REPLACE INTO {_dm.DAY_BUNDLE_STORE_TABLE} "
+                    "(date, signature, payload) VALUES (?, ?, ?)",
+                    pending,
+                )
+            pending.clear()
+
+        if len(todo) < MIN_PARALLEL_DATES or workers == 1:
+            results = map(_build, todo)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(
+                max_workers=min(workers, len(todo)),
+                initializer=_init_worker,
+                initargs=(str(_dm.DB_PATH), str(_dm._cache_db_path()), version),
+            )
+            chunksize = max(1, len(todo) // (workers * 4))
+            results = pool.map(_build, todo, chunksize=chunksize)
+        try:
+            for target_date, payload in results:
+                pending.append((target_date, signatures[target_date], payload))
+                built += 1
+                if len(pending) >= WRITE_BATCH:
+                    flush()
+            if pending:
+                flush()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        with cache:
+            cache.executemany(
+                f"DELETE FROM {_dm.DAY_BUNDLE_STORE_TABLE} WHERE date = ?",
+                [(d,) for d in removed],
+            )
+
+    if _dm.get_db_version() != version:
+        logger.warning("事前計算中にDBが更新されました。次回の実行で作り直されます")
+    return {
+        "dates": len(targets),
+        "built": built,
+        "removed": len(removed),
+        "workers": workers if len(todo) >= MIN_PARALLEL_DATES else 1,
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="date_detail の日付バンドルを事前計算して保存")
+    parser.add_argument("--workers", type=int, help="プロセス数（既定: CPUコア数）")
+    parser.add_argument("--dates", nargs="+", help="対象日（YYYY-MM-DD、既定: 全日付）")
+    parser.add_argument("--force", action="store_true", help="変更のない日も作り直す")
+    args = parser.parse_args(argv)
+
+    result = precompute_day_bundles(args.workers, args.dates, args.force)
+    print(
+        f"day bundles: {result['dates']} dates / {result['built']} built, "
+        f"{result['removed']} removed "
+        f"({result['workers']} workers, {result['seconds']:.1f}s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+チャート用データの前処理（LTTB ダウンサンプリング + 売買マーカー）
+
+資産推移のように点数が期間に比例して増える系列を、描画幅（px）程度の点数まで
+Largest-Triangle-Three-Buckets で間引く。山・谷など形を決める点を優先して残すので、
+一定間隔の間引きと違って急落やピークが消えない。
+
+売買マーカーの位置（買い = エントリー日、売り = 決済日の資産額）は
+間引き前の系列から求め、その点は間引き後の線にも必ず含める。
+結果はデータのバージョンごとに1回だけ作り、ページには描画するだけの
+コンパクトなペイロード（numpy 配列の dict）を渡す。
+
+日中の資産推移は portfolio_snapshots の足（5m / 1h / 1d、dashboard_data.get_snapshot_bars）
+から作る。yfinance を使わないのでネットワークなしで描画できる。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+import dashboard_data as _dm
+
+logger = logging.getLogger(__name__)
+
+# 資産推移チャートの想定描画幅（wide レイアウトの全幅カード）。1px に1点まで
+EQUITY_CHART_WIDTH_PX = 1400
+
+# ローソク足で出す最大本数（これを超えたら終値の線を LTTB で間引く）
+CANDLE_MAX_BARS = 400
+
+# (db_version, 入力の指紋, max_points) → payload。古いものから捨てる
+_payload_cache: dict[tuple, dict] = {}
+_PAYLOAD_CACHE_SIZE = 8
+_payload_lock = threading.Lock()
+
+
+# ============================================================
+# LTTB
+# ============================================================
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets で残す点のインデックスを返す（昇順）。
+
+    先頭と末尾は必ず残し、間の点を n_out - 2 個のバケツに分けて、
+    「前に選んだ点」「次のバケツの平均点」と作る三角形の面積が最大の点を選ぶ。
+    x は数値または datetime64、y に NaN を含まないこと。
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    xs = _as_float(x)
+    ys = np.asarray(y, dtype=float)
+    every = (n - 2) / (n_out - 2)
+    edges = np.append((np.arange(n_out - 1) * every).astype(np.int64) + 1, n)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = edges[i + 1], edges[i + 2]
+        avg_x = xs[nlo:nhi].mean()
+        avg_y = ys[nlo:nhi].mean()
+        area = np.abs(
+            (xs[a] - avg_x) * (ys[lo:hi] - ys[a])
+            - (xs[a] - xs[lo:hi]) * (avg_y - ys[a])
+        )
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample(x, y, n_out: int, keep=None) -> tuple[np.ndarray, np.ndarray]:
+    """LTTB で間引いた (x, y)。keep のインデックスは必ず残す。"""
+    idx = lttb_indices(x, y, n_out)
+    if keep is not None and len(keep) > 0:
+        idx = np.union1d(idx, np.asarray(keep, dtype=np.int64))
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def _as_float(x) -> np.ndarray:
+    arr = np.asarray(x)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return arr.astype(float)
+
+
+# ============================================================
+# 売買マーカー
+# ============================================================
+
+
+def _no_markers() -> dict:
+    return {
+        "x": np.array([], dtype="datetime64[ns]"),
+        "y": np.array([]),
+        "text": np.array([]),
+        "pos": np.array([], dtype=np.int64),
+    }
+
+
+def _trade_events(trades: pd.DataFrame, side: str) -> tuple[np.ndarray, np.ndarray]:
+    """マーカーにする取引の (時刻, 銘柄)。side: "buy" = 買いのエントリー / "sell" = 決済
+
+    時刻は datetime64[ns]（解釈できない値は NaT）。
+    """
+    if len(trades) == 0:
+        return np.array([], dtype="datetime64[ns]"), np.array([], dtype=object)
+    if side == "buy":
+        rows = trades[(trades["action"] == "BUY") & trades["entry_timestamp"].notna()]
+        ts = rows["entry_timestamp"]
+    else:
+        rows = trades[(trades["status"] == "CLOSED") & trades["exit_timestamp"].notna()]
+        ts = rows["exit_timestamp"]
+    t = pd.to_datetime(ts, format="ISO8601", errors="coerce").to_numpy(dtype="datetime64[ns]")
+    return t, rows["ticker"].to_numpy()
+
+
+# ============================================================
+# 資産推移チャート
+# ============================================================
+
+
+def _markers(trades: pd.DataFrame, dates: pd.Series, totals: np.ndarray, side: str) -> dict:
+    """売買マーカー（資産推移上の位置）。side: "buy" / "sell" """
+    t, tickers = _trade_events(trades, side)
+    if len(t) == 0 or len(dates) == 0:
+        return _no_markers()
+
+    index = pd.Index(pd.to_datetime(dates).dt.normalize())
+    pos = index.get_indexer(pd.DatetimeIndex(t).normalize())
+    hit = pos >= 0
+    pos = pos[hit]
+    return {
+        "x": np.asarray(pd.to_datetime(dates))[pos],
+        "y": totals[pos],
+        "text": tickers[hit],
+        "pos": pos,
+    }
+
+
+def build_equity_payload(
+    daily: pd.DataFrame,
+    spy: pd.DataFrame,
+    trades: pd.DataFrame,
+    max_points: int = EQUITY_CHART_WIDTH_PX,
+) -> dict:
+    """資産推移チャートの描画用データを作る。
+
+    Returns:
+        dict with keys:
+            x, total: ポートフォリオ（間引き後、マーカー位置を含む）
+            spy_x, spy_y: SPY 比較（間引き後）
+            buy, sell: {"x", "y", "text"} の売買マーカー
+            points, shown: 間引き前 / 後の点数
+    """
+    if daily is None or len(daily) == 0:
+        return {}
+
+    daily = daily.dropna(subset=["total"]).sort_values("date")
+    dates = pd.to_datetime(daily["date"]).reset_index(drop=True)
+    totals = daily["total"].to_numpy(dtype=float)
+
+    buy = _markers(trades, dates, totals, "buy")
+    sell = _markers(trades, dates, totals, "sell")
+    x, total = downsample(
+        dates.to_numpy(), totals, max_points, keep=np.union1d(buy["pos"], sell["pos"])
+    )
+
+    if spy is not None and len(spy) > 0:
+        spy = spy.sort_values("date")
+        spy_x, spy_y = downsample(
+            pd.to_datetime(spy["date"]).to_numpy(),
+            spy["spy_total"].to_numpy(dtype=float),
+            max_points,
+        )
+    else:
+        spy_x, spy_y = np.array([], dtype="datetime64[ns]"), np.array([])
+
+    return {
+        "x": x,
+        "total": total,
+        "spy_x": spy_x,
+        "spy_y": spy_y,
+        "buy": {k: buy[k] for k in ("x", "y", "text")},
+        "sell": {k: sell[k] for k in ("x", "y", "text")},
+        "points": len(totals),
+        "shown": len(x),
+    }
+
+
+def get_equity_payload(
+    daily: pd.DataFrame,
+    spy: pd.DataFrame,
+    trades: pd.DataFrame,
+    source_version: tuple,
+    max_points: int = EQUITY_CHART_WIDTH_PX,
+) -> dict:
+    """build_equity_payload のメモ化版（入力の取得元のバージョンが変わるまで再計算しない）。
+
+    source_version は DBバージョンと daily/SPY の取得時刻
+    （components.shared.equity_source_version）。入力の中身はハッシュしない。
+    """
+    key = (source_version, max_points)
+    cached = _recall(key)
+    if cached is not None:
+        return cached
+    payload = build_equity_payload(daily, spy, trades, max_points)
+    _remember(key, payload)
+    return payload
+
+
+def _recall(key: tuple) -> dict | None:
+    with _payload_lock:
+        return _payload_cache.get(key)
+
+
+def _remember(key: tuple, payload: dict) -> None:
+    with _payload_lock:
+        if key not in _payload_cache and len(_payload_cache) >= _PAYLOAD_CACHE_SIZE:
+            _payload_cache.pop(next(iter(_payload_cache)))
+        _payload_cache[key] = payload
+
+
+# ============================================================
+# スナップショット（日中の資産推移）
+# ============================================================
+
+
+def _bar_markers(trades: pd.DataFrame, bar_ts: np.ndarray, close: np.ndarray, side: str) -> dict:
+    """売買マーカーを、その時刻を含む足（なければ直前の足）の終値に置く。"""
+    t, tickers = _trade_events(trades, side)
+    if len(t) == 0 or len(bar_ts) == 0:
+        return _no_markers()
+
+    pos = np.searchsorted(bar_ts.astype("datetime64[ns]"), t, side="right") - 1
+    hit = (pos >= 0) & ~np.isnat(t)
+    pos = pos[hit]
+    return {
+        "x": bar_ts[pos],
+        "y": close[pos],
+        "text": tickers[hit],
+        "pos": pos,
+    }
+
+
+def build_snapshot_payload(
+    bars: pd.DataFrame,
+    trades: pd.DataFrame,
+    max_points: int = EQUITY_CHART_WIDTH_PX,
+) -> dict:
+    """スナップショットの足から資産推移チャートの描画用データを作る。
+
+    本数が CANDLE_MAX_BARS 以下ならローソク足（kind="candle": open/high/low/close）、
+    超えたら終値の線を LTTB で間引く（kind="line": total、マーカーの足は必ず残す）。
+
+    Returns:
+        dict with keys: kind, x, (open, high, low, close | total),
+            buy, sell, points, shown
+    """
+    if bars is None or len(bars) == 0:
+        return {}
+    bar_ts = bars["timestamp"].to_numpy()
+    close = bars["close"].to_numpy(dtype=float)
+    buy = _bar_markers(trades, bar_ts, close, "buy")
+    sell = _bar_markers(trades, bar_ts, close, "sell")
+
+    if len(bars) <= CANDLE_MAX_BARS:
+        payload = {
+            "kind": "candle",
+            "x": bar_ts,
+            "open": bars["open"].to_numpy(dtype=float),
+            "high": bars["high"].to_numpy(dtype=float),
+            "low": bars["low"].to_numpy(dtype=float),
+            "close": close,
+        }
+    else:
+        x, total = downsample(
+            bar_ts, close, max_points, keep=np.union1d(buy["pos"], sell["pos"])
+        )
+        payload = {"kind": "line", "x": x, "total": total}
+
+    payload.update(
+        {
+            "buy": {k: buy[k] for k in ("x", "y", "text")},
+            "sell": {k: sell[k] for k in ("x", "y", "text")},
+            "points": len(bars),
+            "shown": len(payload["x"]),
+        }
+    )
+    return payload
+
+
+def get_snapshot_payload(
+    resolution: str,
+    trades: pd.DataFrame,
+    start_date: str = _dm.PHASE3_START,
+    max_points: int = EQUITY_CHART_WIDTH_PX,
+) -> dict:
+    """build_snapshot_payload のメモ化版（足の種類ごと。DBバージョンが変わるまで再利用）。
+
+    trades は DB から読んだ取引履歴なので DBバージョンで判定できる。
+    """
+    key = (_dm.get_db_version(), "snapshots", resolution, start_date, max_points)
+    cached = _recall(key)
+    if cached is not None:
+        return cached
+    payload = build_snapshot_payload(
+        _dm.get_snapshot_bars(resolution, start_date), trades, max_points
+    )
+    _remember(key, payload)
+    return payload
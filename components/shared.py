@@ -1,9 +1,18 @@
 """共通定数・データ読み込み・ヘルパー"""
 
+import functools
+import html
 import logging
+import re
+import time
 
 import dashboard_data as _dm
+import data_export as _export
+import external_calls as _ext
+import numpy as np
+import pandas as pd
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 
 logger = logging.getLogger(__name__)
 
@@ -169,27 +178,233 @@ def status_badge(label: str, status: str) -> str:
     )
 
 
-# ── キャッシュ付きデータ読み込み ──
-@st.cache_data(ttl=600, show_spinner="読み込み中...")
+def export_buttons(name: str, file_stem: str, key: str, **filters) -> None:
+    """CSV / Parquet のダウンロードボタン。
+
+    ファイルはクリック時に data_export でチャンク単位に生成する（描画時は読み込まない）。
+    filters は data_export.iter_chunks と同じ（start_date, end_date, target_date, ticker）。
+    """
+    formats = _export.available_formats()
+    cols = st.columns(len(formats))
+    for col, (fmt, (mime, ext)) in zip(cols, formats.items()):
+        col.download_button(
+            f"{fmt.upper()} ダウンロード",
+            data=lambda fmt=fmt: _export.export_to_tempfile(name, fmt, **filters),
+            file_name=f"{file_stem}{ext}",
+            mime=mime,
+            key=f"{key}_{fmt}",
+            on_click="ignore",
+            use_container_width=True,
+        )
+
+
+# ── 一括描画（行ごとに要素を作らず、表全体を1要素で描画する） ──
+# 行数に比例して st.columns / st.markdown を増やすと、描画時間と
+# WebSocket のメッセージ数も行数に比例して増える。リスト系のカードは
+# 列単位の文字列演算でセルを作り、html_table で1回の st.markdown にまとめる。
+
+
+def esc_col(s: pd.Series) -> pd.Series:
+    """列をHTMLエスケープした文字列にする（欠損は空文字）"""
+    return (
+        s.fillna("").astype(str)
+        .str.replace("&", "&amp;", regex=False)
+        .str.replace("<", "&lt;", regex=False)
+        .str.replace(">", "&gt;", regex=False)
+    )
+
+
+# Markdown として解釈される記号（外部ニュースの本文をそのまま表示するため）
+_MD_SPECIAL = re.compile(r"([\\`*_{}\[\]()#+\-.!|~$:])")
+
+
+def esc_md(text) -> str:
+    """HTML と Markdown をエスケープした1行の文字列にする（"$" の数式解釈も防ぐ）"""
+    one_line = " ".join(str(text or "").split())
+    return _MD_SPECIAL.sub(r"\\\1", html.escape(one_line, quote=False))
+
+
+def _sign_col(v: pd.Series) -> pd.Series:
+    return pd.Series(np.select([v > 0, v < 0], ["+", "-"], ""), index=v.index)
+
+
+def fmt_currency_col(s: pd.Series, show_sign: bool = False) -> pd.Series:
+    """fmt_currency の列版"""
+    v = pd.to_numeric(s, errors="coerce").fillna(0.0)
+    if show_sign:
+        return _sign_col(v) + "$" + v.abs().map("{:,.0f}".format)
+    return "$" + v.map("{:,.0f}".format)
+
+
+def fmt_pct_col(s: pd.Series, show_sign: bool = False, decimals: int = 1) -> pd.Series:
+    """fmt_pct の列版"""
+    v = pd.to_numeric(s, errors="coerce").fillna(0.0)
+    spec = f"{{:.{decimals}f}}".format
+    if show_sign:
+        return _sign_col(v) + v.abs().map(spec) + "%"
+    return v.map(spec) + "%"
+
+
+def pill_col(labels: pd.Series, colors) -> pd.Series:
+    """render_pill の列版。colors は列または単一の色"""
+    c = colors if isinstance(colors, pd.Series) else pd.Series(colors, index=labels.index)
+    return (
+        '<span style="display:inline-flex;align-items:center;gap:0.28rem;'
+        "font-size:0.72rem;font-weight:600;color:" + c + ";background:" + c + "14;"
+        "border:1px solid " + c + "30;padding:0.15rem 0.55rem;border-radius:9999px;"
+        'vertical-align:middle"><span style="width:6px;height:6px;border-radius:9999px;'
+        "background:" + c + ';display:inline-block"></span>' + labels + "</span>"
+    )
+
+
+def html_table(
+    cells: pd.DataFrame,
+    align: dict[str, str] | None = None,
+    max_height: int | None = None,
+) -> str:
+    """セル（HTML文字列）の DataFrame から <table> を1つ組み立てる。
+
+    列名がそのまま見出しになる。align は列名 → "right" / "center"。
+    max_height を指定すると、その高さ(px)を超える分は表の中でスクロールする。
+    """
+    align = align or {}
+    cls = {c: f' class="ta-{align[c]}"' if c in align else "" for c in cells.columns}
+    head = "".join(f"<th{cls[c]}>{c}</th>" for c in cells.columns)
+    row = pd.Series("", index=cells.index)
+    for c in cells.columns:
+        row = row + f"<td{cls[c]}>" + cells[c].astype(str) + "</td>"
+    body = "<tr>" + row + "</tr>"
+    # "$" は st.markdown で数式の区切りとして解釈されるので文字参照にする
+    table = (
+        f'<table class="dash-table"><thead><tr>{head}</tr></thead>'
+        f"<tbody>{''.join(body)}</tbody></table>"
+    ).replace("$", "&#36;")
+    style = f' style="max-height:{max_height}px"' if max_height else ""
+    return f'<div class="dash-table-wrap"{style}>{table}</div>'
+
+
+def render_html_table(
+    cells: pd.DataFrame,
+    align: dict[str, str] | None = None,
+    max_height: int | None = None,
+) -> None:
+    """html_table を1回の st.markdown で描画する"""
+    st.markdown(html_table(cells, align, max_height), unsafe_allow_html=True)
+
+
+# ── 部分再実行（st.fragment）と処理時間 ──
+def begin_full_run() -> None:
+    """ページ全体の実行開始を記録する（streamlit_app.py の先頭で呼ぶ）。
+
+    フラグメントはこの番号を見て、自分の実行が部分再実行かどうかを判定する。
+    """
+    st.session_state["_full_run_id"] = st.session_state.get("_full_run_id", 0) + 1
+    st.session_state["_full_run_started"] = time.perf_counter()
+
+
+def end_full_run() -> float:
+    """ページ全体の所要時間（ms）を記録して返す。"""
+    started = st.session_state.get("_full_run_started")
+    ms = (time.perf_counter() - started) * 1000 if started else 0.0
+    st.session_state["_full_run_ms"] = ms
+    return ms
+
+
+def timings_enabled() -> bool:
+    return bool(st.session_state.get("show_timings", False))
+
+
+def timed_fragment(name: str):
+    """st.fragment に所要時間の計測を付けるデコレーター。
+
+    カード内のウィジェット操作ではこの関数だけが再実行される。
+    カードが使うデータは引数で渡す（ページ先頭の読み込みは再実行されない）。
+    処理時間表示が有効なら、末尾に今回の所要時間と直近のページ全体の所要時間を出す。
+    """
+
+    def decorator(fn):
+        @st.fragment
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            run_id = st.session_state.get("_full_run_id", 0)
+            seen = st.session_state.setdefault("_fragment_runs", {})
+            partial = seen.get(name) == run_id
+            seen[name] = run_id
+
+            t0 = time.perf_counter()
+            result = fn(*args, **kwargs)
+            ms = (time.perf_counter() - t0) * 1000
+            st.session_state.setdefault("_fragment_ms", {})[name] = ms
+
+            if timings_enabled():
+                full_ms = st.session_state.get("_full_run_ms")
+                scope = "部分再実行" if partial else "全体実行"
+                ref = f" / ページ全体 {full_ms:.0f} ms" if full_ms else ""
+                st.caption(f"⏱ {name}: {ms:.0f} ms（{scope}{ref}）")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def rerun_fragment() -> None:
+    """実行中のフラグメントだけを再実行する（全体実行中ならページごと再実行）。"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def _is_empty_frame(df) -> bool:
+    return df is None or len(df) == 0
+
+
+# ── 外部API（stale-while-revalidate + サーキットブレーカー） ──
+# swr_call の値はプロセス内の全セッションで共有されるため、DataFrame はコピーを返す
+# （呼び出し側の列追加や並べ替えがキャッシュ本体や他セッションに波及しないように）
 def load_daily(sd):
-    return _dm.build_daily_portfolio(sd)
+    return _ext.swr_call(
+        "yahoo", ("daily", sd),
+        lambda: _dm.build_daily_portfolio(sd, raise_errors=True),
+        ttl=600, default=pd.DataFrame(),
+    ).copy()
 
 
-@st.cache_data(ttl=600, show_spinner=False)
 def load_spy(sd):
-    return _dm.get_spy_benchmark(sd)
+    return _ext.swr_call(
+        "yahoo", ("spy", sd),
+        lambda: _dm.get_spy_benchmark(sd, raise_errors=True),
+        ttl=600, default=pd.DataFrame(), is_failure=_is_empty_frame,
+    ).copy()
+
+
+def equity_source_version(sd) -> tuple:
+    """資産推移の入力（DB + daily/SPY の取得時刻）のバージョン。チャートのメモ化キーに使う。"""
+    return (
+        _dm.get_db_version(),
+        _ext.fetched_at("yahoo", ("daily", sd)),
+        _ext.fetched_at("yahoo", ("spy", sd)),
+    )
 
 
-@st.cache_data(ttl=120, show_spinner=False)
 def load_alpaca_portfolio():
-    return _dm.get_alpaca_portfolio()
+    return _ext.swr_call(
+        "alpaca", "portfolio",
+        lambda: _dm.get_alpaca_portfolio(raise_errors=True),
+        ttl=120, default=None,
+    )
 
 
-@st.cache_data(ttl=120, show_spinner=False)
 def load_alpaca_positions():
-    return _dm.get_alpaca_positions()
+    return _ext.swr_call(
+        "alpaca", "positions",
+        lambda: _dm.get_alpaca_positions(raise_errors=True),
+        ttl=120, default=[],
+    )
 
 
+# ── キャッシュ付きデータ読み込み ──
 @st.cache_data(ttl=120, show_spinner=False)
 def load_positions_from_trades():
     return _dm.get_open_positions_from_trades()
@@ -210,11 +425,47 @@ def load_health_metrics():
     return _dm.get_pipeline_health_metrics(7)
 
 
+# ── ライブ更新: 監視テーブル → 無効化するキャッシュ ──
+LIVE_POLL_SEC = 15
+
+LIVE_TABLE_LOADERS = {
+    "system_runs": (load_pipeline_status, load_runs_timeline, load_health_metrics),
+    "signals": (load_pipeline_status, load_health_metrics),
+    "trades": (load_pipeline_status, load_health_metrics, load_positions_from_trades),
+}
+
+
+def invalidate_live_tables(tables: list[str]) -> None:
+    """変化したテーブルに依存するキャッシュだけを捨てる（他のキャッシュは残す）。"""
+    for loader in {fn for t in tables for fn in LIVE_TABLE_LOADERS.get(t, ())}:
+        loader.clear()
+
+
+def live_poller(key: str) -> None:
+    """ライブ更新のポーリング（run_every のフラグメントとして呼ぶ）。
+
+    変化がなければ stat 1回と小さなキャプション更新だけで終わる。
+    監視テーブルに変化があれば依存キャッシュだけを無効化してページを再実行する。
+    """
+    state_key = f"_live_signature_{key}"
+    current = _dm.get_live_signature()
+    changed = _dm.changed_live_tables(st.session_state.get(state_key), current)
+    st.session_state[state_key] = current
+
+    checked = time.strftime("%H:%M:%S")
+    st.caption(f"🟢 ライブ更新中 · {LIVE_POLL_SEC}秒ごとに確認 · 最終確認 {checked}")
+    if changed:
+        logger.info(f"ライブ更新: {', '.join(changed)} に変化")
+        invalidate_live_tables(changed)
+        st.rerun()
+
+
 def load_common_data():
     """全ページ共通のデータをまとめて読み込む"""
     start = _dm.PHASE3_START
     daily = load_daily(start)
     spy = load_spy(start)
+    source_version = equity_source_version(start)
     trades = _dm.get_trades(start)
     kpi = _dm.get_kpi_summary(start)
     verdict = _dm.get_go_nogo_verdict(kpi)
@@ -231,6 +482,7 @@ def load_common_data():
         "start": start,
         "daily": daily,
         "spy": spy,
+        "source_version": source_version,
         "trades": trades,
         "kpi": kpi,
         "verdict": verdict,
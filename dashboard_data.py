@@ -10,9 +10,16 @@ from __future__ import annotations
 import json
 import logging
 import os
+import pickle
+import re
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import urlparse
 
 import numpy as np
 import pandas as pd
@@ -102,20 +109,136 @@ def _connect():
     return conn
 
 
-def _build_ticker_theme_map() -> dict[str, str]:
-    """portfolio.json からティッカー → テーマの辞書を構築"""
+def get_db_version() -> tuple[int, int, int]:
+    """DB更新検知用のバージョントークンを返す。
+
+    DBファイルとWALファイルの (mtime_ns, size) から作るため、
+    sync_db.sh による差し替えや追記を検知できる。
+    空のWAL（接続の開閉だけで生成・削除される）は無視する。
+    """
     try:
-        with open(PORTFOLIO_CONFIG) as f:
-            config = json.load(f)
-        mapping = {}
-        for theme in config.get("monitoring_themes", []):
-            name = theme["name"]
-            for ticker in theme.get("tickers", []):
-                if ticker not in mapping:
-                    mapping[ticker] = name
-        return mapping
-    except Exception:
-        return {}
+        db_stat = DB_PATH.stat()
+    except OSError:
+        return (0, 0, 0)
+    mtime, wal_size = db_stat.st_mtime_ns, 0
+    try:
+        wal_stat = DB_PATH.with_name(DB_PATH.name + "-wal").stat()
+        if wal_stat.st_size > 0:
+            mtime = max(mtime, wal_stat.st_mtime_ns)
+            wal_size = wal_stat.st_size
+    except OSError:
+        pass
+    return (mtime, db_stat.st_size, wal_size)
+
+
+def _cache_db_path() -> Path:
+    """派生データ用サイドカーDBのパス（同期元DBの隣、環境変数で上書き可）。"""
+    env_path = os.getenv("DASHBOARD_CACHE_DB_PATH")
+    if env_path:
+        return Path(env_path).expanduser()
+    return DB_PATH.with_name(f"{DB_PATH.stem}.cache.db")
+
+
+def _connect_cache():
+    """サイドカーDBに接続する。
+
+    sync_db.sh は同期のたびに ai_investor.db を丸ごと差し替えるため、
+    ダッシュボードが作る派生テーブルはレプリカ本体ではなくこちらに置く。
+    """
+    conn = sqlite3.connect(str(_cache_db_path()), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+@dataclass(frozen=True)
+class PortfolioConfig:
+    """portfolio.json から事前計算したルックアップ一式。"""
+
+    version: tuple[int, int]
+    ticker_theme: dict[str, str]
+    ticker_tier: dict[str, str]
+    theme_tickers: dict[str, list[str]]
+    theme_dtype: pd.CategoricalDtype
+    tier_dtype: pd.CategoricalDtype
+    raw: dict = field(default_factory=dict)
+
+
+# (version, config)
+_portfolio_config_cache: tuple[tuple[int, int], PortfolioConfig] | None = None
+_portfolio_config_lock = threading.Lock()
+
+
+def _parse_portfolio_config(config: dict, version: tuple[int, int]) -> PortfolioConfig:
+    themes = sorted(
+        config.get("monitoring_themes", []),
+        key=lambda t: (t.get("priority", 999), t.get("name", "")),
+    )
+    theme_tickers: dict[str, list[str]] = {}
+    ticker_theme: dict[str, str] = {}
+    for theme in themes:
+        name = theme["name"]
+        tickers = list(theme.get("tickers", []))
+        theme_tickers[name] = tickers
+        for ticker in tickers:
+            # 複数テーマに属する場合は優先度の高いテーマを採用
+            ticker_theme.setdefault(ticker, name)
+
+    # tier_config: tickers を持つ tier は明示指定、持たない tier は残りの監視銘柄
+    ticker_tier: dict[str, str] = {}
+    tier_names = list(config.get("tier_config", {}))
+    catch_all = None
+    for tier_name, tier in config.get("tier_config", {}).items():
+        if "tickers" in tier:
+            for ticker in tier["tickers"]:
+                ticker_tier.setdefault(ticker, tier_name)
+        elif catch_all is None:
+            catch_all = tier_name
+    if catch_all is not None:
+        for ticker in ticker_theme:
+            ticker_tier.setdefault(ticker, catch_all)
+
+    return PortfolioConfig(
+        version=version,
+        ticker_theme=ticker_theme,
+        ticker_tier=ticker_tier,
+        theme_tickers=theme_tickers,
+        theme_dtype=pd.CategoricalDtype(list(theme_tickers) + ["Unknown"], ordered=True),
+        tier_dtype=pd.CategoricalDtype(tier_names, ordered=True),
+        raw=config,
+    )
+
+
+def get_portfolio_config() -> PortfolioConfig:
+    """portfolio.json のキャッシュ済みルックアップを返す。
+
+    ファイルの (mtime_ns, size) が変わったときだけ再パースするため、
+    portfolio.json の編集は再起動なしで次の呼び出しから反映される。
+    """
+    global _portfolio_config_cache
+    try:
+        st_ = PORTFOLIO_CONFIG.stat()
+        version = (st_.st_mtime_ns, st_.st_size)
+    except OSError:
+        version = (0, 0)
+
+    cached = _portfolio_config_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _portfolio_config_lock:
+        cached = _portfolio_config_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        try:
+            with open(PORTFOLIO_CONFIG) as f:
+                config = json.load(f)
+        except Exception as e:
+            logger.warning(f"portfolio.json 読み込みエラー: {e}")
+            config = {}
+        parsed = _parse_portfolio_config(config, version)
+        _portfolio_config_cache = (version, parsed)
+        return parsed
 
 
 INITIAL_CAPITAL = 100_000.0
@@ -126,9 +249,14 @@ INITIAL_CAPITAL = 100_000.0
 # ============================================================
 
 
-def build_daily_portfolio(start_date: str = PHASE3_START) -> pd.DataFrame:
+def build_daily_portfolio(
+    start_date: str = PHASE3_START, raise_errors: bool = False
+) -> pd.DataFrame:
     """トレード履歴と市場価格から日次の資産推移を再構築する。
 
+    Args:
+        raise_errors: True なら価格取得の失敗を握りつぶさず送出する
+
     Returns:
         DataFrame with columns:
             date, cash, equity, total, daily_change, daily_change_pct,
@@ -225,6 +353,8 @@ def build_daily_portfolio(start_date: str = PHASE3_START) -> pd.DataFrame:
                     if ticker in raw["Close"].columns:
                         price_data[ticker] = raw["Close"][ticker]
         except Exception as e:
+            if raise_errors:
+                raise
             logger.warning(f"価格データ取得エラー: {e}")
 
     # --- 日次ポートフォリオ計算 ---
@@ -314,9 +444,14 @@ def build_daily_portfolio(start_date: str = PHASE3_START) -> pd.DataFrame:
 # ============================================================
 
 
-def get_spy_benchmark(start_date: str = PHASE3_START) -> pd.DataFrame:
+def get_spy_benchmark(
+    start_date: str = PHASE3_START, raise_errors: bool = False
+) -> pd.DataFrame:
     """SPYの日次推移を取得し、初期資本ベースに正規化する。
 
+    Args:
+        raise_errors: True なら取得失敗を握りつぶさず送出する
+
     Returns:
         DataFrame with columns: date, spy_total
         spy_total は INITIAL_CAPITAL を基準に正規化した値
@@ -351,6 +486,8 @@ def get_spy_benchmark(start_date: str = PHASE3_START) -> pd.DataFrame:
         df["date"] = df["date"].dt.normalize()
         return df
     except Exception:
+        if raise_errors:
+            raise
         return pd.DataFrame()
 
 
@@ -458,24 +595,19 @@ def get_kpi_summary(start_date: str = PHASE3_START) -> dict:
 def _calc_max_drawdown(
     conn: sqlite3.Connection, start_date: str, trades_df: pd.DataFrame
 ) -> float:
-    """portfolio_snapshotsから最大ドローダウンを計算。データがなければトレードから推定"""
-    snapshots = pd.read_sql_query(
-        "SELECT timestamp, total_value FROM portfolio_snapshots "
-        "WHERE timestamp >= ? ORDER BY timestamp",
-        conn,
-        params=[start_date],
-    )
-    if len(snapshots) >= 2:
-        values = snapshots["total_value"].values
-        peak = values[0]
-        max_dd = 0.0
-        for v in values:
-            if v > peak:
-                peak = v
-            dd = (peak - v) / peak * 100 if peak > 0 else 0
-            if dd > max_dd:
-                max_dd = dd
-        return max_dd
+    """portfolio_snapshotsから最大ドローダウンを計算。データがなければトレードから推定
+
+    圧縮済みの日次行（portfolio_snapshots_daily）と生データの両方を読み、
+    生データだけで計算した場合と同じ値を返す。
+    """
+    daily, raw = _read_snapshot_tiers(conn, start_date)
+    if int(daily["samples"].sum()) + len(raw) >= 2:
+        pairs = [
+            np.asarray(json.loads(p), dtype=float).reshape(-1, 2)
+            for p in daily["dd_pairs"]
+        ]
+        pairs.append(drawdown_pairs(raw["total_value"].to_numpy(dtype=float)))
+        return max_drawdown_pct(np.concatenate(pairs))
 
     # フォールバック: トレードの累積損益からDD推定
     if len(trades_df) == 0:
@@ -590,36 +722,133 @@ def get_manual_holdings() -> list[dict]:
 
 def _get_secret(name: str, default: str = "") -> str:
     """Streamlit secrets → 環境変数 の優先順でシークレットを取得"""
+    return _get_secrets(name, default=default)[0]
+
+
+def _get_secrets(*names: str, default: str = "") -> tuple[str, ...]:
+    """複数のシークレットをまとめて取得（Streamlit secrets の読み込み・探索は1回だけ）"""
+    secrets: dict = {}
     try:
         import streamlit as st
 
-        if hasattr(st, "secrets") and name in st.secrets:
-            return str(st.secrets[name])
+        if hasattr(st, "secrets"):
+            secrets = st.secrets.to_dict()
     except Exception:
         pass
-    return os.getenv(name, default)
+    return tuple(str(secrets[n]) if n in secrets else os.getenv(n, default) for n in names)
+
+
+# Alpaca HTTP タイムアウト（接続, 読み取り）秒
+ALPACA_CONNECT_TIMEOUT = 3.05
+ALPACA_READ_TIMEOUT = 10.0
+
+# 認証情報タプル → TradingClient（プロセス全体で共有）
+_alpaca_clients: dict[tuple[str, str, str, str], object] = {}
+_alpaca_clients_lock = threading.Lock()
+
+# エンドポイント別レイテンシ統計（"GET /v2/account" → stats）
+_alpaca_latency: dict[str, dict] = {}
+_alpaca_latency_lock = threading.Lock()
+
+
+def _record_alpaca_latency(endpoint: str, elapsed_ms: float, ok: bool) -> None:
+    with _alpaca_latency_lock:
+        stats = _alpaca_latency.setdefault(
+            endpoint,
+            {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0},
+        )
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["last_ms"] = elapsed_ms
+        if not ok:
+            stats["errors"] += 1
+
+
+def _instrument_alpaca_session(client) -> None:
+    """クライアントのHTTPセッションに既定タイムアウトとレイテンシ計測を組み込む。
+
+    セッション自体は使い回されるため、2回目以降のリクエストは
+    keep-alive 済みのコネクションを再利用する（TLSハンドシェイク不要）。
+    """
+    session = client._session
+    original_request = session.request
+
+    def _request(method, url, **kwargs):
+        kwargs.setdefault("timeout", (ALPACA_CONNECT_TIMEOUT, ALPACA_READ_TIMEOUT))
+        endpoint = f"{method.upper()} {urlparse(url).path}"
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            response = original_request(method, url, **kwargs)
+            ok = response.status_code < 400
+            return response
+        finally:
+            _record_alpaca_latency(endpoint, (time.perf_counter() - t0) * 1000, ok)
+
+    session.request = _request
 
 
 def _get_alpaca_client():
-    """Alpaca TradingClient を取得（シングルトン的にキャッシュ）"""
-    try:
-        from alpaca.trading.client import TradingClient
+    """Alpaca TradingClient を取得（認証情報ごとにプロセス全体でキャッシュ）"""
+    key, secret, base_url, url_override = _get_secrets(
+        "ALPACA_API_KEY", "ALPACA_SECRET_KEY", "ALPACA_BASE_URL", "ALPACA_URL_OVERRIDE"
+    )
+    if not key or not secret:
+        return None
+
+    cache_key = (key, secret, base_url, url_override)
+    client = _alpaca_clients.get(cache_key)
+    if client is not None:
+        return client
 
-        key = _get_secret("ALPACA_API_KEY")
-        secret = _get_secret("ALPACA_SECRET_KEY")
-        base_url = _get_secret("ALPACA_BASE_URL")
-        if not key or not secret:
+    with _alpaca_clients_lock:
+        client = _alpaca_clients.get(cache_key)
+        if client is not None:
+            return client
+        try:
+            from alpaca.trading.client import TradingClient
+
+            is_paper = "paper" in base_url.lower() if base_url else True
+            client = TradingClient(
+                api_key=key,
+                secret_key=secret,
+                paper=is_paper,
+                url_override=url_override or None,
+            )
+            _instrument_alpaca_session(client)
+        except Exception as e:
+            logger.warning(f"Alpaca client init failed: {e}")
             return None
-        is_paper = "paper" in base_url.lower() if base_url else True
-        return TradingClient(api_key=key, secret_key=secret, paper=is_paper)
-    except Exception as e:
-        logger.warning(f"Alpaca client init failed: {e}")
-        return None
+        _alpaca_clients[cache_key] = client
+        return client
+
 
+def get_alpaca_latency_stats() -> dict[str, dict]:
+    """Alpaca API のエンドポイント別レイテンシ統計を返す。
 
-def get_alpaca_portfolio() -> dict | None:
+    Returns:
+        {"GET /v2/account": {count, errors, avg_ms, max_ms, last_ms}, ...}
+    """
+    with _alpaca_latency_lock:
+        return {
+            endpoint: {
+                "count": s["count"],
+                "errors": s["errors"],
+                "avg_ms": round(s["total_ms"] / s["count"], 1) if s["count"] else 0.0,
+                "max_ms": round(s["max_ms"], 1),
+                "last_ms": round(s["last_ms"], 1),
+            }
+            for endpoint, s in _alpaca_latency.items()
+        }
+
+
+def get_alpaca_portfolio(raise_errors: bool = False) -> dict | None:
     """Alpaca APIからリアルタイムのポートフォリオ情報を取得。
 
+    Args:
+        raise_errors: True ならAPIエラーを握りつぶさず送出する
+
     Returns:
         dict with keys: portfolio_value, cash, equity, buying_power
         or None if API is unavailable
@@ -636,13 +865,18 @@ def get_alpaca_portfolio() -> dict | None:
             "buying_power": float(account.buying_power),
         }
     except Exception as e:
+        if raise_errors:
+            raise
         logger.warning(f"Alpaca account fetch failed: {e}")
         return None
 
 
-def get_alpaca_positions() -> list[dict]:
+def get_alpaca_positions(raise_errors: bool = False) -> list[dict]:
     """Alpaca APIからリアルタイムのポジション情報を取得。
 
+    Args:
+        raise_errors: True ならAPIエラーを握りつぶさず送出する
+
     Returns:
         list of dicts with keys: ticker, shares, entry_price, current_price,
         market_value, unrealized_pnl, unrealized_pnl_pct
@@ -667,66 +901,305 @@ def get_alpaca_positions() -> list[dict]:
             )
         return result
     except Exception as e:
+        if raise_errors:
+            raise
         logger.warning(f"Alpaca positions fetch failed: {e}")
         return []
 
 
+# ============================================================
+# 最新価格プロバイダ（yfinance 一括取得 + ローカルキャッシュ）
+# ============================================================
+
+# 最新価格キャッシュの鮮度（秒）
+PRICE_CACHE_TTL = 120
+
+# ticker → (price, fetched_at)
+_price_cache: dict[str, tuple[float, float]] = {}
+_price_cache_lock = threading.Lock()
+
+
+def get_latest_prices(
+    tickers: list[str], max_age: float = PRICE_CACHE_TTL
+) -> dict[str, float]:
+    """複数ティッカーの最新終値を1回のリクエストでまとめて取得する。
+
+    キャッシュが max_age 秒以内のティッカーはネットワークに出ない。
+    Yahoo のサーキットが open の間は取得せず、手元のキャッシュ（古くても）を返す。
+
+    Returns:
+        ticker → price（取得できなかったティッカーは含まない）
+    """
+    import external_calls as _ext
+
+    wanted = sorted({t for t in tickers if t})
+    now = time.time()
+    with _price_cache_lock:
+        cached = {t: _price_cache[t] for t in wanted if t in _price_cache}
+    prices = {t: p for t, (p, at) in cached.items() if now - at < max_age}
+    missing = [t for t in wanted if t not in prices]
+    if not missing:
+        return prices
+
+    breaker = _ext.get_breaker("yahoo")
+    if not breaker.allow():
+        prices.update({t: cached[t][0] for t in missing if t in cached})
+        return prices
+
+    try:
+        raw = yf.download(
+            missing, period="5d", progress=False, auto_adjust=True, threads=True
+        )
+        close = raw["Close"] if len(raw) > 0 else pd.DataFrame()
+        if isinstance(close, pd.Series):
+            close = close.to_frame(missing[0])
+        last = close.ffill().iloc[-1].dropna() if len(close) > 0 else pd.Series()
+        fetched = {str(t): float(p) for t, p in last.items()}
+    except Exception as e:
+        logger.warning(f"最新価格の一括取得エラー: {e}")
+        breaker.record_failure(e)
+        fetched = {}
+    else:
+        if fetched:
+            breaker.record_success()
+        else:
+            breaker.record_failure("empty result")
+
+    with _price_cache_lock:
+        for t, p in fetched.items():
+            _price_cache[t] = (p, now)
+    prices.update(fetched)
+    # 取得に失敗したものは古いキャッシュで補う
+    prices.update({t: cached[t][0] for t in missing if t not in prices and t in cached})
+    return prices
+
+
 def get_open_positions_from_trades() -> list[dict]:
-    """tradesテーブルからOPENポジションを再構築（Alpaca API不可時のフォールバック）。"""
+    """tradesテーブルからOPENポジションを再構築（Alpaca API不可時のフォールバック）。
+
+    同一ティッカーの複数OPEN行は株数合計・加重平均取得単価に集約し、
+    現在値は get_latest_prices で一括取得する。
+    """
     with _connect() as conn:
         df = pd.read_sql_query(
             """
-            SELECT ticker, entry_price, shares
+            SELECT ticker,
+                   SUM(shares) AS shares,
+                   SUM(entry_price * shares) / SUM(shares) AS entry_price
             FROM trades
             WHERE status = 'OPEN' AND action = 'BUY'
+            GROUP BY ticker
+            HAVING SUM(shares) > 0
+            ORDER BY MIN(entry_timestamp)
             """,
             conn,
         )
     if len(df) == 0:
         return []
-    result = []
-    for _, row in df.iterrows():
-        ticker = row["ticker"]
-        entry = float(row["entry_price"])
-        shares = int(row["shares"])
-        try:
-            tk = yf.Ticker(ticker)
-            hist = tk.history(period="1d")
-            current = float(hist["Close"].iloc[-1]) if len(hist) > 0 else entry
-        except Exception:
-            current = entry
-        pnl = (current - entry) * shares
-        pnl_pct = ((current / entry) - 1) * 100 if entry > 0 else 0
-        result.append(
-            {
-                "ticker": ticker,
-                "shares": shares,
-                "entry_price": entry,
-                "current_price": current,
-                "market_value": current * shares,
-                "unrealized_pnl": pnl,
-                "unrealized_pnl_pct": pnl_pct,
-            }
+
+    prices = get_latest_prices(df["ticker"].tolist())
+    df["entry_price"] = df["entry_price"].astype(float)
+    df["shares"] = df["shares"].astype(int)
+    df["current_price"] = df["ticker"].map(prices).fillna(df["entry_price"])
+    df["market_value"] = df["current_price"] * df["shares"]
+    df["unrealized_pnl"] = (df["current_price"] - df["entry_price"]) * df["shares"]
+    df["unrealized_pnl_pct"] = np.where(
+        df["entry_price"] > 0, (df["current_price"] / df["entry_price"] - 1) * 100, 0.0
+    )
+    return df[
+        [
+            "ticker",
+            "shares",
+            "entry_price",
+            "current_price",
+            "market_value",
+            "unrealized_pnl",
+            "unrealized_pnl_pct",
+        ]
+    ].to_dict("records")
+
+
+# ============================================================
+# スナップショットの段階的保持（生データ + 日次OHLC）
+# ============================================================
+# 直近 SNAPSHOT_RAW_RETENTION_DAYS 日は portfolio_snapshots に生のまま残し、
+# それより古い日は snapshot_compaction.py が portfolio_snapshots_daily の1日1行に畳む。
+# 日次行は OHLC に加えて「日中の新高値ごとの (高値, その後の安値)」の組（dd_pairs）を
+# 持つので、最大ドローダウンは生データと同じ値を再現できる。
+
+SNAPSHOT_DAILY_TABLE = "portfolio_snapshots_daily"
+SNAPSHOT_RAW_RETENTION_DAYS = 14
+
+
+def drawdown_pairs(values: np.ndarray) -> np.ndarray:
+    """時系列を「新高値 → 次の新高値までの最安値」の組 (k, 2) に畳む。
+
+    ドローダウンはピークとその後の安値だけで決まるため、この組を時系列順に
+    つなげば元の系列と同じ最大ドローダウンが得られる（max_drawdown_pct）。
+    """
+    v = np.asarray(values, dtype=float)
+    v = v[~np.isnan(v)]
+    if len(v) == 0:
+        return np.empty((0, 2))
+    running = np.maximum.accumulate(v)
+    starts = np.flatnonzero(np.r_[True, v[1:] > running[:-1]])
+    return np.column_stack([v[starts], np.minimum.reduceat(v, starts)])
+
+
+def merge_drawdown_pairs(pairs: np.ndarray) -> np.ndarray:
+    """連結した組を畳み直す（新高値にならない組は直前の組の安値にまとめる）。"""
+    pairs = np.asarray(pairs, dtype=float).reshape(-1, 2)
+    if len(pairs) == 0:
+        return pairs
+    hi = pairs[:, 0]
+    running = np.maximum.accumulate(hi)
+    starts = np.flatnonzero(np.r_[True, hi[1:] > running[:-1]])
+    return np.column_stack([hi[starts], np.minimum.reduceat(pairs[:, 1], starts)])
+
+
+def max_drawdown_pct(pairs: np.ndarray) -> float:
+    """(高値, 安値) の組の列から最大ドローダウン（%）を求める。"""
+    pairs = np.asarray(pairs, dtype=float).reshape(-1, 2)
+    if len(pairs) == 0:
+        return 0.0
+    peak = np.maximum.accumulate(pairs[:, 0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, (peak - pairs[:, 1]) / peak * 100, 0.0)
+    return max(0.0, float(dd.max()))
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+        ).fetchone()
+        is not None
+    )
+
+
+def _read_snapshot_tiers(
+    conn: sqlite3.Connection, start_date: str
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """圧縮済みの日次行と生のスナップショットを読む（どちらも時系列順）。
+
+    Returns:
+        (daily, raw)
+        daily: date, open, high, low, close, cash, equity, samples, first_ts, last_ts, dd_pairs
+        raw: timestamp, total_value, cash_balance, equity_value（timestamp は文字列のまま）
+    """
+    if _has_table(conn, SNAPSHOT_DAILY_TABLE):
+        daily = pd.read_sql_query(
+            f"SELECT date, open, high, low, close, cash, equity, samples, "
+            f"first_ts, last_ts, dd_pairs FROM {SNAPSHOT_DAILY_TABLE} "
+            f"WHERE date >= date(?) ORDER BY date",
+            conn,
+            params=[start_date],
         )
-    return result
+    else:
+        daily = pd.DataFrame(
+            columns=["date", "open", "high", "low", "close", "cash", "equity",
+                     "samples", "first_ts", "last_ts", "dd_pairs"]
+        )
+    raw = pd.read_sql_query(
+        "SELECT timestamp, total_value, cash_balance, equity_value "
+        "FROM portfolio_snapshots WHERE timestamp >= ? ORDER BY timestamp",
+        conn,
+        params=[start_date],
+    )
+    return daily, raw
 
 
 def get_portfolio_snapshots(start_date: str = PHASE3_START) -> pd.DataFrame:
-    """ポートフォリオスナップショット時系列"""
+    """ポートフォリオスナップショット時系列
+
+    圧縮済みの期間は1日1行（その日の最後のスナップショット時刻・終値）になる。
+    """
     with _connect() as conn:
-        df = pd.read_sql_query(
-            """
-            SELECT timestamp, total_value, cash_balance, equity_value
-            FROM portfolio_snapshots
-            WHERE timestamp >= ?
-            ORDER BY timestamp
-            """,
-            conn,
-            params=[start_date],
+        daily, raw = _read_snapshot_tiers(conn, start_date)
+    if len(daily) > 0:
+        raw = pd.concat(
+            [
+                pd.DataFrame(
+                    {
+                        "timestamp": daily["last_ts"],
+                        "total_value": daily["close"],
+                        "cash_balance": daily["cash"],
+                        "equity_value": daily["equity"],
+                    }
+                ),
+                raw,
+            ],
+            ignore_index=True,
         )
-        if len(df) > 0:
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-        return df
+    df = raw
+    if len(df) > 0:
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    return df
+
+
+# スナップショットの足（表示名 → resample の rule）
+SNAPSHOT_RESOLUTIONS = {"5m": "5min", "1h": "1h", "1d": "1D"}
+
+# (start_date, resolution) → (db_version, bars)
+_snapshot_bars_cache: dict[tuple[str, str], tuple[tuple, pd.DataFrame]] = {}
+
+
+def build_snapshot_bars(snapshots: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """スナップショット（timestamp, total_value, cash_balance, equity_value）を足にまとめる。
+
+    total_value は OHLC、cash / equity は足の最後の値。スナップショットのない足
+    （夜間・休日）は出さない。
+
+    Returns:
+        DataFrame with columns:
+            timestamp (足の開始時刻), open, high, low, close, cash, equity, samples
+    """
+    columns = ["timestamp", "open", "high", "low", "close", "cash", "equity", "samples"]
+    if len(snapshots) == 0:
+        return pd.DataFrame(columns=columns)
+    rule = SNAPSHOT_RESOLUTIONS[resolution]
+    df = snapshots.dropna(subset=["timestamp", "total_value"]).set_index("timestamp")
+    grouped = df.resample(rule)
+    bars = grouped["total_value"].ohlc()
+    bars["cash"] = grouped["cash_balance"].last()
+    bars["equity"] = grouped["equity_value"].last()
+    bars["samples"] = grouped["total_value"].count()
+    bars = bars[bars["samples"] > 0]
+    bars.index.name = "timestamp"
+    return bars.reset_index()[columns]
+
+
+def get_snapshot_bars(resolution: str = "1h", start_date: str = PHASE3_START) -> pd.DataFrame:
+    """portfolio_snapshots から作る資産推移の足（5m / 1h / 1d）。
+
+    yfinance を使わずDBだけで日中の資産推移を出せる。足の種類ごとに
+    DBバージョンが変わるまで再計算しない。圧縮済みの期間は日足になる。
+    """
+    if resolution not in SNAPSHOT_RESOLUTIONS:
+        raise ValueError(f"unknown resolution: {resolution}")
+    version = get_db_version()
+    cached = _snapshot_bars_cache.get((start_date, resolution))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _connect() as conn:
+        daily, snapshots = _read_snapshot_tiers(conn, start_date)
+    snapshots["timestamp"] = pd.to_datetime(
+        snapshots["timestamp"], format="ISO8601", errors="coerce"
+    )
+    bars = build_snapshot_bars(snapshots, resolution)
+    if len(daily) > 0:
+        # 圧縮済みの期間はどの足でも1日1本
+        older = daily.rename(columns={"date": "timestamp"})
+        older["timestamp"] = pd.to_datetime(older["timestamp"])
+        bars = (
+            pd.concat([older[bars.columns], bars], ignore_index=True)
+            .sort_values("timestamp", kind="stable")
+            .reset_index(drop=True)
+        )
+    _snapshot_bars_cache[(start_date, resolution)] = (version, bars)
+    return bars
 
 
 # ============================================================
@@ -808,10 +1281,132 @@ def get_trade_summary(trades_df: pd.DataFrame) -> dict:
     }
 
 
-def get_trade_patterns(trades_df: pd.DataFrame) -> dict:
-    """テーマ別・戦略別・確信度別・曜日別のパターン分析"""
-    closed = trades_df[trades_df["status"] == "CLOSED"].copy()
+# トレード分析キューブの次元
+TRADE_CUBE_DIMS = [
+    "ticker",
+    "theme",
+    "strategy",
+    "conviction",
+    "weekday",
+    "exit_reason",
+    "engine",
+]
+
+_WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+# start_date → (db_version, cube)
+_trade_cube_cache: dict[str, tuple[tuple, pd.DataFrame]] = {}
+
+
+def build_trade_cube(trades_df: pd.DataFrame) -> pd.DataFrame:
+    """決済済みトレードを全次元の組み合わせで1回だけ集計する。
+
+    Returns:
+        DataFrame with columns: TRADE_CUBE_DIMS +
+            trades, wins, pnl_sum, return_sum, return_count,
+            holding_days_sum, holding_days_count
+        （平均値は rollup_trade_cube で再計算できるよう和と件数で保持）
+    """
+    measures = [
+        "trades",
+        "wins",
+        "pnl_sum",
+        "return_sum",
+        "return_count",
+        "holding_days_sum",
+        "holding_days_count",
+    ]
+    if len(trades_df) == 0 or "status" not in trades_df.columns:
+        return pd.DataFrame(columns=TRADE_CUBE_DIMS + measures)
+    closed = trades_df[trades_df["status"] == "CLOSED"]
     if len(closed) == 0:
+        return pd.DataFrame(columns=TRADE_CUBE_DIMS + measures)
+
+    config = get_portfolio_config()
+    pnl = closed["profit_loss"]
+    ret = closed["profit_loss_pct"]
+    hold = closed["holding_days"]
+    base = pd.DataFrame(
+        {
+            "ticker": closed["ticker"],
+            "theme": closed["ticker"]
+            .map(config.ticker_theme)
+            .fillna("Unknown")
+            .astype(config.theme_dtype),
+            "strategy": closed["strategy_used"].fillna("N/A"),
+            "conviction": closed["conviction"],
+            "weekday": pd.to_datetime(
+                closed["entry_timestamp"], format="ISO8601", errors="coerce"
+            ).dt.day_name(),
+            "exit_reason": closed["exit_reason"],
+            "engine": closed["engine"] if "engine" in closed.columns else None,
+            "trades": 1,
+            "wins": (pnl > 0).astype(int),
+            "pnl_sum": pnl.fillna(0.0),
+            "return_sum": ret.fillna(0.0),
+            "return_count": ret.notna().astype(int),
+            "holding_days_sum": hold.fillna(0.0),
+            "holding_days_count": hold.notna().astype(int),
+        }
+    )
+    return base.groupby(
+        TRADE_CUBE_DIMS, dropna=False, observed=True, as_index=False
+    )[measures].sum()
+
+
+def get_trade_cube(start_date: str = PHASE3_START) -> pd.DataFrame:
+    """トレード分析キューブ（DBバージョンが変わるまで再計算しない）。"""
+    version = (get_db_version(), get_portfolio_config().version)
+    cached = _trade_cube_cache.get(start_date)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    cube = build_trade_cube(get_trades(start_date))
+    _trade_cube_cache[start_date] = (version, cube)
+    return cube
+
+
+def rollup_trade_cube(
+    cube: pd.DataFrame, dims: list[str], dropna: bool = True
+) -> pd.DataFrame:
+    """キューブを指定次元に畳み込む（groupbyは集計済みの小さい表に対してのみ）。
+
+    Returns:
+        DataFrame with columns: dims + trades, wins, win_rate, total_pnl,
+        avg_return, avg_holding_days
+    """
+    cols = dims + ["trades", "wins", "win_rate", "total_pnl", "avg_return", "avg_holding_days"]
+    if len(cube) == 0:
+        return pd.DataFrame(columns=cols)
+    agg = cube.groupby(dims, dropna=dropna, observed=True, as_index=False)[
+        [
+            "trades",
+            "wins",
+            "pnl_sum",
+            "return_sum",
+            "return_count",
+            "holding_days_sum",
+            "holding_days_count",
+        ]
+    ].sum()
+    agg["win_rate"] = (agg["wins"] / agg["trades"] * 100).round(1)
+    agg["total_pnl"] = agg["pnl_sum"].round(2)
+    agg["avg_return"] = (agg["return_sum"] / agg["return_count"]).round(2)
+    agg["avg_holding_days"] = (
+        agg["holding_days_sum"] / agg["holding_days_count"]
+    ).round(1)
+    return agg[cols]
+
+
+def get_trade_patterns(
+    trades_df: pd.DataFrame | None = None, cube: pd.DataFrame | None = None
+) -> dict:
+    """テーマ別・戦略別・確信度別・曜日別のパターン分析
+
+    cube を渡せばトレード明細を再集計せず、キューブのロールアップだけで答える。
+    """
+    if cube is None:
+        cube = build_trade_cube(trades_df if trades_df is not None else pd.DataFrame())
+    if len(cube) == 0:
         return {
             "by_theme": {},
             "by_strategy": {},
@@ -819,65 +1414,26 @@ def get_trade_patterns(trades_df: pd.DataFrame) -> dict:
             "by_weekday": {},
         }
 
-    theme_map = _build_ticker_theme_map()
-    closed["theme"] = closed["ticker"].map(theme_map).fillna("Unknown")
-
-    # テーマ別
-    by_theme = {}
-    for theme, grp in closed.groupby("theme"):
-        wins = len(grp[grp["profit_loss"] > 0])
-        by_theme[theme] = {
-            "trades": len(grp),
-            "win_rate": round(wins / len(grp) * 100, 1),
-            "avg_return": round(grp["profit_loss_pct"].mean(), 2),
-            "total_pnl": round(grp["profit_loss"].sum(), 2),
-        }
-
-    # 戦略別
-    by_strategy = {}
-    for strategy, grp in closed.groupby("strategy_used"):
-        if pd.isna(strategy):
-            strategy = "N/A"
-        wins = len(grp[grp["profit_loss"] > 0])
-        by_strategy[strategy] = {
-            "trades": len(grp),
-            "win_rate": round(wins / len(grp) * 100, 1),
-            "avg_return": round(grp["profit_loss_pct"].mean(), 2),
-            "total_pnl": round(grp["profit_loss"].sum(), 2),
-        }
-
-    # 確信度(Conviction)別
-    by_conviction = {}
-    conv_col = closed["conviction"].dropna()
-    if len(conv_col) > 0:
-        for conv, grp in closed.dropna(subset=["conviction"]).groupby("conviction"):
-            wins = len(grp[grp["profit_loss"] > 0])
-            by_conviction[int(conv)] = {
-                "trades": len(grp),
-                "win_rate": round(wins / len(grp) * 100, 1),
-                "avg_return": round(grp["profit_loss_pct"].mean(), 2),
-            }
-
-    # 曜日別
-    by_weekday = {}
-    closed["entry_timestamp"] = pd.to_datetime(closed["entry_timestamp"])
-    closed["weekday"] = closed["entry_timestamp"].dt.day_name()
-    weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-    for wd in weekday_order:
-        grp = closed[closed["weekday"] == wd]
-        if len(grp) > 0:
-            wins = len(grp[grp["profit_loss"] > 0])
-            by_weekday[wd] = {
-                "trades": len(grp),
-                "win_rate": round(wins / len(grp) * 100, 1),
-                "avg_return": round(grp["profit_loss_pct"].mean(), 2),
+    def _to_dict(dim: str, with_pnl: bool) -> dict:
+        out = {}
+        for r in rollup_trade_cube(cube, [dim]).to_dict("records"):
+            item = {
+                "trades": int(r["trades"]),
+                "win_rate": r["win_rate"],
+                "avg_return": r["avg_return"],
             }
+            if with_pnl:
+                item["total_pnl"] = r["total_pnl"]
+            out[r[dim]] = item
+        return out
 
+    by_conviction = {int(k): v for k, v in _to_dict("conviction", False).items()}
+    weekday = _to_dict("weekday", False)
     return {
-        "by_theme": by_theme,
-        "by_strategy": by_strategy,
+        "by_theme": _to_dict("theme", True),
+        "by_strategy": _to_dict("strategy", True),
         "by_conviction": by_conviction,
-        "by_weekday": by_weekday,
+        "by_weekday": {wd: weekday[wd] for wd in _WEEKDAY_ORDER if wd in weekday},
     }
 
 
@@ -1529,8 +2085,167 @@ def get_news_signal_connection(days: int = 14) -> dict:
 # ============================================================
 
 
+# activity_calendar の列 → (ソーステーブル, 日付カラム)。rowid で増分集計する
+_CALENDAR_SOURCES = {
+    "news": ("news", "created_at"),
+    "analysis": ("ai_analysis", "analyzed_at"),
+    "signals": ("signals", "detected_at"),
+    "runs": ("system_runs", "started_at"),
+}
+
+_calendar_version: tuple | None = None
+_calendar_lock = threading.Lock()
+
+
+def _ensure_calendar_schema(cache: sqlite3.Connection) -> None:
+    cache.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS activity_calendar (
+            date TEXT PRIMARY KEY,
+            news INTEGER NOT NULL DEFAULT 0,
+            analysis INTEGER NOT NULL DEFAULT 0,
+            signals INTEGER NOT NULL DEFAULT 0,
+            trades INTEGER NOT NULL DEFAULT 0,
+            runs INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS activity_calendar_watermarks (
+            source TEXT PRIMARY KEY,
+            last_rowid INTEGER NOT NULL,
+            last_ts TEXT
+        );
+        """
+    )
+
+
+def _watermarks_stale(
+    src: sqlite3.Connection,
+    marks: dict[str, tuple[int, str | None]],
+    sources: dict[str, tuple[str, str]],
+) -> bool:
+    """記録済みの rowid ウォーターマークが同期元DBと食い違っていれば True。
+
+    ソースの過不足、または記録した rowid の行のタイムスタンプが変わっている
+    （DB差し替え・VACUUMで rowid が振り直された等）場合は作り直しが必要。
+    """
+    if set(marks) != set(sources):
+        return True
+    for key, (table, ts_col) in sources.items():
+        last_rowid, last_ts = marks[key]
+        if last_rowid == 0:
+            continue
+        row = src.execute(
+            f"SELECT {ts_col} FROM {table} WHERE rowid = ?", (last_rowid,)
+        ).fetchone()
+        if row is None or row[0] != last_ts:
+            return True
+    return False
+
+
+def _refresh_activity_calendar() -> None:
+    """activity_calendar を同期元DBに追いつかせる。
+
+    - DBバージョンが前回と同じなら何もしない（stat 1回）
+    - news / ai_analysis / signals / system_runs は前回の rowid 以降だけを集計
+    - trades は決済で exit_timestamp が後から埋まるため毎回全件（小さい表）
+    - 記録した rowid の行のタイムスタンプが変わっていれば（DB差し替え・VACUUMで
+      rowid が振り直された等）全件から作り直す
+    """
+    global _calendar_version
+    version = get_db_version()
+    if _calendar_version == version:
+        return
+    with _calendar_lock:
+        if _calendar_version == version:
+            return
+        with _connect() as src, _connect_cache() as cache:
+            _ensure_calendar_schema(cache)
+            marks = {
+                r["source"]: (r["last_rowid"], r["last_ts"])
+                for r in cache.execute(
+                    "SELECT source, last_rowid, last_ts FROM activity_calendar_watermarks"
+                )
+            }
+
+            if _watermarks_stale(src, marks, _CALENDAR_SOURCES):
+                cache.execute("DELETE FROM activity_calendar")
+                cache.execute("DELETE FROM activity_calendar_watermarks")
+                marks = {}
+
+            for col, (table, ts_col) in _CALENDAR_SOURCES.items():
+                last_rowid = marks.get(col, (0, None))[0]
+                rows = src.execute(
+                    f"SELECT date({ts_col}) AS d, COUNT(*) AS cnt FROM {table} "
+                    f"WHERE rowid > ? GROUP BY d",
+                    (last_rowid,),
+                ).fetchall()
+                cache.executemany(
+                    f"INSERT INTO activity_calendar (date, {col}) VALUES (?, ?) "
+                    f"ON CONFLICT(date) DO UPDATE SET {col} = {col} + excluded.{col}",
+                    [(r["d"], r["cnt"]) for r in rows if r["d"]],
+                )
+                tail = src.execute(
+                    f"SELECT rowid, {ts_col} FROM {table} ORDER BY rowid DESC LIMIT 1"
+                ).fetchone()
+                cache.execute(
+                    "INSERT OR REPLACE INTO activity_calendar_watermarks "
+                    "(source, last_rowid, last_ts) VALUES (?, ?, ?)",
+                    (col, tail[0] if tail else 0, tail[1] if tail else None),
+                )
+
+            # 取引: エントリー日・決済日のどちらかに該当する件数（同日は1件）
+            trade_rows = src.execute(
+                """
+                SELECT d, COUNT(*) AS cnt FROM (
+                    SELECT rowid AS rid, date(entry_timestamp) AS d FROM trades
+                    UNION
+                    SELECT rowid, date(exit_timestamp) FROM trades
+                ) WHERE d IS NOT NULL GROUP BY d
+                """
+            ).fetchall()
+            cache.execute("UPDATE activity_calendar SET trades = 0")
+            cache.executemany(
+                "INSERT INTO activity_calendar (date, trades) VALUES (?, ?) "
+                "ON CONFLICT(date) DO UPDATE SET trades = excluded.trades",
+                [(r["d"], r["cnt"]) for r in trade_rows],
+            )
+            cache.execute(
+                "DELETE FROM activity_calendar "
+                "WHERE news + analysis + signals + trades + runs = 0"
+            )
+        _calendar_version = version
+
+
+def get_activity_calendar(limit: int | None = None) -> pd.DataFrame:
+    """日付ごとの件数表（降順）。
+
+    Returns:
+        DataFrame with columns: date, news, analysis, signals, trades, runs
+    """
+    _refresh_activity_calendar()
+    with _connect_cache() as cache:
+        return pd.read_sql_query(
+            "SELECT date, news, analysis, signals, trades, runs "
+            "FROM activity_calendar ORDER BY date DESC LIMIT ?",
+            cache,
+            params=(limit if limit is not None else -1,),
+        )
+
+
 def get_available_log_dates(limit: int = 180) -> list[str]:
     """ログが存在する日付の一覧を返す（降順）。"""
+    try:
+        _refresh_activity_calendar()
+        with _connect_cache() as cache:
+            rows = cache.execute(
+                "SELECT date FROM activity_calendar "
+                "WHERE news + analysis + signals + runs > 0 "
+                "ORDER BY date DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [r["date"] for r in rows]
+    except sqlite3.Error as e:
+        logger.warning(f"activity_calendar 利用不可、直接集計にフォールバック: {e}")
+
     with _connect() as conn:
         rows = conn.execute(
             """
@@ -1553,17 +2268,33 @@ def get_available_log_dates(limit: int = 180) -> list[str]:
 
 def get_data_latest_dates() -> dict[str, str]:
     """主要テーブルの最新データ日付を返す。"""
-    with _connect() as conn:
-        row = conn.execute(
-            """
-            SELECT
-                (SELECT max(date(created_at)) FROM news) as news,
-                (SELECT max(date(analyzed_at)) FROM ai_analysis) as analysis,
-                (SELECT max(date(detected_at)) FROM signals) as signals,
-                (SELECT max(date(started_at)) FROM system_runs) as runs,
-                (SELECT max(date(coalesce(exit_timestamp, entry_timestamp))) FROM trades) as trades
-            """
-        ).fetchone()
+    try:
+        _refresh_activity_calendar()
+        with _connect_cache() as cache:
+            row = cache.execute(
+                """
+                SELECT
+                    max(CASE WHEN news > 0 THEN date END) as news,
+                    max(CASE WHEN analysis > 0 THEN date END) as analysis,
+                    max(CASE WHEN signals > 0 THEN date END) as signals,
+                    max(CASE WHEN runs > 0 THEN date END) as runs,
+                    max(CASE WHEN trades > 0 THEN date END) as trades
+                FROM activity_calendar
+                """
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"activity_calendar 利用不可、直接集計にフォールバック: {e}")
+        with _connect() as conn:
+            row = conn.execute(
+                """
+                SELECT
+                    (SELECT max(date(created_at)) FROM news) as news,
+                    (SELECT max(date(analyzed_at)) FROM ai_analysis) as analysis,
+                    (SELECT max(date(detected_at)) FROM signals) as signals,
+                    (SELECT max(date(started_at)) FROM system_runs) as runs,
+                    (SELECT max(date(coalesce(exit_timestamp, entry_timestamp))) FROM trades) as trades
+                """
+            ).fetchone()
 
     dates = {
         "news": row["news"] or "",
@@ -1576,12 +2307,21 @@ def get_data_latest_dates() -> dict[str, str]:
     return dates
 
 
+def _id_placeholders(ids: list[int]) -> tuple[str, list[int]]:
+    """IN句用のプレースホルダ文字列と整数化したパラメータを返す。"""
+    clean = [int(i) for i in dict.fromkeys(ids)]
+    return ",".join("?" * len(clean)), clean
+
+
 def get_log_news(target_date: str, limit: int = 200) -> pd.DataFrame:
-    """指定日のニュース一覧（全カラム）。"""
+    """指定日のニュース一覧（本文を除く軽量カラム + id）。
+
+    本文は get_log_news_detail(ids) で行を開いたときに取得する。
+    """
     with _connect() as conn:
         return pd.read_sql_query(
             """
-            SELECT title, content, source, url, published_at,
+            SELECT rowid AS id, title, source, url, published_at,
                    sentiment_score, quality_score, importance,
                    theme, tickers_json, created_at
             FROM news
@@ -1593,14 +2333,33 @@ def get_log_news(target_date: str, limit: int = 200) -> pd.DataFrame:
         )
 
 
+def get_log_news_detail(ids: list[int]) -> pd.DataFrame:
+    """ニュースの本文を id 指定で取得する。
+
+    Returns:
+        DataFrame with columns: id, title, content, url
+    """
+    if not ids:
+        return pd.DataFrame(columns=["id", "title", "content", "url"])
+    marks, params = _id_placeholders(ids)
+    with _connect() as conn:
+        return pd.read_sql_query(
+            f"SELECT rowid AS id, title, content, url FROM news WHERE rowid IN ({marks})",
+            conn,
+            params=params,
+        )
+
+
 def get_log_analyses(target_date: str) -> pd.DataFrame:
-    """指定日のAI分析一覧（全カラム）。"""
+    """指定日のAI分析一覧（詳細テキストを除く軽量カラム + id）。
+
+    詳細は get_log_analyses_detail(ids) で行を開いたときに取得する。
+    """
     with _connect() as conn:
         return pd.read_sql_query(
             """
-            SELECT theme, ticker, analysis_type, score, direction,
-                   summary, detailed_analysis, key_points_json,
-                   recommendation, tickers_analyzed_json,
+            SELECT rowid AS id, theme, ticker, analysis_type, score, direction,
+                   summary, recommendation, tickers_analyzed_json,
                    news_count, model_used, analyzed_at
             FROM ai_analysis
             WHERE date(analyzed_at) = ?
@@ -1611,15 +2370,38 @@ def get_log_analyses(target_date: str) -> pd.DataFrame:
         )
 
 
+def get_log_analyses_detail(ids: list[int]) -> pd.DataFrame:
+    """AI分析の詳細テキストを id 指定で取得する。
+
+    Returns:
+        DataFrame with columns: id, summary, detailed_analysis, key_points_json
+    """
+    if not ids:
+        return pd.DataFrame(
+            columns=["id", "summary", "detailed_analysis", "key_points_json"]
+        )
+    marks, params = _id_placeholders(ids)
+    with _connect() as conn:
+        return pd.read_sql_query(
+            "SELECT rowid AS id, summary, detailed_analysis, key_points_json "
+            f"FROM ai_analysis WHERE rowid IN ({marks})",
+            conn,
+            params=params,
+        )
+
+
 def get_log_signals(target_date: str) -> pd.DataFrame:
-    """指定日のシグナル一覧（全カラム）。"""
+    """指定日のシグナル一覧（判断理由を除く軽量カラム + id）。
+
+    判断理由は get_log_signals_detail(ids) で行を開いたときに取得する。
+    """
     with _connect() as conn:
         return pd.read_sql_query(
             """
-            SELECT ticker, signal_type, detected_at, price,
+            SELECT rowid AS id, ticker, signal_type, detected_at, price,
                    rsi, macd, macd_signal, ma200, volume_ratio,
                    confidence, conviction, target_price, stop_loss,
-                   status, reasoning, decision_factors_json
+                   status
             FROM signals
             WHERE date(detected_at) = ?
             ORDER BY detected_at DESC
@@ -1629,6 +2411,26 @@ def get_log_signals(target_date: str) -> pd.DataFrame:
         )
 
 
+def get_log_signals_detail(ids: list[int]) -> pd.DataFrame:
+    """シグナルの判断理由を id 指定で取得する。
+
+    Returns:
+        DataFrame with columns: id, ticker, reasoning, decision_factors_json
+    """
+    if not ids:
+        return pd.DataFrame(
+            columns=["id", "ticker", "reasoning", "decision_factors_json"]
+        )
+    marks, params = _id_placeholders(ids)
+    with _connect() as conn:
+        return pd.read_sql_query(
+            "SELECT rowid AS id, ticker, reasoning, decision_factors_json "
+            f"FROM signals WHERE rowid IN ({marks})",
+            conn,
+            params=params,
+        )
+
+
 def get_log_trades(target_date: str) -> pd.DataFrame:
     """指定日の取引一覧。"""
     with _connect() as conn:
@@ -1667,6 +2469,20 @@ def get_log_system_runs(target_date: str) -> pd.DataFrame:
 
 def get_log_day_summary(target_date: str) -> dict:
     """指定日の概要サマリー。"""
+    try:
+        _refresh_activity_calendar()
+        with _connect_cache() as cache:
+            row = cache.execute(
+                "SELECT news, analysis, signals, trades, runs "
+                "FROM activity_calendar WHERE date = ?",
+                (target_date,),
+            ).fetchone()
+        if row is None:
+            return {"news": 0, "analysis": 0, "signals": 0, "trades": 0, "runs": 0}
+        return dict(row)
+    except sqlite3.Error as e:
+        logger.warning(f"activity_calendar 利用不可、直接集計にフォールバック: {e}")
+
     with _connect() as conn:
         news_cnt = conn.execute(
             "SELECT COUNT(*) FROM news WHERE date(created_at) = ?",
@@ -1702,119 +2518,272 @@ def get_log_day_summary(target_date: str) -> dict:
 # ============================================================
 
 
+# Ticker最終状態（SYSTEM_SPEC §6.4 の優先順）→ 表示ラベル
+TICKER_FLOW_STATES = {
+    "traded": "売買実行",
+    "signal_only": "シグナルのみ",
+    "analysis_only": "分析まで",
+    "news_only": "ニュースのみ",
+    "none": "データなし",
+}
+
+
+# 最終状態の判定式（news_count / analysis_count / signal_count / trade_count 列に対して評価）
+_TICKER_STATE_SQL = (
+    "CASE WHEN trade_count > 0 THEN 'traded' "
+    "WHEN signal_count > 0 THEN 'signal_only' "
+    "WHEN analysis_count > 0 THEN 'analysis_only' "
+    "WHEN news_count > 0 THEN 'news_only' ELSE 'none' END"
+)
+
+_TICKER_FLOW_SQL = f"""
+WITH news_by_source AS (
+    SELECT je.value AS ticker, n.source AS source, COUNT(*) AS cnt
+    FROM news n, json_each(
+        CASE WHEN json_valid(n.tickers_json) THEN n.tickers_json ELSE '[]' END
+    ) je
+    WHERE date(n.created_at) = :d AND je.type = 'text'
+    GROUP BY je.value, n.source
+),
+news_agg AS (
+    SELECT ticker, SUM(cnt) AS news_count,
+           group_concat(source, char(31)) AS news_sources
+    FROM news_by_source GROUP BY ticker
+),
+analysis_agg AS (
+    SELECT ticker, COUNT(*) AS analysis_count,
+           AVG(score) AS analysis_avg_score,
+           MAX(CASE WHEN rn = 1 THEN direction END) AS analysis_direction
+    FROM (
+        SELECT ticker, score, direction, ROW_NUMBER() OVER (
+            PARTITION BY ticker ORDER BY analyzed_at DESC, rowid DESC
+        ) AS rn
+        FROM ai_analysis WHERE date(analyzed_at) = :d AND ticker IS NOT NULL
+    )
+    GROUP BY ticker
+),
+signal_agg AS (
+    SELECT ticker, COUNT(*) AS signal_count FROM signals
+    WHERE date(detected_at) = :d AND ticker IS NOT NULL GROUP BY ticker
+),
+trade_agg AS (
+    SELECT ticker, COUNT(*) AS trade_count FROM trades
+    WHERE (date(entry_timestamp) = :d OR date(exit_timestamp) = :d)
+      AND ticker IS NOT NULL
+    GROUP BY ticker
+),
+all_tickers AS (
+    SELECT ticker FROM news_agg UNION SELECT ticker FROM analysis_agg
+    UNION SELECT ticker FROM signal_agg UNION SELECT ticker FROM trade_agg
+),
+flow AS (
+    SELECT t.ticker,
+           coalesce(n.news_count, 0) AS news_count, n.news_sources,
+           coalesce(a.analysis_count, 0) AS analysis_count,
+           coalesce(a.analysis_avg_score, 0) AS analysis_avg_score,
+           coalesce(a.analysis_direction, '') AS analysis_direction,
+           coalesce(s.signal_count, 0) AS signal_count,
+           coalesce(tr.trade_count, 0) AS trade_count
+    FROM all_tickers t
+    LEFT JOIN news_agg n USING (ticker)
+    LEFT JOIN analysis_agg a USING (ticker)
+    LEFT JOIN signal_agg s USING (ticker)
+    LEFT JOIN trade_agg tr USING (ticker)
+)
+SELECT *, {_TICKER_STATE_SQL} AS state FROM flow
+ORDER BY trade_count > 0 DESC, signal_count > 0 DESC, news_count DESC, ticker
+"""
+
+
 def get_date_ticker_flow(target_date: str) -> list[dict]:
-    """指定日のティッカー別 ニュース→分析→シグナル→取引 フローを構築。"""
-    import json
+    """指定日のティッカー別 ニュース→分析→シグナル→取引 フローを構築。
+
+    tickers_json の展開・ステージ別集計・外部結合・最終状態の判定まで
+    1本のSQLで行う。同日に複数のシグナル・取引がある銘柄は件数と
+    リスト（時刻順）で保持し、signal / trade には最新の1件を入れる。
 
+    Returns:
+        list of dicts with keys: ticker, state, news_count, news_sources,
+        analysis_count, analysis_avg_score, analysis_direction,
+        signal_count, signals, signal, trade_count, trades, trade
+        （売買実行 → シグナルあり → ニュース件数 の降順、同順位は ticker 昇順）
+    """
     with _connect() as conn:
-        news_rows = conn.execute(
-            "SELECT tickers_json, source FROM news WHERE date(created_at) = ?",
+        flow = conn.execute(_TICKER_FLOW_SQL, {"d": target_date}).fetchall()
+        signal_rows = conn.execute(
+            "SELECT rowid AS id, ticker, signal_type AS type, conviction, confidence, status "
+            "FROM signals WHERE date(detected_at) = ? AND ticker IS NOT NULL "
+            "ORDER BY detected_at, rowid",
             (target_date,),
         ).fetchall()
+        trade_rows = conn.execute(
+            "SELECT ticker, action, entry_price AS price, shares, "
+            "profit_loss AS pnl, status FROM trades "
+            "WHERE (date(entry_timestamp) = ? OR date(exit_timestamp) = ?) "
+            "AND ticker IS NOT NULL "
+            "ORDER BY coalesce(exit_timestamp, entry_timestamp), rowid",
+            (target_date, target_date),
+        ).fetchall()
 
-        ticker_news: dict[str, dict] = {}
-        for row in news_rows:
-            tj = row["tickers_json"] if isinstance(row, dict) else row[0]
-            src = row["source"] if isinstance(row, dict) else row[1]
-            if not tj:
-                continue
-            try:
-                tickers = json.loads(tj)
-            except (json.JSONDecodeError, TypeError):
-                continue
-            for t in tickers:
-                if t not in ticker_news:
-                    ticker_news[t] = {"count": 0, "sources": set()}
-                ticker_news[t]["count"] += 1
-                if src:
-                    ticker_news[t]["sources"].add(src)
-
-        analysis_rows = pd.read_sql_query(
-            "SELECT ticker, score, direction, analysis_type "
-            "FROM ai_analysis WHERE date(analyzed_at) = ? AND ticker IS NOT NULL",
-            conn,
-            params=(target_date,),
-        )
+    signals: dict[str, list[dict]] = {}
+    for r in signal_rows:
+        signals.setdefault(r["ticker"], []).append(dict(r))
+    trades: dict[str, list[dict]] = {}
+    for r in trade_rows:
+        trades.setdefault(r["ticker"], []).append(dict(r))
 
-        ticker_analysis: dict[str, dict] = {}
-        for ticker, grp in analysis_rows.groupby("ticker"):
-            ticker_analysis[str(ticker)] = {
-                "count": len(grp),
-                "avg_score": grp["score"].mean() if grp["score"].notna().any() else 0,
-                "direction": grp["direction"].iloc[-1] if len(grp) > 0 else "",
+    result = []
+    for r in flow:
+        tk = r["ticker"]
+        sigs = signals.get(tk, [])
+        trds = trades.get(tk, [])
+        sources = r["news_sources"]
+        result.append(
+            {
+                "ticker": tk,
+                "state": r["state"],
+                "news_count": r["news_count"],
+                "news_sources": sorted(sources.split("\x1f")) if sources else [],
+                "analysis_count": r["analysis_count"],
+                "analysis_avg_score": r["analysis_avg_score"],
+                "analysis_direction": r["analysis_direction"],
+                "signal_count": r["signal_count"],
+                "signals": sigs,
+                "signal": sigs[-1] if sigs else None,
+                "trade_count": r["trade_count"],
+                "trades": trds,
+                "trade": trds[-1] if trds else None,
             }
-
-        signal_rows = pd.read_sql_query(
-            "SELECT ticker, signal_type, conviction, confidence, status "
-            "FROM signals WHERE date(detected_at) = ?",
-            conn,
-            params=(target_date,),
         )
+    return result
 
-        ticker_signals: dict[str, dict] = {}
-        for _, s in signal_rows.iterrows():
-            tk = s["ticker"]
-            ticker_signals[tk] = {
-                "type": s["signal_type"],
-                "conviction": s.get("conviction") or 0,
-                "confidence": s.get("confidence") or 0,
-                "status": s.get("status", ""),
-            }
 
-        trade_rows = pd.read_sql_query(
-            "SELECT ticker, action, entry_price, shares, profit_loss, status "
-            "FROM trades WHERE date(entry_timestamp) = ? OR date(exit_timestamp) = ?",
-            conn,
-            params=(target_date, target_date),
-        )
+_TICKER_FLOW_RANGE_SQL = f"""
+WITH news_agg AS (
+    SELECT date(n.created_at) AS date, je.value AS ticker, COUNT(*) AS news_count
+    FROM news n, json_each(
+        CASE WHEN json_valid(n.tickers_json) THEN n.tickers_json ELSE '[]' END
+    ) je
+    WHERE date(n.created_at) BETWEEN :start AND :end AND je.type = 'text'
+    GROUP BY 1, 2
+),
+analysis_agg AS (
+    SELECT date(analyzed_at) AS date, ticker, COUNT(*) AS analysis_count
+    FROM ai_analysis
+    WHERE date(analyzed_at) BETWEEN :start AND :end AND ticker IS NOT NULL
+    GROUP BY 1, 2
+),
+signal_agg AS (
+    SELECT date(detected_at) AS date, ticker, COUNT(*) AS signal_count
+    FROM signals
+    WHERE date(detected_at) BETWEEN :start AND :end AND ticker IS NOT NULL
+    GROUP BY 1, 2
+),
+trade_agg AS (
+    -- エントリー日・決済日のどちらにも計上（同日は1件）
+    SELECT date, ticker, COUNT(*) AS trade_count FROM (
+        SELECT rowid AS rid, date(entry_timestamp) AS date, ticker FROM trades
+        UNION
+        SELECT rowid, date(exit_timestamp), ticker FROM trades
+    )
+    WHERE date BETWEEN :start AND :end AND ticker IS NOT NULL
+    GROUP BY 1, 2
+),
+all_pairs AS (
+    SELECT date, ticker FROM news_agg UNION SELECT date, ticker FROM analysis_agg
+    UNION SELECT date, ticker FROM signal_agg UNION SELECT date, ticker FROM trade_agg
+),
+flow AS (
+    SELECT p.date, p.ticker,
+           coalesce(n.news_count, 0) AS news_count,
+           coalesce(a.analysis_count, 0) AS analysis_count,
+           coalesce(s.signal_count, 0) AS signal_count,
+           coalesce(t.trade_count, 0) AS trade_count
+    FROM all_pairs p
+    LEFT JOIN news_agg n USING (date, ticker)
+    LEFT JOIN analysis_agg a USING (date, ticker)
+    LEFT JOIN signal_agg s USING (date, ticker)
+    LEFT JOIN trade_agg t USING (date, ticker)
+)
+SELECT *, {_TICKER_STATE_SQL} AS state FROM flow ORDER BY date, ticker
+"""
 
-        ticker_trades: dict[str, dict] = {}
-        for _, t in trade_rows.iterrows():
-            tk = t["ticker"]
-            ticker_trades[tk] = {
-                "action": t["action"],
-                "price": t["entry_price"],
-                "shares": int(t["shares"]),
-                "pnl": t.get("profit_loss"),
-                "status": t.get("status", ""),
-            }
+# ファネルの段（到達数 = その段以降の状態の銘柄数）
+_FUNNEL_STAGES = {
+    "to_analysis": ["traded", "signal_only", "analysis_only"],
+    "to_signal": ["traded", "signal_only"],
+    "to_trade": ["traded"],
+}
 
-        all_tickers = set()
-        all_tickers.update(ticker_news.keys())
-        all_tickers.update(ticker_analysis.keys())
-        all_tickers.update(ticker_signals.keys())
-        all_tickers.update(ticker_trades.keys())
 
-        result = []
-        for tk in sorted(all_tickers):
-            news_info = ticker_news.get(tk, {"count": 0, "sources": set()})
-            ana_info = ticker_analysis.get(tk, {"count": 0, "avg_score": 0, "direction": ""})
-            sig_info = ticker_signals.get(tk)
-            trd_info = ticker_trades.get(tk)
+def get_ticker_flow_range(start_date: str, end_date: str) -> pd.DataFrame:
+    """期間内の全 (日付, 銘柄) について最終状態を判定する。
 
-            result.append(
-                {
-                    "ticker": tk,
-                    "news_count": news_info["count"],
-                    "news_sources": sorted(news_info.get("sources", set())),
-                    "analysis_count": ana_info["count"],
-                    "analysis_avg_score": ana_info["avg_score"],
-                    "analysis_direction": ana_info["direction"],
-                    "signal": sig_info,
-                    "trade": trd_info,
-                }
-            )
+    テーブルごとに (日付, 銘柄) で1回ずつ集計して外部結合するため、
+    get_date_ticker_flow を日数分呼ぶより大幅に軽い。
 
-        result.sort(
-            key=lambda x: (
-                x["trade"] is not None,
-                x["signal"] is not None,
-                x["news_count"],
-            ),
-            reverse=True,
+    Returns:
+        DataFrame with columns: date, ticker, theme, news_count, analysis_count,
+        signal_count, trade_count, state
+    """
+    with _connect() as conn:
+        df = pd.read_sql_query(
+            _TICKER_FLOW_RANGE_SQL,
+            conn,
+            params={"start": start_date, "end": end_date},
         )
+    cfg = get_portfolio_config()
+    df.insert(
+        2,
+        "theme",
+        pd.Categorical(
+            df["ticker"].map(cfg.ticker_theme).fillna("Unknown"),
+            dtype=cfg.theme_dtype,
+        ),
+    )
+    return df
 
-        return result
+
+def _funnel_counts(pairs: pd.DataFrame, by: str) -> pd.DataFrame:
+    states = [k for k in TICKER_FLOW_STATES if k != "none"]
+    counts = pd.crosstab(pairs[by], pairs["state"]).reindex(columns=states, fill_value=0)
+    counts.columns.name = None
+    counts.insert(0, "tickers", counts.sum(axis=1))
+    for stage, members in _FUNNEL_STAGES.items():
+        counts[stage] = counts[members].sum(axis=1)
+    return counts.reset_index()
+
+
+def get_ticker_flow_funnel(days: int = 14, end_date: str | None = None) -> dict:
+    """直近N日の 銘柄×日 ファネル（ニュース → 分析 → シグナル → 売買）。
+
+    Returns:
+        dict with keys:
+            pairs: get_ticker_flow_range の結果
+            by_day / by_theme: DataFrame with columns: date|theme, tickers,
+                traded, signal_only, analysis_only, news_only,
+                to_analysis, to_signal, to_trade
+            totals: dict（by_day の合計。tickers は 銘柄×日 の件数）
+    """
+    end = end_date or datetime.now().strftime("%Y-%m-%d")
+    start = (
+        datetime.strptime(end, "%Y-%m-%d") - timedelta(days=days - 1)
+    ).strftime("%Y-%m-%d")
+    pairs = get_ticker_flow_range(start, end)
+    by_day = _funnel_counts(pairs, "date")
+    by_theme = _funnel_counts(pairs, "theme")
+    by_theme = by_theme[by_theme["tickers"] > 0].reset_index(drop=True)
+    totals = {
+        col: int(by_day[col].sum()) for col in by_day.columns if col != "date"
+    }
+    return {
+        "start": start,
+        "end": end,
+        "pairs": pairs,
+        "by_day": by_day,
+        "by_theme": by_theme,
+        "totals": totals,
+    }
 
 
 def get_date_ticker_news(target_date: str, ticker: str, limit: int = 50) -> pd.DataFrame:
@@ -1841,3 +2810,1440 @@ def get_date_ticker_analyses(target_date: str, ticker: str) -> pd.DataFrame:
             conn,
             params=(target_date, ticker),
         )
+
+
+# ============================================================
+# ティッカー別タイムライン（全期間）
+# ============================================================
+
+# ticker_events の種別 → (ソーステーブル, 時刻カラム)。rowid で増分追加する
+_TICKER_EVENT_SOURCES = {
+    "news": ("news", "created_at"),
+    "analysis": ("ai_analysis", "analyzed_at"),
+    "signal": ("signals", "detected_at"),
+    "tracking": ("signal_tracking", "signal_timestamp"),
+}
+
+# 種別 → (ticker, ts, rowid) を返すクエリ。news は tickers_json を展開する
+_TICKER_EVENT_QUERIES = {
+    "news": (
+        "SELECT n.rowid, je.value, n.created_at FROM news n, json_each("
+        "CASE WHEN json_valid(n.tickers_json) THEN n.tickers_json ELSE '[]' END"
+        ") je WHERE n.rowid > ? AND je.type = 'text' AND n.created_at IS NOT NULL"
+    ),
+    "analysis": (
+        "SELECT rowid, ticker, analyzed_at FROM ai_analysis "
+        "WHERE rowid > ? AND ticker IS NOT NULL AND analyzed_at IS NOT NULL"
+    ),
+    "signal": (
+        "SELECT rowid, ticker, detected_at FROM signals "
+        "WHERE rowid > ? AND ticker IS NOT NULL AND detected_at IS NOT NULL"
+    ),
+    "tracking": (
+        "SELECT rowid, ticker, signal_timestamp FROM signal_tracking "
+        "WHERE rowid > ? AND ticker IS NOT NULL AND signal_timestamp IS NOT NULL"
+    ),
+}
+
+# 種別 → (ソーステーブル, 表示列)。ticker_events と rowid で結合して引く
+_TICKER_EVENT_DETAILS = {
+    "news": (
+        "news",
+        "t.title, t.source AS status, t.sentiment_score AS score, NULL AS value",
+    ),
+    "analysis": (
+        "ai_analysis",
+        "coalesce(t.summary, t.analysis_type) AS title, t.direction AS status, "
+        "t.score, NULL AS value",
+    ),
+    "signal": (
+        "signals",
+        "t.signal_type || ' (確信度 ' || coalesce(t.conviction, '-') || ')' AS title, "
+        "t.status, t.confidence AS score, t.price AS value",
+    ),
+    "tracking": (
+        "signal_tracking",
+        "coalesce(t.strategy_type, '') AS title, t.outcome AS status, "
+        "NULL AS score, t.return_pct AS value",
+    ),
+    "trade_entry": (
+        "trades",
+        "t.action || ' ' || t.shares || '株 @ $' || printf('%.2f', t.entry_price) AS title, "
+        "t.status, NULL AS score, t.total_value AS value",
+    ),
+    "trade_exit": (
+        "trades",
+        "'決済 ' || coalesce(t.exit_reason, '') AS title, t.status, "
+        "t.profit_loss_pct AS score, t.profit_loss AS value",
+    ),
+}
+
+# 同時刻のイベントはパイプラインの流れ順に並べる
+TICKER_EVENT_ORDER = [
+    "news", "analysis", "signal", "tracking", "trade_entry", "trade_exit",
+]
+
+# get_ticker_timeline の1ページの件数
+TICKER_TIMELINE_PAGE_SIZE = 500
+
+_TRADE_EVENT_KINDS = ("trade_entry", "trade_exit")
+
+_ticker_events_version: tuple | None = None
+_ticker_events_lock = threading.Lock()
+
+
+def _ensure_ticker_events_schema(cache: sqlite3.Connection) -> None:
+    cache.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS ticker_events (
+            ticker TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            PRIMARY KEY (ticker, ts, kind, source_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS ticker_event_counts (
+            ticker TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            events INTEGER NOT NULL,
+            last_ts TEXT,
+            PRIMARY KEY (ticker, kind)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS ticker_event_days (
+            ticker TEXT NOT NULL,
+            date TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            events INTEGER NOT NULL,
+            PRIMARY KEY (ticker, date, kind)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS ticker_events_trades (
+            ticker TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            PRIMARY KEY (ticker, ts, kind, source_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS ticker_events_watermarks (
+            source TEXT PRIMARY KEY,
+            last_rowid INTEGER NOT NULL,
+            last_ts TEXT
+        );
+        CREATE TEMP TABLE IF NOT EXISTS new_ticker_events (
+            ticker TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            PRIMARY KEY (ticker, ts, kind, source_id)
+        ) WITHOUT ROWID;
+        """
+    )
+
+
+def _apply_new_ticker_events(cache: sqlite3.Connection) -> None:
+    """temp.new_ticker_events のうち未登録の行を ticker_events に追加し、件数表に足し込む。"""
+    cache.execute(
+        """
+        DELETE FROM temp.new_ticker_events WHERE EXISTS (
+            SELECT 1 FROM ticker_events e
+            WHERE e.ticker = new_ticker_events.ticker AND e.ts = new_ticker_events.ts
+              AND e.kind = new_ticker_events.kind
+              AND e.source_id = new_ticker_events.source_id
+        )
+        """
+    )
+    cache.execute(
+        "INSERT INTO ticker_events (ticker, ts, kind, source_id) "
+        "SELECT ticker, ts, kind, source_id FROM temp.new_ticker_events"
+    )
+    cache.execute(
+        """
+        INSERT INTO ticker_event_counts (ticker, kind, events, last_ts)
+        SELECT ticker, kind, COUNT(*), max(ts) FROM temp.new_ticker_events
+        WHERE true GROUP BY ticker, kind
+        ON CONFLICT(ticker, kind) DO UPDATE SET
+            events = events + excluded.events,
+            last_ts = max(last_ts, excluded.last_ts)
+        """
+    )
+    cache.execute(
+        """
+        INSERT INTO ticker_event_days (ticker, date, kind, events)
+        SELECT ticker, substr(ts, 1, 10), kind, COUNT(*) FROM temp.new_ticker_events
+        WHERE true GROUP BY 1, 2, 3
+        ON CONFLICT(ticker, date, kind) DO UPDATE SET events = events + excluded.events
+        """
+    )
+    cache.execute("DELETE FROM temp.new_ticker_events")
+
+
+def _sync_trade_events(cache: sqlite3.Connection, trade_rows: list) -> None:
+    """取引のエントリー/決済イベントを差分で反映する（決済は後から埋まる）。
+
+    前回反映した取引イベントを ticker_events_trades に控えておき、
+    消えた行だけを削除・件数から差し引き、増えた行だけを追加する。
+    """
+    desired = {
+        (r[1], ts, kind, r[0])
+        for r in trade_rows
+        for kind, ts in zip(_TRADE_EVENT_KINDS, (r[2], r[3]))
+        if ts
+    }
+    # cache の row_factory は sqlite3.Row（タプルと等しくならない）なのでタプルにして比べる
+    applied = {
+        tuple(r)
+        for r in cache.execute("SELECT ticker, ts, kind, source_id FROM ticker_events_trades")
+    }
+    removed = applied - desired
+    if removed:
+        cache.executemany(
+            "DELETE FROM ticker_events "
+            "WHERE ticker = ? AND ts = ? AND kind = ? AND source_id = ?",
+            removed,
+        )
+        cache.executemany(
+            "DELETE FROM ticker_events_trades "
+            "WHERE ticker = ? AND ts = ? AND kind = ? AND source_id = ?",
+            removed,
+        )
+        for ticker, kind in {(t, k) for t, _, k, _ in removed}:
+            cache.execute(
+                """
+                UPDATE ticker_event_counts SET
+                    events = (SELECT COUNT(*) FROM ticker_events WHERE ticker = ?1 AND kind = ?2),
+                    last_ts = (SELECT max(ts) FROM ticker_events WHERE ticker = ?1 AND kind = ?2)
+                WHERE ticker = ?1 AND kind = ?2
+                """,
+                (ticker, kind),
+            )
+        # ts は日付で始まるので、その日の行は [date, date || '~') の範囲に収まる
+        for ticker, day, kind in {(t, ts[:10], k) for t, ts, k, _ in removed}:
+            cache.execute(
+                """
+                UPDATE ticker_event_days SET events = (
+                    SELECT COUNT(*) FROM ticker_events
+                    WHERE ticker = ?1 AND ts >= ?2 AND ts < ?2 || '~' AND kind = ?3
+                )
+                WHERE ticker = ?1 AND date = ?2 AND kind = ?3
+                """,
+                (ticker, day, kind),
+            )
+        cache.execute("DELETE FROM ticker_event_counts WHERE events = 0")
+        cache.execute("DELETE FROM ticker_event_days WHERE events = 0")
+
+    added = desired - applied
+    cache.executemany(
+        "INSERT INTO temp.new_ticker_events (ticker, ts, kind, source_id) VALUES (?, ?, ?, ?)",
+        added,
+    )
+    cache.executemany(
+        "INSERT INTO ticker_events_trades (ticker, ts, kind, source_id) VALUES (?, ?, ?, ?)",
+        added,
+    )
+
+
+def _refresh_ticker_events() -> None:
+    """ticker_events（ティッカー → イベント参照の索引）を同期元DBに追いつかせる。
+
+    主キーが (ticker, ts, ...) のため、1銘柄・期間指定の検索は索引の範囲走査で済む。
+    更新方針は activity_calendar と同じ（rowid 増分、ウォーターマーク不一致なら
+    作り直し）。取引は前回反映分との差分だけを入れ替える。
+    銘柄×種別の件数（ticker_event_counts）と銘柄×日×種別の件数（ticker_event_days）も
+    追加・削除した行の分だけ更新する。
+    同期元に無いテーブル（古いレプリカの signal_tracking など）は読まない。
+    """
+    global _ticker_events_version
+    version = get_db_version()
+    if _ticker_events_version == version:
+        return
+    with _ticker_events_lock:
+        if _ticker_events_version == version:
+            return
+        with _connect() as src, _connect_cache() as cache:
+            _ensure_ticker_events_schema(cache)
+            sources = {
+                kind: spec
+                for kind, spec in _TICKER_EVENT_SOURCES.items()
+                if _has_table(src, spec[0])
+            }
+            marks = {
+                r["source"]: (r["last_rowid"], r["last_ts"])
+                for r in cache.execute(
+                    "SELECT source, last_rowid, last_ts FROM ticker_events_watermarks"
+                )
+            }
+            # 件数表が空なら（件数表より前に作られた索引を含め）作り直す
+            counted = cache.execute("SELECT 1 FROM ticker_event_days LIMIT 1").fetchone()
+            if not counted or _watermarks_stale(src, marks, sources):
+                for table in (
+                    "ticker_events",
+                    "ticker_event_counts",
+                    "ticker_event_days",
+                    "ticker_events_trades",
+                    "ticker_events_watermarks",
+                ):
+                    cache.execute(f"DELETE FROM {table}")
+                marks = {}
+
+            for kind, (table, ts_col) in sources.items():
+                last_rowid = marks.get(kind, (0, None))[0]
+                rows = src.execute(_TICKER_EVENT_QUERIES[kind], (last_rowid,))
+                cache.executemany(
+                    "INSERT OR IGNORE INTO temp.new_ticker_events "
+                    "(ticker, ts, kind, source_id) VALUES (?, ?, ?, ?)",
+                    ((r[1], r[2], kind, r[0]) for r in rows),
+                )
+                tail = src.execute(
+                    f"SELECT rowid, {ts_col} FROM {table} ORDER BY rowid DESC LIMIT 1"
+                ).fetchone()
+                cache.execute(
+                    "INSERT OR REPLACE INTO ticker_events_watermarks "
+                    "(source, last_rowid, last_ts) VALUES (?, ?, ?)",
+                    (kind, tail[0] if tail else 0, tail[1] if tail else None),
+                )
+
+            trade_rows = src.execute(
+                "SELECT rowid, ticker, entry_timestamp, exit_timestamp FROM trades "
+                "WHERE ticker IS NOT NULL"
+            ).fetchall()
+            _sync_trade_events(cache, trade_rows)
+            _apply_new_ticker_events(cache)
+        _ticker_events_version = version
+
+
+def get_timeline_tickers() -> pd.DataFrame:
+    """タイムラインを引ける銘柄の一覧（イベント件数の多い順）。
+
+    Returns:
+        DataFrame with columns: ticker, events, last_ts
+    """
+    _refresh_ticker_events()
+    with _connect_cache() as cache:
+        return pd.read_sql_query(
+            "SELECT ticker, SUM(events) AS events, max(last_ts) AS last_ts "
+            "FROM ticker_event_counts GROUP BY ticker ORDER BY events DESC, ticker",
+            cache,
+        )
+
+
+def _timeline_upper(end_date: str | None) -> str:
+    """終了日（含む）を ts の排他的上限に変換する。"""
+    if not end_date:
+        return "9999"
+    return (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def get_ticker_event_counts(
+    ticker: str,
+    start_date: str = PHASE3_START,
+    end_date: str | None = None,
+) -> dict[str, int]:
+    """1銘柄・期間内のイベント件数（種別 → 件数）。日別の件数表を合計するだけで済む。
+
+    Args:
+        ticker: 銘柄コード
+        start_date: 開始日（YYYY-MM-DD、含む）
+        end_date: 終了日（YYYY-MM-DD、含む）。None なら最新まで
+    """
+    _refresh_ticker_events()
+    with _connect_cache() as cache:
+        rows = cache.execute(
+            "SELECT kind, SUM(events) FROM ticker_event_days "
+            "WHERE ticker = ? AND date >= ? AND date < ? GROUP BY kind",
+            (ticker, start_date, _timeline_upper(end_date)),
+        ).fetchall()
+    return {kind: cnt for kind, cnt in rows}
+
+
+def get_ticker_timeline(
+    ticker: str,
+    start_date: str = PHASE3_START,
+    end_date: str | None = None,
+    limit: int | None = TICKER_TIMELINE_PAGE_SIZE,
+    offset: int = 0,
+) -> pd.DataFrame:
+    """1銘柄の ニュース→分析→シグナル→取引→追跡 を時系列に並べて返す。
+
+    サイドカーDBを ATTACH し、ticker_events の範囲走査で新しい順に
+    limit 件（offset 件飛ばし）を切り出してから、各テーブルと rowid で結合して
+    表示列を引く（シグナルのステータスや決済結果は常に最新値）。
+
+    Args:
+        ticker: 銘柄コード
+        start_date: 開始日（YYYY-MM-DD、含む）
+        end_date: 終了日（YYYY-MM-DD、含む）。None なら最新まで
+        limit: 1ページの件数。None なら全件
+        offset: 新しい方から数えて読み飛ばす件数
+
+    Returns:
+        DataFrame with columns: timestamp, date, kind, title, status,
+        score, value, id（timestamp 昇順）
+    """
+    columns = ["timestamp", "date", "kind", "title", "status", "score", "value", "id"]
+    _refresh_ticker_events()
+    with _connect() as conn:
+        conn.execute("ATTACH DATABASE ? AS sidecar", (str(_cache_db_path()),))
+        parts = [
+            f"SELECT p.ts, p.kind, {cols}, p.source_id FROM page p "
+            f"JOIN main.{table} t ON t.rowid = p.source_id WHERE p.kind = '{kind}'"
+            for kind, (table, cols) in _TICKER_EVENT_DETAILS.items()
+            if _has_table(conn, table)
+        ]
+        rows = conn.execute(
+            f"""
+            WITH page AS MATERIALIZED (
+                SELECT ts, kind, source_id FROM sidecar.ticker_events
+                WHERE ticker = ? AND ts >= ? AND ts < ?
+                ORDER BY ts DESC, kind DESC, source_id DESC
+                LIMIT ? OFFSET ?
+            )
+            {" UNION ALL ".join(parts)}
+            """,
+            (
+                ticker,
+                start_date,
+                _timeline_upper(end_date),
+                limit if limit is not None else -1,
+                offset,
+            ),
+        ).fetchall()
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    order = {kind: i for i, kind in enumerate(TICKER_EVENT_ORDER)}
+    rows.sort(key=lambda r: (r[0], order[r[1]], r[6]))
+    return pd.DataFrame(
+        [(r[0], r[0][:10], *tuple(r)[1:]) for r in rows], columns=columns
+    )
+
+
+# ============================================================
+# 全文検索（FTS5）
+# ============================================================
+
+# search_index の種別 → (ソーステーブル, 時刻カラム)。rowid で増分追加する
+_SEARCH_SOURCES = {
+    "news": ("news", "created_at"),
+    "analysis": ("ai_analysis", "analyzed_at"),
+    "signal": ("signals", "detected_at"),
+}
+
+# 種別 → (rowid, ts, tickers, title, body) を返すクエリ
+_SEARCH_QUERIES = {
+    "news": (
+        "SELECT rowid, created_at, tickers_json, title, content FROM news "
+        "WHERE rowid > ? AND created_at IS NOT NULL"
+    ),
+    "analysis": (
+        "SELECT rowid, analyzed_at, ticker, "
+        "coalesce(theme, '') || ' ' || coalesce(ticker, ''), summary "
+        "FROM ai_analysis WHERE rowid > ? AND analyzed_at IS NOT NULL"
+    ),
+    "signal": (
+        "SELECT rowid, detected_at, ticker, "
+        "coalesce(ticker, '') || ' ' || coalesce(signal_type, ''), reasoning "
+        "FROM signals WHERE rowid > ? AND detected_at IS NOT NULL"
+    ),
+}
+
+# trigram トークナイザは3文字未満の語を索引で引けない。短い語は search_grams
+# （1文字・2文字の連なりを語として持つ副索引、rowid は search_index と同じ）で絞り込み、
+# LIKE で確定する
+SEARCH_MIN_TOKEN = 3
+# 索引に入れる際の1回の読み出し行数
+SEARCH_BATCH = 2_000
+# search_grams の語になる文字の連なり（unicode61 の区切り判定に合わせ、_ と記号を除く）
+_GRAM_RUN = re.compile(r"[^\W_]+")
+
+# 文書の rowid = (日付の通し日数 << 32) | (日内連番 << 2) | 種別コード。
+# 期間は rowid の範囲、種別は下位2ビットで絞れる（本文を読まずに済む）
+_SEARCH_KIND_CODES = {"news": 0, "analysis": 1, "signal": 2}
+_SEARCH_DAY_SHIFT = 32
+_SEARCH_SEQ_SHIFT = 2
+_SEARCH_EPOCH = datetime(1970, 1, 1)
+
+# 関連度順に並べる候補数。条件に合う一致を新しい方からこの件数まで集めて採点する
+# （FTS5 の bm25 は語ごとに全一致件数を数えるため、よくある語では秒単位になる）
+SEARCH_RANK_WINDOW = 500
+# 銘柄指定時、期間内のその銘柄の文書がこの件数以下なら銘柄側から一致を確かめる
+SEARCH_TICKER_DRIVE = 5_000
+# 採点の BM25 パラメータ
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+_search_version: tuple | None = None
+_search_lock = threading.Lock()
+
+
+def _ensure_search_schema(cache: sqlite3.Connection) -> None:
+    # rowid に日付・種別を持たない旧形式（search_tickers がない）は捨てて作り直す
+    if _has_table(cache, "search_index") and not _has_table(cache, "search_tickers"):
+        cache.executescript(
+            """
+            DROP TABLE IF EXISTS search_index;
+            DROP TABLE IF EXISTS search_grams;
+            DROP TABLE IF EXISTS search_index_watermarks;
+            """
+        )
+    cache.executescript(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, body,
+            kind UNINDEXED, source_id UNINDEXED, ts UNINDEXED, tickers UNINDEXED,
+            tokenize = 'trigram'
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_grams USING fts5(
+            grams, content = '', detail = none, tokenize = 'unicode61'
+        );
+        CREATE TABLE IF NOT EXISTS search_tickers (
+            ticker TEXT NOT NULL,
+            doc INTEGER NOT NULL,
+            PRIMARY KEY (ticker, doc)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS search_index_watermarks (
+            source TEXT PRIMARY KEY,
+            last_rowid INTEGER NOT NULL,
+            last_ts TEXT
+        );
+        """
+    )
+
+
+def _search_tickers(kind: str, raw) -> str:
+    """ティッカー列を ' NVDA MSFT ' 形式（前後空白付き、表示用）にする。"""
+    if not raw:
+        return ""
+    if kind != "news":
+        return f" {raw} "
+    try:
+        tickers = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return ""
+    if not isinstance(tickers, list):
+        return ""
+    return " " + " ".join(str(t) for t in tickers) + " "
+
+
+def _short_grams(text: str) -> str:
+    """本文中の1文字・2文字の連なりを空白区切りにする（search_grams 用、重複なし）。"""
+    runs = _GRAM_RUN.findall(text.lower())
+    grams = set("".join(runs))
+    grams.update(p for run in set(runs) for p in map(str.__add__, run, run[1:]))
+    return " ".join(grams)
+
+
+def _search_day(day: str | None) -> int:
+    """YYYY-MM-DD（ts の先頭10文字）の通し日数。日付として読めなければ 0。"""
+    try:
+        return (datetime.strptime(str(day)[:10], "%Y-%m-%d") - _SEARCH_EPOCH).days
+    except ValueError:
+        return 0
+
+
+def _next_search_rowid(
+    cache: sqlite3.Connection, next_seq: dict[int, int], ts, kind: str
+) -> int:
+    """その日の次の連番で文書の rowid を作る（日ごとの連番は next_seq に控える）。"""
+    day = max(_search_day(ts), 0)
+    seq = next_seq.get(day)
+    if seq is None:
+        last = cache.execute(
+            "SELECT rowid FROM search_index WHERE rowid >= ? AND rowid < ? "
+            "ORDER BY rowid DESC LIMIT 1",
+            (day << _SEARCH_DAY_SHIFT, (day + 1) << _SEARCH_DAY_SHIFT),
+        ).fetchone()
+        seq = 0 if last is None else ((last[0] & 0xFFFFFFFF) >> _SEARCH_SEQ_SHIFT) + 1
+    next_seq[day] = seq + 1
+    return (day << _SEARCH_DAY_SHIFT) | (seq << _SEARCH_SEQ_SHIFT) | _SEARCH_KIND_CODES[kind]
+
+
+def refresh_search_index() -> None:
+    """search_index を同期元DBに追いつかせる（rowid 増分、不一致なら作り直し）。"""
+    global _search_version
+    version = get_db_version()
+    if _search_version == version:
+        return
+    with _search_lock:
+        if _search_version == version:
+            return
+        with _connect() as src, _connect_cache() as cache:
+            _ensure_search_schema(cache)
+            marks = {
+                r["source"]: (r["last_rowid"], r["last_ts"])
+                for r in cache.execute(
+                    "SELECT source, last_rowid, last_ts FROM search_index_watermarks"
+                )
+            }
+            if _watermarks_stale(src, marks, _SEARCH_SOURCES):
+                cache.execute("DELETE FROM search_index")
+                cache.execute("INSERT INTO search_grams (search_grams) VALUES ('delete-all')")
+                cache.execute("DELETE FROM search_tickers")
+                cache.execute("DELETE FROM search_index_watermarks")
+                marks = {}
+
+            next_seq: dict[int, int] = {}
+            for kind, (table, ts_col) in _SEARCH_SOURCES.items():
+                last_rowid = marks.get(kind, (0, None))[0]
+                cursor = src.execute(_SEARCH_QUERIES[kind], (last_rowid,))
+                while batch := cursor.fetchmany(SEARCH_BATCH):
+                    rows = [
+                        (_next_search_rowid(cache, next_seq, r[1], kind), r[3] or "",
+                         r[4] or "", kind, r[0], r[1], _search_tickers(kind, r[2]))
+                        for r in batch
+                    ]
+                    cache.executemany(
+                        "INSERT INTO search_index "
+                        "(rowid, title, body, kind, source_id, ts, tickers) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    cache.executemany(
+                        "INSERT INTO search_grams (rowid, grams) VALUES (?, ?)",
+                        ((r[0], _short_grams(f"{r[1]} {r[2]}")) for r in rows),
+                    )
+                    cache.executemany(
+                        "INSERT OR IGNORE INTO search_tickers (ticker, doc) VALUES (?, ?)",
+                        ((t, r[0]) for r in rows for t in r[6].split()),
+                    )
+                tail = src.execute(
+                    f"SELECT rowid, {ts_col} FROM {table} ORDER BY rowid DESC LIMIT 1"
+                ).fetchone()
+                cache.execute(
+                    "INSERT OR REPLACE INTO search_index_watermarks "
+                    "(source, last_rowid, last_ts) VALUES (?, ?, ?)",
+                    (kind, tail[0] if tail else 0, tail[1] if tail else None),
+                )
+        _search_version = version
+
+
+def _mark_terms(text: str, terms: list[str], mark: tuple[str, str]) -> str:
+    """text 中の語（大文字小文字を区別しない）をすべて mark で囲む。"""
+    if not terms:
+        return text
+    pattern = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return re.sub(pattern, lambda m: f"{mark[0]}{m.group(0)}{mark[1]}", text, flags=re.IGNORECASE)
+
+
+def _plain_snippet(text: str, terms: list[str], mark: tuple[str, str], width: int = 60) -> str:
+    """最初の一致箇所の前後を抜き出し、一致箇所を mark で囲む。"""
+    lower = text.lower()
+    hits = [lower.find(t.lower()) for t in terms]
+    hits = [h for h in hits if h >= 0]
+    pos = min(hits) if hits else 0
+    start = max(pos - width // 2, 0)
+    excerpt = _mark_terms(text[start:start + width * 2], terms, mark)
+    return ("…" if start > 0 else "") + excerpt + ("…" if start + width * 2 < len(text) else "")
+
+
+def _like_pattern(term: str) -> str:
+    """部分一致の LIKE パターン（ワイルドカードとエスケープ文字自体をエスケープする）。"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _bm25_scores(texts: list[str], terms: list[str]) -> np.ndarray:
+    """候補文書の BM25 スコア（大きいほど関連度が高い）。
+
+    候補はすべての語を含む（AND）ため語ごとの idf は同じになり、省いている。
+    """
+    lowered = [t.lower() for t in texts]
+    lengths = np.array([len(t) for t in lowered], dtype=float)
+    norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * lengths / max(lengths.mean(), 1.0))
+    scores = np.zeros(len(lowered))
+    for term in {t.lower() for t in terms}:
+        tf = np.array([t.count(term) for t in lowered], dtype=float)
+        scores += tf * (_BM25_K1 + 1) / (tf + norm)
+    return scores
+
+
+def search_text(
+    query: str,
+    kinds: list[str] | None = None,
+    ticker: str | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    limit: int = 50,
+    mark: tuple[str, str] = ("[", "]"),
+) -> pd.DataFrame:
+    """ニュース本文・AI分析サマリー・シグナル理由を全文検索する。
+
+    空白区切りの語はすべて含むもの（AND）を返す。3文字以上の語は FTS5 の MATCH、
+    3文字未満の語は search_grams で候補を絞ってから LIKE で確定する。
+    期間・種別は rowid、銘柄は search_tickers で絞る。条件に合う一致を新しい方から
+    SEARCH_RANK_WINDOW 件まで集め、BM25 で採点して関連度順に返す。
+
+    Args:
+        query: 検索語（空白区切り）
+        kinds: 対象種別（"news", "analysis", "signal"）。None なら全部
+        ticker: 指定時はその銘柄に紐づく行のみ
+        start_date / end_date: 期間（YYYY-MM-DD、両端含む）
+        limit: 最大件数
+        mark: 一致箇所を囲む文字列（開始, 終了）
+
+    Returns:
+        DataFrame with columns: kind, id, timestamp, date, tickers, title,
+        snippet, rank（rank は小さいほど関連度が高い）
+    """
+    columns = ["kind", "id", "timestamp", "date", "tickers", "title", "snippet", "rank"]
+    terms = [t for t in query.split() if t]
+    if not terms:
+        return pd.DataFrame(columns=columns)
+    refresh_search_index()
+
+    long_terms = [t for t in terms if len(t) >= SEARCH_MIN_TOKEN]
+    short_terms = [t for t in terms if len(t) < SEARCH_MIN_TOKEN]
+    gram_terms = [t for t in short_terms if _GRAM_RUN.fullmatch(t)]
+    lo = _search_day(start_date) << _SEARCH_DAY_SHIFT if start_date else 0
+    hi = (_search_day(end_date) + 1) << _SEARCH_DAY_SHIFT if end_date else 1 << 62
+
+    with _connect_cache() as cache:
+        drive_ticker = False
+        if ticker:
+            ticker_docs = cache.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM search_tickers "
+                "WHERE ticker = ? AND doc >= ? AND doc < ? LIMIT ?)",
+                (ticker, lo, hi, SEARCH_TICKER_DRIVE + 1),
+            ).fetchone()[0]
+            drive_ticker = ticker_docs <= SEARCH_TICKER_DRIVE
+
+        # 一致を新しい順に引く起点（key はその rowid）:
+        # 文書の少ない銘柄 → 長い語の本体索引 → 短い語の副索引 → 本体の全件
+        where, params = [], []
+        like_terms = short_terms
+        if drive_ticker:
+            # 銘柄の文書を1件ずつ MATCH し直すと遅いため、語はすべて LIKE で確かめる
+            source, key = "search_tickers d CROSS JOIN search_index i", "d.doc"
+            where += ["d.ticker = ?", "i.rowid = d.doc"]
+            params.append(ticker)
+            like_terms = terms
+        elif long_terms:
+            source, key = "search_index i", "i.rowid"
+            where.append("i.search_index MATCH ?")
+            params.append(" ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        elif gram_terms:
+            source, key = "search_grams d CROSS JOIN search_index i", "d.rowid"
+            where += ["d.search_grams MATCH ?", "i.rowid = d.rowid"]
+            params.append(" ".join(f'"{t}"' for t in gram_terms))
+        else:
+            source, key = "search_index i", "i.rowid"
+
+        # 期間・種別は本文を読む前に起点の rowid で絞る
+        where = [f"{key} >= ?", f"{key} < ?"] + where
+        params = [lo, hi] + params
+        if kinds and set(kinds) != set(_SEARCH_KIND_CODES):
+            codes = [_SEARCH_KIND_CODES[k] for k in kinds if k in _SEARCH_KIND_CODES]
+            where.append(f"({key} & 3) IN ({','.join('?' * len(codes))})")
+            params += codes
+        if ticker and not drive_ticker:
+            where.append(
+                "EXISTS (SELECT 1 FROM search_tickers t WHERE t.ticker = ? AND t.doc = i.rowid)"
+            )
+            params.append(ticker)
+        for t in like_terms:
+            where.append("(i.title LIKE ? ESCAPE '\\' OR i.body LIKE ? ESCAPE '\\')")
+            params += [_like_pattern(t)] * 2
+
+        rows = cache.execute(
+            f"SELECT i.kind, i.source_id, i.ts, i.tickers, i.title, i.body "
+            f"FROM {source} WHERE {' AND '.join(where)} "
+            f"ORDER BY {key} DESC LIMIT ?",
+            params + [SEARCH_RANK_WINDOW],
+        ).fetchall()
+
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    rank = -_bm25_scores([f"{r['title']} {r['body']}" for r in rows], terms)
+    # 同点は新しい順（rows は rowid の降順）
+    top = np.argsort(rank, kind="stable")[:limit]
+    df = pd.DataFrame(
+        [
+            (
+                rows[i]["kind"],
+                rows[i]["source_id"],
+                rows[i]["ts"],
+                rows[i]["ts"][:10],
+                rows[i]["tickers"].strip(),
+                _mark_terms(rows[i]["title"], terms, mark),
+                _plain_snippet(rows[i]["body"], terms, mark),
+                rank[i],
+            )
+            for i in top
+        ],
+        columns=columns,
+    )
+    return df
+
+
+# ============================================================
+# 非売買理由（リスク管理ルールの再評価）
+# ============================================================
+
+# SYSTEM_SPEC §7 のリスク管理ルール
+RISK_RULES = {
+    "hard_stop_pct": 8.0,
+    "min_reward_risk": 1.5,
+    "max_new_buys_per_day": 3,
+    "max_buys_per_sector_per_day": 1,
+    "earnings_blackout_days": 7,
+    "min_cash": 5_000.0,
+}
+
+# 見送り理由（判定の優先順。先に当てはまったものを採用。順序は classify_signal_blocks の checks と揃える）
+SIGNAL_BLOCK_REASONS = {
+    "sell_signal": "売りシグナル（買付ルール対象外）",
+    "stop_too_wide": f"損切り幅が -{RISK_RULES['hard_stop_pct']:.0f}% 超",
+    "reward_risk": f"リスクリワード {RISK_RULES['min_reward_risk']}:1 未満",
+    "earnings_blackout": "決算ブラックアウト",
+    "daily_limit": f"1日の新規買付上限（{RISK_RULES['max_new_buys_per_day']}件）",
+    "sector_limit": "同一セクター買付済み",
+    "min_cash": f"最低現金 ${RISK_RULES['min_cash']:,.0f} を割る",
+    "run_failure": "シグナル後の実行失敗",
+    "cancelled": "キャンセル",
+    "expired": "期限切れ",
+    "pending": "未執行（保留中）",
+    "unknown": "理由不明",
+}
+
+_block_reasons_version: tuple | None = None
+_block_reasons_lock = threading.Lock()
+
+# 日ごとの入力の指紋（シグナル・エントリー・実行ログ。シグナルのある日だけ）
+_BLOCK_DAY_SIGNATURE_SQL = """
+SELECT d, group_concat(part, '|') AS signature FROM (
+    SELECT date(detected_at) AS d,
+           's' || COUNT(*) || ':' || MAX(rowid) || ':'
+               || group_concat(coalesce(status, ''), ',') AS part
+    FROM signals WHERE detected_at IS NOT NULL GROUP BY d
+    UNION ALL
+    SELECT date(entry_timestamp),
+           't' || COUNT(*) || ':' || MAX(rowid) || ':' || SUM(coalesce(signal_id, 0))
+    FROM trades WHERE entry_timestamp IS NOT NULL GROUP BY 1
+    UNION ALL
+    SELECT date(started_at),
+           'r' || COUNT(*) || ':' || MAX(rowid) || ':'
+               || group_concat(coalesce(status, ''), ',')
+    FROM system_runs WHERE started_at IS NOT NULL GROUP BY 1
+    ORDER BY 1, 2
+)
+GROUP BY d HAVING SUM(part LIKE 's%') > 0
+"""
+
+
+def _earnings_days(factors_json: pd.Series, detected: pd.Series) -> pd.Series:
+    """decision_factors_json の決算情報（days_to_earnings / earnings_date）から決算までの日数。
+
+    記録がないシグナルは NaN（ブラックアウト判定の対象外）。
+    """
+    days = np.full(len(factors_json), np.nan)
+    for i, raw in enumerate(factors_json.to_numpy()):
+        if not isinstance(raw, str) or "earnings" not in raw:
+            continue
+        try:
+            factors = json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if not isinstance(factors, dict):
+            continue
+        if factors.get("days_to_earnings") is not None:
+            days[i] = pd.to_numeric(factors["days_to_earnings"], errors="coerce")
+        elif factors.get("earnings_date"):
+            earnings = pd.to_datetime(factors["earnings_date"], errors="coerce")
+            if pd.notna(earnings) and pd.notna(detected.iloc[i]):
+                days[i] = (earnings.normalize() - detected.iloc[i].normalize()).days
+    return pd.Series(days, index=factors_json.index)
+
+
+def _count_since_day_start(events: pd.Series, at: pd.Series) -> np.ndarray:
+    """at ごとに、同じ日の 0:00 から at まで（at を含む）に入る events の件数。"""
+    ev = np.sort(events.dropna().to_numpy(dtype="datetime64[ns]"))
+    at_ns = at.to_numpy(dtype="datetime64[ns]")
+    start_ns = at.dt.normalize().to_numpy(dtype="datetime64[ns]")
+    counts = np.searchsorted(ev, at_ns, side="right") - np.searchsorted(ev, start_ns, side="left")
+    return np.where(at.notna().to_numpy(), counts, 0)
+
+
+def assumed_buy_sizes(trades: pd.DataFrame, dates: list[str]) -> dict[str, float]:
+    """日付 → その日までの BUY の約定額（total_value）の中央値（最低現金の判定に使う想定買付額）。
+
+    その日より後の取引で過去の日の判定が変わらないよう、日ごとに固定する。
+    """
+    buys = trades[trades["action"].fillna("").str.upper() == "BUY"]
+    values = pd.DataFrame(
+        {
+            "date": buys["entry_timestamp"].str[:10],
+            "value": pd.to_numeric(buys["total_value"], errors="coerce"),
+        }
+    ).dropna().sort_values("date", kind="stable")
+    buy_dates = values["date"].to_numpy()
+    amounts = values["value"].to_numpy()
+    sizes = {}
+    for d in dates:
+        n = int(np.searchsorted(buy_dates, d, side="right"))
+        sizes[d] = float(np.median(amounts[:n])) if n else 0.0
+    return sizes
+
+
+def classify_signal_blocks(
+    signals: pd.DataFrame,
+    trades: pd.DataFrame,
+    runs: pd.DataFrame,
+    cash: pd.DataFrame,
+    ticker_sector: dict[str, str],
+    position_value: float | dict[str, float] = 0.0,
+    rules: dict | None = None,
+) -> pd.DataFrame:
+    """シグナルを §7 のリスク管理ルールで再評価し、約定しなかった理由を1つ割り当てる。
+
+    1日単位の窓（シグナル時点までの当日の新規買付数・セクター別買付数、シグナル後の
+    実行失敗）と直前の現金残高を列演算でまとめて求め、SIGNAL_BLOCK_REASONS の順に最初に
+    当てはまった理由を採用する。約定済み（trades.signal_id が一致 or status=executed）は None。
+
+    Args:
+        signals: id, ticker, signal_type, detected_at, price, target_price,
+            stop_loss, status, decision_factors_json
+        trades: signal_id, ticker, action, entry_timestamp
+        runs: started_at, status
+        cash: timestamp, cash_balance
+        ticker_sector: 銘柄 → セクター（テーマ）
+        position_value: 1件あたりの想定買付額（最低現金の判定に使う）。
+            日付 → 金額の dict なら日ごと（assumed_buy_sizes）
+
+    Returns:
+        DataFrame with columns: signal_id, date, reason, detail
+    """
+    rules = rules or RISK_RULES
+    columns = ["signal_id", "date", "reason", "detail"]
+    if signals is None or len(signals) == 0:
+        return pd.DataFrame(columns=columns)
+
+    s = signals.reset_index(drop=True)
+    ts = pd.to_datetime(s["detected_at"], format="ISO8601", errors="coerce")
+    day = s["detected_at"].str[:10]
+    price = pd.to_numeric(s["price"], errors="coerce")
+    target = pd.to_numeric(s["target_price"], errors="coerce")
+    stop = pd.to_numeric(s["stop_loss"], errors="coerce")
+    status = s["status"].fillna("").str.lower()
+
+    executed = s["id"].isin(trades["signal_id"].dropna()) | (status == "executed")
+    is_buy = s["signal_type"].fillna("").str.upper() == "BUY"
+
+    # 個別シグナルのルール（損切り幅・リスクリワード・決算）
+    stop_pct = (price - stop) / price * 100
+    stop_wide = stop_pct > rules["hard_stop_pct"] + 1e-9
+    risk = price - stop.fillna(price * (1 - rules["hard_stop_pct"] / 100))
+    reward_risk = ((target - price) / risk).where(risk > 0)
+    rr_low = reward_risk < rules["min_reward_risk"]
+    earnings = _earnings_days(s["decision_factors_json"], ts)
+    blackout = earnings.abs() <= rules["earnings_blackout_days"]
+
+    # 1日単位の窓（当日 0:00 からシグナル時点までの新規買付数・セクター別買付数。
+    # シグナルより後の買付は、そのシグナルを見送った理由にならない）
+    buys = trades[trades["action"].fillna("").str.upper() == "BUY"]
+    buy_ts = pd.to_datetime(buys["entry_timestamp"], format="ISO8601", errors="coerce")
+    day_buys = pd.Series(_count_since_day_start(buy_ts, ts), index=s.index)
+    sector = s["ticker"].map(ticker_sector)
+    buy_sector = buys["ticker"].map(ticker_sector)
+    sector_buys = pd.Series(0, index=s.index)
+    for name, idx in s.groupby(sector).groups.items():
+        sector_buys.loc[idx] = _count_since_day_start(buy_ts[buy_sector == name], ts.loc[idx])
+    daily_full = day_buys >= rules["max_new_buys_per_day"]
+    sector_full = sector.notna() & (sector_buys >= rules["max_buys_per_sector_per_day"])
+
+    # シグナル時点の現金残高（直前のスナップショット）
+    order = ts.sort_values(kind="stable")
+    cash_at = pd.Series(np.nan, index=s.index)
+    if len(cash) > 0 and order.notna().any():
+        snap = pd.DataFrame(
+            {
+                "ts": pd.to_datetime(cash["timestamp"], format="ISO8601", errors="coerce"),
+                "cash": pd.to_numeric(cash["cash_balance"], errors="coerce"),
+            }
+        ).dropna().sort_values("ts")
+        valid = order.dropna()
+        merged = pd.merge_asof(
+            pd.DataFrame({"ts": valid.to_numpy(), "idx": valid.index}),
+            snap,
+            on="ts",
+            direction="backward",
+        )
+        cash_at.loc[merged["idx"].to_numpy()] = merged["cash"].to_numpy()
+    if isinstance(position_value, dict):
+        buy_size = day.map(position_value).fillna(0.0).astype(float)
+    else:
+        buy_size = pd.Series(float(position_value), index=s.index)
+    low_cash = (cash_at - buy_size) < rules["min_cash"]
+
+    # シグナル後（同日）の失敗・中断した実行
+    failed_runs = runs[runs["status"].isin(["failed", "interrupted"])]
+    failed_at = pd.to_datetime(failed_runs["started_at"], format="ISO8601", errors="coerce")
+    last_failure = failed_at.groupby(failed_runs["started_at"].str[:10]).max()
+    # 失敗がない日は NaT（map は空の対応表で datetime を float に変換しようとして失敗する）
+    failure_on_day = pd.Series(
+        last_failure.reindex(day.to_numpy()).to_numpy(dtype="datetime64[ns]"), index=s.index
+    )
+    run_failed = ts.notna() & (ts <= failure_on_day)
+
+    # (理由, 条件) を判定の優先順に。約定済みは理由なし（""）、どれにも当たらなければ unknown
+    checks = [
+        ("", executed),
+        ("sell_signal", ~is_buy),
+        ("stop_too_wide", stop_wide),
+        ("reward_risk", rr_low),
+        ("earnings_blackout", blackout),
+        ("daily_limit", daily_full),
+        ("sector_limit", sector_full),
+        ("min_cash", low_cash),
+        ("run_failure", run_failed),
+        ("cancelled", status == "cancelled"),
+        ("expired", status == "expired"),
+        ("pending", status == "pending"),
+    ]
+    reason = pd.Series(
+        np.select([mask for _, mask in checks], [code for code, _ in checks], default="unknown"),
+        index=s.index,
+    )
+    reason = reason.where(reason != "", None)
+
+    detail = pd.Series("", index=s.index)
+    detail = detail.mask(reason == "stop_too_wide", "損切り幅 " + stop_pct.map("{:.1f}%".format))
+    detail = detail.mask(reason == "reward_risk", "RR " + reward_risk.map("{:.2f}".format))
+    detail = detail.mask(
+        reason == "earnings_blackout", "決算まで " + earnings.map("{:+.0f}日".format)
+    )
+    detail = detail.mask(
+        reason == "daily_limit", "シグナル時点で当日の新規買付 " + day_buys.astype(str) + "件"
+    )
+    detail = detail.mask(
+        reason == "sector_limit",
+        sector.fillna("").astype(str) + " で " + sector_buys.astype(str) + "件買付済み",
+    )
+    detail = detail.mask(
+        reason == "min_cash",
+        "現金 " + cash_at.map("${:,.0f}".format)
+        + "（想定買付 " + buy_size.map("${:,.0f}".format) + "）",
+    )
+    detail = detail.mask(reason.isin(["cancelled", "expired", "pending"]), "status=" + status)
+
+    return pd.DataFrame(
+        {"signal_id": s["id"], "date": day, "reason": reason, "detail": detail.where(reason.notna())}
+    )[columns]
+
+
+def _ensure_block_reasons_schema(cache: sqlite3.Connection) -> None:
+    cache.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS signal_block_reasons (
+            signal_id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            reason TEXT,
+            detail TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_signal_block_reasons_date
+            ON signal_block_reasons(date);
+        CREATE TABLE IF NOT EXISTS signal_block_reason_days (
+            date TEXT PRIMARY KEY,
+            signature TEXT NOT NULL
+        );
+        """
+    )
+
+
+def _read_block_trades(src: sqlite3.Connection) -> pd.DataFrame:
+    """見送り理由の判定に使う取引（エントリー済みの全件）。"""
+    return pd.read_sql_query(
+        "SELECT signal_id, ticker, action, entry_timestamp, total_value FROM trades "
+        "WHERE entry_timestamp IS NOT NULL",
+        src,
+    )
+
+
+def _load_block_inputs(
+    src: sqlite3.Connection, dates: list[str]
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """指定日の再評価に必要な入力（シグナル・実行ログ・現金）。"""
+    lo, hi = min(dates), max(dates)
+    signals = pd.read_sql_query(
+        "SELECT rowid AS id, ticker, signal_type, detected_at, price, target_price, "
+        "stop_loss, status, decision_factors_json FROM signals "
+        "WHERE date(detected_at) BETWEEN ? AND ?",
+        src,
+        params=[lo, hi],
+    )
+    signals = signals[signals["detected_at"].str[:10].isin(dates)]
+    runs = pd.read_sql_query(
+        "SELECT started_at, status FROM system_runs WHERE date(started_at) BETWEEN ? AND ?",
+        src,
+        params=[lo, hi],
+    )
+    # 前日以前の最後のスナップショットも拾えるよう、少し前から読む
+    start = (datetime.fromisoformat(lo) - timedelta(days=7)).strftime("%Y-%m-%d")
+    daily, raw = _read_snapshot_tiers(src, start)
+    cash = pd.concat(
+        [
+            pd.DataFrame({"timestamp": daily["last_ts"], "cash_balance": daily["cash"]}),
+            raw[["timestamp", "cash_balance"]],
+        ],
+        ignore_index=True,
+    )
+    cash = cash[cash["timestamp"].str[:10] <= hi]
+    return signals, runs, cash
+
+
+def refresh_signal_block_reasons() -> None:
+    """signal_block_reasons を同期元DBに追いつかせる。
+
+    - DBバージョンが前回と同じなら何もしない（stat 1回）
+    - 日ごとの入力の指紋（シグナル・エントリー・実行ログ・その日の想定買付額）と
+      ルール・セクター設定を前回と比べ、変わった日だけをまとめて再評価する（通常は当日分のみ）
+    """
+    global _block_reasons_version
+    version = get_db_version()
+    if _block_reasons_version == version:
+        return
+    with _block_reasons_lock:
+        if _block_reasons_version == version:
+            return
+        config = get_portfolio_config()
+        rules_token = json.dumps([RISK_RULES, config.version], sort_keys=True)
+        with _connect() as src, _connect_cache() as cache:
+            _ensure_block_reasons_schema(cache)
+            day_signatures = {
+                r["d"]: r["signature"] for r in src.execute(_BLOCK_DAY_SIGNATURE_SQL) if r["d"]
+            }
+            trades = _read_block_trades(src)
+            # 想定買付額はその日までの取引で決まるため、指紋に含めて変われば再評価する
+            sizes = assumed_buy_sizes(trades, sorted(day_signatures))
+            current = {
+                d: f"{rules_token}|{sig}|p{sizes[d]:.2f}" for d, sig in day_signatures.items()
+            }
+            stored = {
+                r["date"]: r["signature"]
+                for r in cache.execute("SELECT date, signature FROM signal_block_reason_days")
+            }
+            dirty = sorted(d for d, sig in current.items() if stored.get(d) != sig)
+            removed = [(d,) for d in stored if d not in current]
+
+            if dirty:
+                signals, runs, cash = _load_block_inputs(src, dirty)
+                result = classify_signal_blocks(
+                    signals, trades, runs, cash, config.ticker_theme, sizes
+                )
+                rows = result.astype(object).where(result.notna(), None)
+                with cache:
+                    cache.executemany(
+                        "DELETE FROM signal_block_reasons WHERE date = ?", [(d,) for d in dirty]
+                    )
+                    cache.executemany(
+                        "INSERT OR REPLACE INTO signal_block_reasons "
+                        "(signal_id, date, reason, detail) VALUES (?, ?, ?, ?)",
+                        rows.itertuples(index=False, name=None),
+                    )
+                    cache.executemany(
+                        "INSERT OR REPLACE INTO signal_block_reason_days (date, signature) "
+                        "VALUES (?, ?)",
+                        [(d, current[d]) for d in dirty],
+                    )
+            if removed:
+                with cache:
+                    cache.executemany("DELETE FROM signal_block_reasons WHERE date = ?", removed)
+                    cache.executemany(
+                        "DELETE FROM signal_block_reason_days WHERE date = ?", removed
+                    )
+        _block_reasons_version = version
+
+
+def get_signal_block_reasons(target_date: str) -> pd.DataFrame:
+    """指定日のシグナルごとの見送り理由（約定済みは reason=None）。
+
+    Returns:
+        DataFrame with columns: id, reason, reason_label, detail
+    """
+    columns = ["id", "reason", "reason_label", "detail"]
+    try:
+        refresh_signal_block_reasons()
+        with _connect_cache() as cache:
+            rows = cache.execute(
+                "SELECT signal_id, reason, detail FROM signal_block_reasons WHERE date = ?",
+                (target_date,),
+            ).fetchall()
+    except Exception as e:
+        logger.warning(f"非売買理由の取得に失敗 ({target_date}): {e}")
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(
+        [(r[0], r[1], SIGNAL_BLOCK_REASONS.get(r[1]), r[2]) for r in rows], columns=columns
+    )
+
+
+# ============================================================
+# 日付バンドル（date_detail 用の一括読み込み + 前後日プリフェッチ + 事前計算の保存）
+# ============================================================
+
+# メモリに保持する日付バンドル数
+DAY_BUNDLE_CACHE_SIZE = 8
+
+# (target_date, db_version) → bundle（挿入順 = LRU順）
+_day_bundles: OrderedDict[tuple[str, tuple], dict] = OrderedDict()
+# (target_date, db_version) → 読み込み中イベント
+_day_bundle_inflight: dict[tuple[str, tuple], threading.Event] = {}
+_day_bundle_lock = threading.Lock()
+
+# 事前計算したバンドルの保存先（サイドカーDB、bundle_precompute.py が書き込む）
+DAY_BUNDLE_STORE_TABLE = "day_bundle_store"
+# 保存形式の版（_build_day_bundle の中身を変えたら上げて、保存済みを作り直させる）
+DAY_BUNDLE_FORMAT = 1
+
+# 日ごとの入力の指紋（date_detail が読むテーブルすべて。決済・実行終了など後から変わる列も含む）
+_DAY_BUNDLE_SIGNATURE_SQL = """
+SELECT d, group_concat(part, '|') AS signature FROM (
+    SELECT date(created_at) AS d, 'n' || COUNT(*) || ':' || MAX(rowid) AS part
+    FROM news WHERE created_at IS NOT NULL GROUP BY d
+    UNION ALL
+    SELECT date(analyzed_at), 'a' || COUNT(*) || ':' || MAX(rowid)
+    FROM ai_analysis WHERE analyzed_at IS NOT NULL GROUP BY 1
+    UNION ALL
+    SELECT date(detected_at),
+           's' || COUNT(*) || ':' || MAX(rowid) || ':'
+               || group_concat(coalesce(status, ''), ',')
+    FROM signals WHERE detected_at IS NOT NULL GROUP BY 1
+    UNION ALL
+    SELECT d, 't' || COUNT(*) || ':' || MAX(rid) || ':' || group_concat(state, ',')
+    FROM (
+        SELECT rowid AS rid, date(entry_timestamp) AS d,
+               coalesce(status, '') || coalesce(exit_timestamp, '')
+                   || coalesce(profit_loss, '') AS state
+        FROM trades
+        UNION ALL
+        SELECT rowid, date(exit_timestamp),
+               coalesce(status, '') || coalesce(profit_loss, '')
+        FROM trades
+    ) WHERE d IS NOT NULL GROUP BY d
+    UNION ALL
+    SELECT date(started_at),
+           'r' || COUNT(*) || ':' || MAX(rowid) || ':'
+               || group_concat(
+                   coalesce(status, '') || coalesce(ended_at, '') || coalesce(errors_count, ''),
+                   ','
+               )
+    FROM system_runs WHERE started_at IS NOT NULL GROUP BY 1
+    ORDER BY 1, 2
+)
+WHERE d IS NOT NULL GROUP BY d
+"""
+
+
+# (db_version, 日付 → 指紋)。指紋の集計は全日付を1回で行い、DBバージョンごとに使い回す
+_day_bundle_signatures: tuple[tuple, dict[str, str]] | None = None
+_day_bundle_signatures_lock = threading.Lock()
+
+
+def day_bundle_signatures() -> dict[str, str]:
+    """日付 → その日のバンドルの入力の指紋（保存形式・リスクルール・設定の版を含む）。
+
+    ファイルの mtime ではなく中身から作るので、git で配布し直した同じDBでも一致する。
+    """
+    global _day_bundle_signatures
+    version = get_db_version()
+    cached = _day_bundle_signatures
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _day_bundle_signatures_lock:
+        cached = _day_bundle_signatures
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        prefix = json.dumps(
+            [DAY_BUNDLE_FORMAT, RISK_RULES, get_portfolio_config().version], sort_keys=True
+        )
+        with _connect() as conn:
+            day_signatures = {
+                r["d"]: r["signature"] for r in conn.execute(_DAY_BUNDLE_SIGNATURE_SQL)
+            }
+            # 見送り理由はその日までの取引で決まる想定買付額にも依存する
+            sizes = assumed_buy_sizes(_read_block_trades(conn), sorted(day_signatures))
+        signatures = {
+            d: f"{prefix}|{sig}|p{sizes[d]:.2f}" for d, sig in day_signatures.items()
+        }
+        _day_bundle_signatures = (version, signatures)
+        return signatures
+
+
+def _load_stored_day_bundle(target_date: str) -> dict | None:
+    """事前計算済みのバンドル（その日の入力の指紋が一致するものだけ）を返す。"""
+    try:
+        with _connect_cache() as cache:
+            # 事前計算を一度も実行していなければ、指紋の集計もしない
+            if not _has_table(cache, DAY_BUNDLE_STORE_TABLE):
+                return None
+            signature = day_bundle_signatures().get(target_date)
+            if signature is None:
+                return None
+            row = cache.execute(
+                f"SELECT payload FROM {DAY_BUNDLE_STORE_TABLE} WHERE date = ? AND signature = ?",
+                (target_date, signature),
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"保存済み日付バンドルの参照に失敗 ({target_date}): {e}")
+        return None
+    if row is None:
+        return None
+    try:
+        return pickle.loads(row[0])
+    except Exception as e:
+        logger.warning(f"保存済み日付バンドルの読み込みに失敗 ({target_date}): {e}")
+        return None
+
+
+def _with_block_reasons(signals: pd.DataFrame, target_date: str) -> pd.DataFrame:
+    """シグナル一覧に見送り理由の列（reason / reason_label / detail）を付ける。"""
+    reasons = {r[0]: r[1:] for r in get_signal_block_reasons(target_date).itertuples(index=False)}
+    empty = (None, None, None)
+    values = [reasons.get(i, empty) for i in signals["id"]]
+    for pos, col in enumerate(("reason", "reason_label", "detail")):
+        signals[col] = [v[pos] for v in values]
+    return signals
+
+
+def _build_day_bundle(target_date: str) -> dict:
+    """date_detail ページが1日分の表示に使うデータを一括で読み込む。"""
+    return {
+        "date": target_date,
+        "summary": get_log_day_summary(target_date),
+        "runs": get_log_system_runs(target_date),
+        "ticker_flow": get_date_ticker_flow(target_date),
+        "news": get_log_news(target_date),
+        "analyses": get_log_analyses(target_date),
+        "signals": _with_block_reasons(get_log_signals(target_date), target_date),
+        "trades": get_log_trades(target_date),
+    }
+
+
+def get_day_bundle(target_date: str) -> dict:
+    """指定日のバンドルを返す（DBバージョンが同じ間はLRUから返す）。
+
+    LRU になければ、入力の指紋が一致する事前計算済みのもの（bundle_precompute.py）を
+    読み、それもなければその場で作る。
+    プリフェッチ中の日付であれば、二重に読み込まず完了を待つ。
+
+    Returns:
+        dict with keys: date, summary, runs, ticker_flow,
+        news, analyses, signals（見送り理由 reason / reason_label / detail 付き）, trades
+    """
+    key = (target_date, get_db_version())
+    while True:
+        with _day_bundle_lock:
+            bundle = _day_bundles.get(key)
+            if bundle is not None:
+                _day_bundles.move_to_end(key)
+                return bundle
+            event = _day_bundle_inflight.get(key)
+            if event is None:
+                event = _day_bundle_inflight[key] = threading.Event()
+                break
+        event.wait()
+
+    try:
+        bundle = _load_stored_day_bundle(target_date)
+        if bundle is None:
+            bundle = _build_day_bundle(target_date)
+        with _day_bundle_lock:
+            _day_bundles[key] = bundle
+            _day_bundles.move_to_end(key)
+            while len(_day_bundles) > DAY_BUNDLE_CACHE_SIZE:
+                _day_bundles.popitem(last=False)
+        return bundle
+    finally:
+        with _day_bundle_lock:
+            _day_bundle_inflight.pop(key, None)
+        event.set()
+
+
+def _prefetch_worker(dates: list[str]) -> None:
+    for target_date in dates:
+        try:
+            get_day_bundle(target_date)
+        except Exception as e:
+            logger.warning(f"日付バンドルのプリフェッチ失敗 ({target_date}): {e}")
+
+
+def prefetch_day_bundles(dates: list[str]) -> None:
+    """指定日のバンドルをバックグラウンドで読み込んでLRUに載せる。
+
+    表示中の日付の描画が終わった後に前後日を渡す想定。
+    すでにキャッシュ済み・読み込み中の日付はスキップする。
+    """
+    version = get_db_version()
+    with _day_bundle_lock:
+        todo = [
+            d
+            for d in dates
+            if d
+            and (d, version) not in _day_bundles
+            and (d, version) not in _day_bundle_inflight
+        ]
+    if todo:
+        threading.Thread(
+            target=_prefetch_worker, args=(todo,), name="day-prefetch", daemon=True
+        ).start()
+
+
+# ============================================================
+# ライブ更新（差分検知）
+# ============================================================
+
+# 監視テーブル → 更新されうる列の式（末尾の行の値もシグネチャに含め、状態更新を検知する）
+LIVE_TABLES = {
+    "system_runs": "COALESCE(status, '') || '|' || COALESCE(ended_at, '') || '|' || COALESCE(errors_count, 0)",
+    "signals": "COALESCE(status, '')",
+    "trades": "COALESCE(status, '') || '|' || COALESCE(exit_timestamp, '')",
+}
+# シグネチャに含める末尾の行数
+LIVE_WINDOW = 50
+
+# (db_version, signature)
+_live_signature: tuple[tuple, dict[str, tuple]] | None = None
+_live_signature_lock = threading.Lock()
+
+
+def get_live_signature() -> dict[str, tuple]:
+    """監視テーブルごとの変更検知用シグネチャを返す。
+
+    DBのバージョントークン（stat のみ）が前回と同じならSQLiteに触れずに前回値を返す。
+    変わったときだけ各テーブルの max(rowid) と末尾 LIVE_WINDOW 行の可変列を読む
+    （rowid 降順の範囲読みなのでテーブルサイズに依らず数十行分のコスト）。
+
+    Returns:
+        table → (max_rowid, 末尾行の可変列を連結した文字列)
+    """
+    global _live_signature
+    version = get_db_version()
+    cached = _live_signature
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _live_signature_lock:
+        if _live_signature is not None and _live_signature[0] == version:
+            return _live_signature[1]
+        signature: dict[str, tuple] = {}
+        with _connect() as conn:
+            for table, expr in LIVE_TABLES.items():
+                try:
+                    row = conn.execute(
+                        f"SELECT max(r), group_concat(v, ',') FROM ("
+                        f"  SELECT rowid AS r, {expr} AS v FROM {table}"
+                        f"  ORDER BY rowid DESC LIMIT ?"
+                        f")",
+                        (LIVE_WINDOW,),
+                    ).fetchone()
+                    signature[table] = (row[0] or 0, row[1] or "")
+                except sqlite3.Error as e:
+                    logger.warning(f"ライブ更新シグネチャ取得エラー ({table}): {e}")
+                    signature[table] = (0, "")
+        _live_signature = (version, signature)
+        return signature
+
+
+def changed_live_tables(
+    previous: dict[str, tuple] | None, current: dict[str, tuple]
+) -> list[str]:
+    """前回のシグネチャから変化した監視テーブル名を返す（初回は空）。"""
+    if previous is None:
+        return []
+    return [t for t in current if previous.get(t) != current[t]]
@@ -0,0 +1,275 @@
+"""
+ダッシュボードDBのテーブルエクスポート（CSV / Parquet）
+
+クエリ結果を chunksize 行ずつ読み出して書き出すため、全期間のニュースなど
+大きなテーブルでもメモリ使用量はチャンク1つ分に収まる。
+フィルタは get_* 関数と同じく 期間（start_date / end_date）・対象日（target_date）・
+銘柄（ticker）で指定する。
+
+CLI:
+    python data_export.py signals trades --start 2026-01-24 --format parquet -o exports/
+    python data_export.py news --date 2026-02-03 --ticker NVDA -o news_nvda.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import logging
+import sys
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, BinaryIO
+
+import pandas as pd
+
+import dashboard_data as _dm
+
+logger = logging.getLogger(__name__)
+
+# 1チャンクの行数（news.content を含めても数十MB程度に収まる目安）
+DEFAULT_CHUNKSIZE = 5_000
+
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def available_formats() -> dict[str, tuple[str, str]]:
+    """この環境で書き出せる形式（pyarrow がなければ Parquet を除く）。"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return {k: v for k, v in FORMATS.items() if k != "parquet"}
+    return FORMATS
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """エクスポート対象テーブルの定義。"""
+
+    table: str
+    ts_col: str
+    # "column": ticker 列で絞り込み / "json": tickers_json 配列で絞り込み / None: 不可
+    ticker_filter: str | None = "column"
+    # 日付フィルタで ts_col と OR で評価する列（取引の決済日など、get_log_* と同じ判定）
+    alt_ts_col: str | None = None
+
+
+EXPORT_TABLES = {
+    "news": ExportSpec("news", "created_at", "json"),
+    "ai_analysis": ExportSpec("ai_analysis", "analyzed_at"),
+    "signals": ExportSpec("signals", "detected_at"),
+    "trades": ExportSpec("trades", "entry_timestamp", alt_ts_col="exit_timestamp"),
+    "signal_tracking": ExportSpec("signal_tracking", "signal_timestamp"),
+    "positions": ExportSpec("positions", "entry_timestamp"),
+    "system_runs": ExportSpec("system_runs", "started_at", None),
+    "portfolio_snapshots": ExportSpec("portfolio_snapshots", "timestamp", None),
+}
+
+
+def _build_query(
+    name: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    target_date: str | None = None,
+    ticker: str | None = None,
+    columns: list[str] | None = None,
+) -> tuple[str, list]:
+    if name not in EXPORT_TABLES:
+        raise ValueError(f"unknown table: {name} (choices: {', '.join(EXPORT_TABLES)})")
+    spec = EXPORT_TABLES[name]
+    select = ", ".join(columns) if columns else "*"
+    where, params = [], []
+    date_conds, date_params = [], []
+    if target_date:
+        date_conds.append("date({col}) = ?")
+        date_params.append(target_date)
+    if start_date:
+        date_conds.append("date({col}) >= ?")
+        date_params.append(start_date)
+    if end_date:
+        date_conds.append("date({col}) <= ?")
+        date_params.append(end_date)
+    if date_conds:
+        ts_cols = [c for c in (spec.ts_col, spec.alt_ts_col) if c]
+        where.append(
+            "("
+            + " OR ".join(
+                "(" + " AND ".join(c.format(col=col) for c in date_conds) + ")"
+                for col in ts_cols
+            )
+            + ")"
+        )
+        params += date_params * len(ts_cols)
+    if ticker:
+        if spec.ticker_filter == "column":
+            where.append("ticker = ?")
+        elif spec.ticker_filter == "json":
+            where.append(
+                "EXISTS (SELECT 1 FROM json_each(CASE WHEN json_valid(tickers_json) "
+                "THEN tickers_json ELSE '[]' END) WHERE value = ?)"
+            )
+        else:
+            raise ValueError(f"{name} は銘柄で絞り込めません")
+        params.append(ticker)
+    sql = f"SELECT {select} FROM {spec.table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {spec.ts_col}, rowid"
+    return sql, params
+
+
+def iter_chunks(
+    name: str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    **filters,
+) -> Iterator[pd.DataFrame]:
+    """フィルタに一致する行を chunksize 行ずつの DataFrame で返す。
+
+    Args:
+        name: EXPORT_TABLES のキー
+        chunksize: 1チャンクの行数
+        **filters: start_date, end_date, target_date, ticker, columns
+    """
+    sql, params = _build_query(name, **filters)
+    with _dm._connect() as conn:
+        yield from pd.read_sql_query(sql, conn, params=params, chunksize=chunksize)
+
+
+def _arrow_schema(name: str, columns: list[str]):
+    """SQLite の宣言型から Arrow スキーマを作る（チャンク間で型を揃えるため）。"""
+    import pyarrow as pa
+
+    with _dm._connect() as conn:
+        declared = {
+            r["name"]: (r["type"] or "").upper()
+            for r in conn.execute(f"PRAGMA table_info({EXPORT_TABLES[name].table})")
+        }
+
+    def to_arrow(decl: str):
+        if "INT" in decl:
+            return pa.int64()
+        if any(k in decl for k in ("REAL", "FLOA", "DOUB", "NUMERIC", "DECIMAL")):
+            return pa.float64()
+        return pa.string()
+
+    return pa.schema([(c, to_arrow(declared.get(c, ""))) for c in columns])
+
+
+def write_csv(name: str, dest: str | Path | IO[str], chunksize: int = DEFAULT_CHUNKSIZE, **filters) -> int:
+    """CSV に書き出し、行数を返す。dest はパスまたはテキストファイルオブジェクト。"""
+    rows, header_written = 0, False
+    with contextlib.ExitStack() as stack:
+        if isinstance(dest, (str, Path)):
+            fh = stack.enter_context(open(dest, "w", newline="", encoding="utf-8"))
+        else:
+            fh = dest
+        for chunk in iter_chunks(name, chunksize, **filters):
+            chunk.to_csv(fh, header=not header_written, index=False, quoting=csv.QUOTE_MINIMAL)
+            header_written = True
+            rows += len(chunk)
+        if not header_written:
+            # 0件でもヘッダー行だけは出す
+            sql, params = _build_query(name, **filters)
+            with _dm._connect() as conn:
+                cols = [d[0] for d in conn.execute(sql + " LIMIT 0", params).description]
+            pd.DataFrame(columns=cols).to_csv(fh, index=False)
+    return rows
+
+
+def write_parquet(name: str, dest: str | Path | IO[bytes], chunksize: int = DEFAULT_CHUNKSIZE, **filters) -> int:
+    """Parquet に書き出し、行数を返す（チャンクごとに row group を追加）。
+
+    pyarrow が必要（requirements.txt に含む）。
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet 出力には pyarrow が必要です: pip install pyarrow") from e
+
+    sql, params = _build_query(name, **filters)
+    with _dm._connect() as conn:
+        columns = [d[0] for d in conn.execute(sql + " LIMIT 0", params).description]
+    schema = _arrow_schema(name, columns)
+
+    rows = 0
+    with pq.ParquetWriter(dest, schema) as writer:
+        for chunk in iter_chunks(name, chunksize, **filters):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+def export_table(name: str, dest, fmt: str = "csv", chunksize: int = DEFAULT_CHUNKSIZE, **filters) -> int:
+    """fmt（"csv" / "parquet"）に応じて書き出し、行数を返す。"""
+    if fmt == "csv":
+        return write_csv(name, dest, chunksize, **filters)
+    if fmt == "parquet":
+        return write_parquet(name, dest, chunksize, **filters)
+    raise ValueError(f"unknown format: {fmt}")
+
+
+def export_to_tempfile(name: str, fmt: str = "csv", **filters) -> BinaryIO:
+    """ダウンロード用に一時ファイルへ書き出し、読み込み用に開いたファイルを返す。
+
+    書き出しはチャンク単位なので生成中のメモリは有界。st.download_button が受け付ける
+    BufferedReader を返す（パスは開いた直後に削除し、ファイルは閉じた時点で消える）。
+    """
+    _, ext = FORMATS[fmt]
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
+        path = Path(tmp.name)
+    try:
+        export_table(name, path, fmt, **filters)
+        return open(path, "rb")
+    finally:
+        # Windows では開いているファイルを削除できない（一時ディレクトリに残る）
+        with contextlib.suppress(OSError):
+            path.unlink()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ダッシュボードDBのテーブルを CSV / Parquet に書き出す")
+    parser.add_argument("tables", nargs="+", choices=list(EXPORT_TABLES), help="対象テーブル")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("-o", "--out", default=".", help="出力ファイル（テーブル1つのとき）またはディレクトリ")
+    parser.add_argument("--start", dest="start_date", help="開始日 YYYY-MM-DD（含む）")
+    parser.add_argument("--end", dest="end_date", help="終了日 YYYY-MM-DD（含む）")
+    parser.add_argument("--date", dest="target_date", help="対象日 YYYY-MM-DD")
+    parser.add_argument("--ticker", help="銘柄で絞り込み")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    out = Path(args.out)
+    ext = FORMATS[args.format][1]
+    single_file = len(args.tables) == 1 and out.suffix == ext
+    if not single_file:
+        out.mkdir(parents=True, exist_ok=True)
+
+    filters = {
+        k: v
+        for k, v in {
+            "start_date": args.start_date,
+            "end_date": args.end_date,
+            "target_date": args.target_date,
+            "ticker": args.ticker,
+        }.items()
+        if v
+    }
+    for name in args.tables:
+        if args.ticker and EXPORT_TABLES[name].ticker_filter is None:
+            print(f"{name}: 銘柄で絞り込めないためスキップ", file=sys.stderr)
+            continue
+        dest = out if single_file else out / f"{name}{ext}"
+        rows = export_table(name, dest, args.format, args.chunksize, **filters)
+        print(f"{name}: {rows:,} rows -> {dest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
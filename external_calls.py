@@ -0,0 +1,250 @@
+"""
+外部API呼び出しラッパー（stale-while-revalidate + サーキットブレーカー）
+
+Alpaca / yfinance など、遅延や障害が起こりうる外部呼び出しを共通化する。
+- 取得済みの値があれば即座に返し、期限切れならバックグラウンドで再取得する
+- プロバイダ単位で連続失敗を数え、閾値に達したら一定時間呼び出しを止める
+  （既知の障害中プロバイダを画面描画が待たないようにする）
+
+キャッシュはプロセス全体で共有され、Streamlit の全セッションから参照される。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# 連続失敗この回数でサーキットを open にする
+FAILURE_THRESHOLD = 3
+# open 状態を維持する秒数（経過後に試行1回だけ許可 = half-open）
+RESET_TIMEOUT = 60.0
+# キャッシュが空のとき、初回取得を待つ最大秒数
+FIRST_LOAD_WAIT = 8.0
+
+# サイドバー表示用のプロバイダ名
+PROVIDER_LABELS = {
+    "alpaca": "Alpaca",
+    "yahoo": "Yahoo Finance",
+}
+
+
+class CircuitBreaker:
+    """プロバイダ単位のサーキットブレーカー（closed → open → half_open）"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.last_success_at: float | None = None
+        self.last_failure_at: float | None = None
+        self.last_error = ""
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """呼び出してよいか。half_open では試行を1件だけ通す。"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.last_success_at = time.time()
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Exception | str) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_failure_at = time.time()
+            self.last_error = str(error)[:200]
+            if self._trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(
+                        f"circuit open: {self.name} "
+                        f"({self.consecutive_failures}回連続失敗: {self.last_error})"
+                    )
+                self.opened_at = time.time()
+            self._trial_in_flight = False
+
+
+_lock = threading.Lock()
+# (provider, key) → {"value", "fetched_at", "refreshing", "invalidated"}
+_entries: dict[tuple[str, Any], dict] = {}
+# (provider, key) → 初回取得の完了イベント
+_inflight: dict[tuple[str, Any], threading.Event] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(provider)
+        return breaker
+
+
+def _refresh(
+    provider: str,
+    key: Any,
+    fn: Callable[[], Any],
+    is_failure: Callable[[Any], bool] | None,
+) -> None:
+    cache_key = (provider, key)
+    breaker = get_breaker(provider)
+    try:
+        value = fn()
+        if is_failure is not None and is_failure(value):
+            raise ValueError("empty result")
+    except Exception as e:
+        logger.warning(f"{provider} fetch failed ({key}): {e}")
+        breaker.record_failure(e)
+        with _lock:
+            entry = _entries.get(cache_key)
+            if entry is not None:
+                entry["refreshing"] = False
+    else:
+        breaker.record_success()
+        with _lock:
+            _entries[cache_key] = {
+                "value": value,
+                "fetched_at": time.time(),
+                "refreshing": False,
+                "invalidated": False,
+            }
+    finally:
+        with _lock:
+            event = _inflight.pop(cache_key, None)
+        if event is not None:
+            event.set()
+
+
+def _start_refresh(provider, key, fn, is_failure) -> None:
+    threading.Thread(
+        target=_refresh,
+        args=(provider, key, fn, is_failure),
+        name=f"swr-{provider}",
+        daemon=True,
+    ).start()
+
+
+def swr_call(
+    provider: str,
+    key: Any,
+    fn: Callable[[], Any],
+    ttl: float,
+    default: Any = None,
+    is_failure: Callable[[Any], bool] | None = None,
+) -> Any:
+    """stale-while-revalidate で外部呼び出しの結果を返す。
+
+    - TTL内の値があればそれを返す
+    - 期限切れの値があれば即座に返し、裏で再取得を開始する
+    - 値がなければ最大 FIRST_LOAD_WAIT 秒だけ初回取得を待ち、間に合わなければ default
+    - サーキットが open の間は fn を呼ばずに手元の値（なければ default）を返す
+
+    Args:
+        provider: サーキットブレーカーの単位（"alpaca", "yahoo" など）
+        key: プロバイダ内でのキャッシュキー（引数を含めること）
+        fn: 実際の取得関数。失敗時は例外を送出する
+        ttl: 鮮度を保つ秒数
+        default: 値が得られないときの戻り値
+        is_failure: 例外以外で失敗とみなす結果の判定（空DataFrameなど）
+    """
+    cache_key = (provider, key)
+    breaker = get_breaker(provider)
+    with _lock:
+        entry = _entries.get(cache_key)
+        if entry is not None:
+            if not entry["invalidated"] and time.time() - entry["fetched_at"] < ttl:
+                return entry["value"]
+            if not entry["refreshing"] and breaker.allow():
+                entry["refreshing"] = True
+                _start_refresh(provider, key, fn, is_failure)
+            return entry["value"]
+
+        event = _inflight.get(cache_key)
+        if event is None:
+            if not breaker.allow():
+                return default
+            event = _inflight[cache_key] = threading.Event()
+            _start_refresh(provider, key, fn, is_failure)
+
+    event.wait(FIRST_LOAD_WAIT)
+    with _lock:
+        entry = _entries.get(cache_key)
+        return entry["value"] if entry is not None else default
+
+
+def fetched_at(provider: str, key: Any) -> float | None:
+    """swr_call が返している値の取得時刻（まだ値がなければ None）。"""
+    with _lock:
+        entry = _entries.get((provider, key))
+        return entry["fetched_at"] if entry is not None else None
+
+
+def invalidate(provider: str | None = None) -> None:
+    """キャッシュを期限切れにする（値は保持し、次回参照時に裏で再取得）。"""
+    with _lock:
+        for (p, _), entry in _entries.items():
+            if provider is None or p == provider:
+                entry["invalidated"] = True
+
+
+def provider_health() -> list[dict]:
+    """プロバイダごとの状態と鮮度を返す（サイドバー表示用）。
+
+    Returns:
+        list of dicts with keys: provider, label, state, consecutive_failures,
+        last_error, last_success_at, staleness_sec (最も古いキャッシュの経過秒数)
+    """
+    now = time.time()
+    providers = list(PROVIDER_LABELS)
+    with _lock:
+        providers += [p for p in _breakers if p not in PROVIDER_LABELS]
+        oldest: dict[str, float] = {}
+        for (p, _), entry in _entries.items():
+            fetched = entry["fetched_at"]
+            oldest[p] = min(oldest.get(p, fetched), fetched)
+
+    result = []
+    for provider in providers:
+        breaker = get_breaker(provider)
+        fetched = oldest.get(provider)
+        result.append(
+            {
+                "provider": provider,
+                "label": PROVIDER_LABELS.get(provider, provider),
+                "state": breaker.state,
+                "consecutive_failures": breaker.consecutive_failures,
+                "last_error": breaker.last_error,
+                "last_success_at": breaker.last_success_at,
+                "staleness_sec": (now - fetched) if fetched else None,
+            }
+        )
+    return result
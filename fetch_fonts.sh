@@ -0,0 +1,29 @@
+#!/bin/bash
+# Inter フォント取得スクリプト（自前ホスト用）
+# 使い方: ./fetch_fonts.sh
+# rsms/inter の公式リリースから可変フォント（woff2）を static/fonts/ に配置する。
+# 取得後は static/fonts/ をコミットする（実行時に外部フォントは読み込まない）
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+INTER_VERSION="4.1"
+INTER_URL="https://github.com/rsms/inter/releases/download/v${INTER_VERSION}/Inter-${INTER_VERSION}.zip"
+FONT_DIR="$SCRIPT_DIR/static/fonts"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+echo "=== Fetch Inter ${INTER_VERSION} ==="
+
+echo "[1/2] Downloading ${INTER_URL}..."
+curl -fsSL -o "$TMP_DIR/inter.zip" "$INTER_URL"
+
+echo "[2/2] Extracting woff2 to ${FONT_DIR}..."
+mkdir -p "$FONT_DIR"
+unzip -q -j -o "$TMP_DIR/inter.zip" \
+    "web/InterVariable.woff2" "LICENSE.txt" \
+    -d "$FONT_DIR"
+mv -f "$FONT_DIR/LICENSE.txt" "$FONT_DIR/Inter-LICENSE.txt"
+
+ls -la "$FONT_DIR"
+echo "Done. Commit static/fonts/ to serve Inter from the app."
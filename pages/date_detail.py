@@ -5,13 +5,19 @@ NAV: Date navigation (compact)
 ROW 1: Summary metrics
 ROW 2: [System run log] | [Ticker flow]
 ROW 3: Detail data tabs
+ROW 4: Spec markdown
+
+Fragments: NAV〜ROW 3 = 日付ビュー（日付操作はここだけ再実行）,
+           ROW 3 = 詳細データ（行選択はタブだけ再実行）
 """
 
+import json
 import logging
 from datetime import date, datetime
 from pathlib import Path
 
 import dashboard_data as _dm
+import pandas as pd
 import streamlit as st
 
 from components.shared import (
@@ -21,10 +27,15 @@ from components.shared import (
     W,
     WEEKDAY_JP,
     card_title,
-    fmt_currency,
-    render_pill,
+    esc_col,
+    export_buttons,
+    fmt_currency_col,
+    pill_col,
+    render_html_table,
+    rerun_fragment,
     status_badge,
     status_dot_html,
+    timed_fragment,
 )
 
 logger = logging.getLogger(__name__)
@@ -59,7 +70,100 @@ def _hm(ts: str) -> str:
 
 def _set_date_query(d: date) -> None:
     st.query_params["date"] = d.isoformat()
-    st.rerun()
+    rerun_fragment()
+
+
+def _parse_json(raw):
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def _selectable_table(view, cols: list[str], key: str) -> list[int]:
+    """行選択できる一覧を表示し、選択された行の id を返す。
+
+    長文カラムは一覧に含めず、選択された行だけ get_log_*_detail で取得する。
+    """
+    event = st.dataframe(
+        view[cols + ["id"]],
+        use_container_width=True,
+        hide_index=True,
+        column_config={"id": None},
+        on_select="rerun",
+        selection_mode="multi-row",
+        key=key,
+    )
+    rows = event.selection.rows if event else []
+    return [int(view["id"].iloc[i]) for i in rows]
+
+
+_FLOW_STATE_COLORS = {
+    "signal_only": "#d97706",
+    "analysis_only": P,
+    "news_only": "#71717a",
+    "none": "#71717a",
+}
+
+
+def _ticker_flow_cells(ticker_flow: list[dict], reasons: pd.Series) -> pd.DataFrame:
+    """Ticker別フローのセル（HTML）を列単位で組み立てる（reasons: シグナルid → 見送り理由）"""
+    flow = pd.DataFrame(ticker_flow)
+    state = flow["state"]
+    # 最新の取引・シグナル（dict / None）を列に展開する
+    trd = pd.DataFrame([t or {} for t in flow["trade"]], index=flow.index).reindex(
+        columns=["action", "price", "shares", "pnl"]
+    )
+    sig = pd.DataFrame([x or {} for x in flow["signal"]], index=flow.index).reindex(
+        columns=["id", "type", "conviction"]
+    )
+    has_trade = flow["trade"].notna()
+    has_signal = flow["signal"].notna()
+
+    action = trd["action"].fillna("-").astype(str)
+    color = state.map(_FLOW_STATE_COLORS).fillna("#71717a")
+    color = color.mask(state == "traded", action.map({"BUY": W}).fillna(L))
+
+    # 売買: "BUY 10株 @ $12.34 / +$56（ほかN件）"
+    pnl = pd.to_numeric(trd["pnl"], errors="coerce")
+    pnl_txt = fmt_currency_col(pnl, show_sign=True).where(pnl.notna(), "-")
+    more = ("（ほか" + (flow["trade_count"] - 1).astype(str) + "件）").where(
+        flow["trade_count"] > 1, ""
+    )
+    price = pd.to_numeric(trd["price"], errors="coerce").fillna(0.0)
+    shares = pd.to_numeric(trd["shares"], errors="coerce").fillna(0).astype(int)
+    trade_txt = (
+        action + " " + shares.astype(str) + "株 @ $" + price.map("{:.2f}".format)
+        + " / " + pnl_txt + more
+    )
+
+    # シグナルのみ: "BUY 確信度 8 / シグナル2件 (pending, executed)"
+    statuses = flow["signals"].map(
+        lambda ss: ", ".join(str(x.get("status") or "-") for x in ss)
+    )
+    conviction = (
+        pd.to_numeric(sig["conviction"], errors="coerce").fillna(0).astype(int)
+    )
+    reason = sig["id"].map(reasons)
+    signal_txt = (
+        sig["type"].fillna("-").astype(str)
+        + " 確信度 " + conviction.astype(str)
+        + " / シグナル" + flow["signal_count"].astype(str) + "件 (" + statuses + ")"
+        + (" / 見送り: " + reason).fillna("")
+    )
+
+    detail = pd.Series("売買判断なし", index=flow.index)
+    detail = detail.mask(has_signal, signal_txt).mask(has_trade, trade_txt)
+
+    return pd.DataFrame(
+        {
+            "銘柄": "<b>" + esc_col(flow["ticker"]) + "</b>",
+            "到達段階": pill_col(state.map(_dm.TICKER_FLOW_STATES), color),
+            "内容": '<span class="sub">' + esc_col(detail) + "</span>",
+        }
+    )
 
 
 @st.cache_data(ttl=300, show_spinner=False)
@@ -94,345 +198,374 @@ available_dates = (
 )
 fresh = _dm.get_data_latest_dates()
 
-latest_available = available_dates[-1] if available_dates else date.today()
-earliest_available = available_dates[0] if available_dates else date.today()
-
-query_date = _as_date(st.query_params.get("date"), latest_available)
-if query_date < earliest_available:
-    query_date = earliest_available
-if query_date > latest_available:
-    query_date = latest_available
-
-idx = (
-    available_dates.index(query_date) if query_date in available_dates else -1
-)
-prev_date = available_dates[idx - 1] if idx > 0 else None
-next_date = (
-    available_dates[idx + 1]
-    if idx >= 0 and idx < len(available_dates) - 1
-    else None
-)
-
 st.title("日付詳細")
 st.caption("日付ごとの詳細ログとTicker別フロー")
 
 
 # ============================================================
-# NAV: Date navigation (compact card)
+# ROW 3: 詳細データ（タブ）
 # ============================================================
 
-with st.container(border=True):
-    nav1, nav2, nav3, nav4 = st.columns([1.2, 2.5, 1.2, 1.1])
-    with nav1:
-        if st.button(
-            "◀ 前日", use_container_width=True, disabled=prev_date is None
-        ):
-            _set_date_query(prev_date)
-    with nav2:
-        picked = st.date_input(
-            "表示日",
-            value=query_date,
-            min_value=earliest_available,
-            max_value=max(latest_available, date.today()),
-            format="YYYY-MM-DD",
+
+@timed_fragment("詳細データ")
+def _detail_tabs(target_date: str, news_df, analysis_df, sig_df, trades_df) -> None:
+    """詳細データのタブ。行の選択ではこのカードだけが再実行される。"""
+    with st.container(border=True):
+        card_title("詳細データ", color=P)
+
+        tab_news, tab_analysis, tab_signals, tab_trades = st.tabs(
+            [
+                f"ニュース ({len(news_df)})",
+                f"AI分析 ({len(analysis_df)})",
+                f"シグナル ({len(sig_df)})",
+                f"取引 ({len(trades_df)})",
+            ]
         )
-    with nav3:
-        if st.button(
-            "翌日 ▶", use_container_width=True, disabled=next_date is None
-        ):
-            _set_date_query(next_date)
-    with nav4:
-        if st.button(
-            "最新へ",
-            use_container_width=True,
-            disabled=query_date == latest_available,
-        ):
-            _set_date_query(latest_available)
-    if picked != query_date:
-        _set_date_query(picked)
-
-target_date = query_date.isoformat()
-wd = WEEKDAY_JP[query_date.weekday()]
-summary = _dm.get_log_day_summary(target_date)
-runs = _dm.get_log_system_runs(target_date)
-ticker_flow = _dm.get_date_ticker_flow(target_date)
-
-completed_runs = (
-    len(runs[runs["status"] == "completed"]) if len(runs) > 0 else 0
-)
-run_success_rate = (
-    (completed_runs / len(runs) * 100) if len(runs) > 0 else 0
-)
-traded_cnt = sum(1 for tf in ticker_flow if tf.get("trade"))
-signal_only_cnt = sum(
-    1 for tf in ticker_flow if tf.get("signal") and not tf.get("trade")
-)
 
-news_df = _dm.get_log_news(target_date)
-analysis_df = _dm.get_log_analyses(target_date)
-sig_df = _dm.get_log_signals(target_date)
-trades_df = _dm.get_log_trades(target_date)
+        with tab_news:
+            if len(news_df) > 0:
+                view = news_df.copy()
+                cols = [
+                    c
+                    for c in [
+                        "created_at",
+                        "source",
+                        "title",
+                        "theme",
+                        "importance",
+                    ]
+                    if c in view.columns
+                ]
+                ids = _selectable_table(view, cols, f"news_{target_date}")
+                if ids:
+                    for _, r in _dm.get_log_news_detail(ids).iterrows():
+                        with st.expander(r["title"] or "(無題)", expanded=True):
+                            st.markdown(r["content"] or "本文なし")
+                            if r["url"]:
+                                st.caption(r["url"])
+                else:
+                    st.caption("行を選択すると本文を表示します。")
+                export_buttons(
+                    "news", f"news_{target_date}", f"export_news_{target_date}",
+                    target_date=target_date,
+                )
+            else:
+                st.info("ニュースなし")
+
+        with tab_analysis:
+            if len(analysis_df) > 0:
+                view = analysis_df.copy()
+                cols = [
+                    c
+                    for c in [
+                        "analyzed_at",
+                        "theme",
+                        "ticker",
+                        "analysis_type",
+                        "direction",
+                        "score",
+                        "recommendation",
+                    ]
+                    if c in view.columns
+                ]
+                ids = _selectable_table(view, cols, f"analysis_{target_date}")
+                if ids:
+                    labels = view.set_index("id")
+                    for _, r in _dm.get_log_analyses_detail(ids).iterrows():
+                        head = labels.loc[r["id"]]
+                        title = " / ".join(
+                            str(v) for v in (head["theme"], head["ticker"]) if v
+                        )
+                        with st.expander(title or "AI分析", expanded=True):
+                            if r["summary"]:
+                                st.markdown(f"**{r['summary']}**")
+                            points = _parse_json(r["key_points_json"])
+                            if isinstance(points, list) and points:
+                                st.markdown("\n".join(f"- {p}" for p in points))
+                            st.markdown(r["detailed_analysis"] or "詳細なし")
+                else:
+                    st.caption("行を選択すると詳細分析を表示します。")
+                export_buttons(
+                    "ai_analysis", f"ai_analysis_{target_date}", f"export_ai_analysis_{target_date}",
+                    target_date=target_date,
+                )
+            else:
+                st.info("AI分析なし")
+
+        with tab_signals:
+            if len(sig_df) > 0:
+                view = sig_df.copy()
+                if "detected_at" in view.columns:
+                    view = view.sort_values("detected_at", ascending=False)
+                cols = [
+                    c
+                    for c in [
+                        "detected_at",
+                        "ticker",
+                        "signal_type",
+                        "conviction",
+                        "confidence",
+                        "price",
+                        "status",
+                        "reason_label",
+                    ]
+                    if c in view.columns
+                ]
+                ids = _selectable_table(view, cols, f"signals_{target_date}")
+                if ids:
+                    blocked = (
+                        view.set_index("id")[["reason_label", "detail"]]
+                        if "reason_label" in view.columns
+                        else pd.DataFrame(columns=["reason_label", "detail"])
+                    )
+                    for _, r in _dm.get_log_signals_detail(ids).iterrows():
+                        with st.expander(f"{r['ticker']} の判断理由", expanded=True):
+                            label = blocked["reason_label"].get(r["id"])
+                            if isinstance(label, str):
+                                detail = blocked["detail"].get(r["id"])
+                                st.caption(
+                                    f"見送り理由: {label}"
+                                    + (f"（{detail}）" if isinstance(detail, str) and detail else "")
+                                )
+                            st.markdown(r["reasoning"] or "理由の記録なし")
+                            factors = _parse_json(r["decision_factors_json"])
+                            if factors:
+                                st.json(factors, expanded=False)
+                else:
+                    st.caption("行を選択すると判断理由を表示します。")
+                export_buttons(
+                    "signals", f"signals_{target_date}", f"export_signals_{target_date}",
+                    target_date=target_date,
+                )
+            else:
+                st.info("シグナルなし")
+
+        with tab_trades:
+            if len(trades_df) > 0:
+                view = trades_df.copy()
+                if "entry_timestamp" in view.columns:
+                    view = view.sort_values(
+                        "entry_timestamp", ascending=False
+                    )
+                cols = [
+                    c
+                    for c in [
+                        "entry_timestamp",
+                        "exit_timestamp",
+                        "ticker",
+                        "action",
+                        "shares",
+                        "entry_price",
+                        "exit_price",
+                        "profit_loss",
+                        "status",
+                    ]
+                    if c in view.columns
+                ]
+                st.dataframe(
+                    view[cols], use_container_width=True, hide_index=True
+                )
+                export_buttons(
+                    "trades", f"trades_{target_date}", f"export_trades_{target_date}",
+                    target_date=target_date,
+                )
+            else:
+                st.info("取引なし")
 
 
 # ============================================================
-# ROW 1: サマリー (full width)
+# 日付ビュー（NAV〜ROW 3）
+# 日付の切り替えはこのフラグメント内で完結し、ページ全体は再実行しない
 # ============================================================
 
-with st.container(border=True):
-    card_title(
-        f"{target_date} ({wd})",
-        color=P,
-        subtitle=f"最新データ: {fresh.get('latest', '-') or '-'}",
+
+@timed_fragment("日付ビュー")
+def _date_view(available_dates: list[date], fresh: dict) -> None:
+    latest_available = available_dates[-1] if available_dates else date.today()
+    earliest_available = available_dates[0] if available_dates else date.today()
+
+    query_date = _as_date(st.query_params.get("date"), latest_available)
+    if query_date < earliest_available:
+        query_date = earliest_available
+    if query_date > latest_available:
+        query_date = latest_available
+
+    idx = (
+        available_dates.index(query_date) if query_date in available_dates else -1
+    )
+    prev_date = available_dates[idx - 1] if idx > 0 else None
+    next_date = (
+        available_dates[idx + 1]
+        if idx >= 0 and idx < len(available_dates) - 1
+        else None
     )
 
-    m1, m2, m3, m4, m5, m6 = st.columns(6)
-    m1.metric("ニュース", f"{summary['news']}件")
-    m2.metric("AI分析", f"{summary['analysis']}件")
-    m3.metric("シグナル", f"{summary['signals']}件")
-    m4.metric("約定", f"{summary['trades']}件")
-    m5.metric("実行回数", f"{summary['runs']}回")
-    m6.metric("完了率", f"{run_success_rate:.0f}%")
-
-    if summary["trades"] > 0:
-        st.success(
-            f"この日は {summary['trades']} 件の売買が実行されています。"
-        )
-    elif summary["signals"] > 0:
-        st.warning("シグナルは出ていますが、売買実行はありません。")
-    else:
-        st.info("売買判断・実行はありません。")
+    # ============================================================
+    # NAV: Date navigation (compact card)
+    # ============================================================
 
+    with st.container(border=True):
+        nav1, nav2, nav3, nav4 = st.columns([1.2, 2.5, 1.2, 1.1])
+        with nav1:
+            if st.button(
+                "◀ 前日", use_container_width=True, disabled=prev_date is None
+            ):
+                _set_date_query(prev_date)
+        with nav2:
+            picked = st.date_input(
+                "表示日",
+                value=query_date,
+                min_value=earliest_available,
+                max_value=max(latest_available, date.today()),
+                format="YYYY-MM-DD",
+            )
+        with nav3:
+            if st.button(
+                "翌日 ▶", use_container_width=True, disabled=next_date is None
+            ):
+                _set_date_query(next_date)
+        with nav4:
+            if st.button(
+                "最新へ",
+                use_container_width=True,
+                disabled=query_date == latest_available,
+            ):
+                _set_date_query(latest_available)
+        if picked != query_date:
+            _set_date_query(picked)
+
+    target_date = query_date.isoformat()
+    wd = WEEKDAY_JP[query_date.weekday()]
+    bundle = _dm.get_day_bundle(target_date)
+    summary = bundle["summary"]
+    runs = bundle["runs"]
+    ticker_flow = bundle["ticker_flow"]
+
+    completed_runs = (
+        len(runs[runs["status"] == "completed"]) if len(runs) > 0 else 0
+    )
+    run_success_rate = (
+        (completed_runs / len(runs) * 100) if len(runs) > 0 else 0
+    )
+    traded_cnt = sum(1 for tf in ticker_flow if tf["state"] == "traded")
+    signal_only_cnt = sum(1 for tf in ticker_flow if tf["state"] == "signal_only")
 
-# ============================================================
-# ROW 2: [実行ログ] | [Ticker別フロー] — 2-column grid
-# ============================================================
+    news_df = bundle["news"]
+    analysis_df = bundle["analyses"]
+    sig_df = bundle["signals"]
+    trades_df = bundle["trades"]
 
-grid_left, grid_right = st.columns(2)
+    # ============================================================
+    # ROW 1: サマリー (full width)
+    # ============================================================
 
-with grid_left:
     with st.container(border=True):
         card_title(
-            "実行ログ",
+            f"{target_date} ({wd})",
             color=P,
-            subtitle=f"{len(runs)}回" if len(runs) > 0 else "0回",
+            subtitle=f"最新データ: {fresh.get('latest', '-') or '-'}",
         )
 
-        if len(runs) == 0:
-            st.caption("この日の実行記録はありません。")
+        m1, m2, m3, m4, m5, m6 = st.columns(6)
+        m1.metric("ニュース", f"{summary['news']}件")
+        m2.metric("AI分析", f"{summary['analysis']}件")
+        m3.metric("シグナル", f"{summary['signals']}件")
+        m4.metric("約定", f"{summary['trades']}件")
+        m5.metric("実行回数", f"{summary['runs']}回")
+        m6.metric("完了率", f"{run_success_rate:.0f}%")
+
+        if summary["trades"] > 0:
+            st.success(
+                f"この日は {summary['trades']} 件の売買が実行されています。"
+            )
+        elif summary["signals"] > 0:
+            st.warning("シグナルは出ていますが、売買実行はありません。")
         else:
-            for i, (_, r) in enumerate(runs.iterrows()):
-                if i > 0:
-                    st.divider()
-                status = str(r.get("status", ""))
-                mode_label = MODE_LABELS.get(
-                    r.get("run_mode", ""), r.get("run_mode", "")
-                )
-                status_labels = {
-                    "completed": "正常完了",
-                    "failed": "失敗",
-                    "running": "実行中",
-                    "interrupted": "中断",
-                }
-                status_label = status_labels.get(status, status)
-
-                st.markdown(
-                    f"**{mode_label}** "
-                    f"{status_badge(status_label, status)}",
-                    unsafe_allow_html=True,
-                )
-                st.caption(
-                    f"{_hm(str(r.get('started_at', '')))} - "
-                    f"{_hm(str(r.get('ended_at', '')))}  |  "
-                    f"ニュース {_safe_int(r.get('news_collected', 0))}件 / "
-                    f"シグナル {_safe_int(r.get('signals_detected', 0))}件 / "
-                    f"取引 {_safe_int(r.get('trades_executed', 0))}件"
-                )
-                err_cnt = _safe_int(r.get("errors_count", 0))
-                if err_cnt > 0:
-                    err_msg = str(r.get("error_message", "") or "").strip()
-                    st.warning(
-                        f"エラー {err_cnt}件"
-                        + (f": {err_msg[:120]}" if err_msg else "")
-                    )
-
-with grid_right:
-    with st.container(border=True):
-        card_title(
-            "Ticker別フロー",
-            color=W,
-            subtitle=f"{len(ticker_flow)}銘柄",
-        )
+            st.info("売買判断・実行はありません。")
 
-        c1, c2 = st.columns(2)
-        c1.metric("売買実行", f"{traded_cnt}")
-        c2.metric("シグナルのみ", f"{signal_only_cnt}")
+    # ============================================================
+    # ROW 2: [実行ログ] | [Ticker別フロー] — 2-column grid
+    # ============================================================
 
-        if not ticker_flow:
-            st.caption("この日のTicker別データはありません。")
-        else:
-            st.divider()
-            for i, tf in enumerate(ticker_flow[:20]):
-                if i > 0:
-                    st.divider()
-                ticker = tf["ticker"]
-                has_news = tf.get("news_count", 0) > 0
-                has_analysis = tf.get("analysis_count", 0) > 0
-                sig = tf.get("signal")
-                trd = tf.get("trade")
-
-                if trd:
-                    final_label = "売買実行"
-                    final_color = W if trd.get("action") == "BUY" else L
-                elif sig:
-                    final_label = "シグナルのみ"
-                    final_color = "#d97706"
-                elif has_analysis:
-                    final_label = "分析まで"
-                    final_color = P
-                elif has_news:
-                    final_label = "ニュースのみ"
-                    final_color = "#71717a"
-                else:
-                    final_label = "データなし"
-                    final_color = "#71717a"
+    grid_left, grid_right = st.columns(2)
 
-                st.markdown(
-                    f"**{ticker}** "
-                    f"{render_pill(final_label, final_color)}",
-                    unsafe_allow_html=True,
-                )
+    with grid_left:
+        with st.container(border=True):
+            card_title(
+                "実行ログ",
+                color=P,
+                subtitle=f"{len(runs)}回" if len(runs) > 0 else "0回",
+            )
 
-                if trd:
-                    pnl = trd.get("pnl")
-                    pnl_txt = (
-                        fmt_currency(float(pnl), show_sign=True)
-                        if pnl is not None
-                        else "-"
+            if len(runs) == 0:
+                st.caption("この日の実行記録はありません。")
+            else:
+                for i, (_, r) in enumerate(runs.iterrows()):
+                    if i > 0:
+                        st.divider()
+                    status = str(r.get("status", ""))
+                    mode_label = MODE_LABELS.get(
+                        r.get("run_mode", ""), r.get("run_mode", "")
                     )
-                    st.caption(
-                        f"{trd.get('action', '-')} "
-                        f"{_safe_int(trd.get('shares', 0))}株 "
-                        f"@ ${float(trd.get('price', 0) or 0):.2f}  "
-                        f"/  {pnl_txt}"
+                    status_labels = {
+                        "completed": "正常完了",
+                        "failed": "失敗",
+                        "running": "実行中",
+                        "interrupted": "中断",
+                    }
+                    status_label = status_labels.get(status, status)
+
+                    st.markdown(
+                        f"**{mode_label}** "
+                        f"{status_badge(status_label, status)}",
+                        unsafe_allow_html=True,
                     )
-                elif sig:
                     st.caption(
-                        f"{sig.get('type', '-')}  "
-                        f"確信度 {_safe_int(sig.get('conviction', 0))}"
+                        f"{_hm(str(r.get('started_at', '')))} - "
+                        f"{_hm(str(r.get('ended_at', '')))}  |  "
+                        f"ニュース {_safe_int(r.get('news_collected', 0))}件 / "
+                        f"シグナル {_safe_int(r.get('signals_detected', 0))}件 / "
+                        f"取引 {_safe_int(r.get('trades_executed', 0))}件"
                     )
-                else:
-                    st.caption("売買判断なし")
+                    err_cnt = _safe_int(r.get("errors_count", 0))
+                    if err_cnt > 0:
+                        err_msg = str(r.get("error_message", "") or "").strip()
+                        st.warning(
+                            f"エラー {err_cnt}件"
+                            + (f": {err_msg[:120]}" if err_msg else "")
+                        )
+
+    with grid_right:
+        with st.container(border=True):
+            card_title(
+                "Ticker別フロー",
+                color=W,
+                subtitle=f"{len(ticker_flow)}銘柄",
+            )
 
+            c1, c2 = st.columns(2)
+            c1.metric("売買実行", f"{traded_cnt}")
+            c2.metric("シグナルのみ", f"{signal_only_cnt}")
+
+            if not ticker_flow:
+                st.caption("この日のTicker別データはありません。")
+            else:
+                reasons = (
+                    sig_df.set_index("id")["reason_label"]
+                    if "reason_label" in sig_df.columns
+                    else pd.Series(dtype=object)
+                )
+                render_html_table(_ticker_flow_cells(ticker_flow, reasons), max_height=520)
 
-# ============================================================
-# ROW 3: 詳細データ（タブ）
-# ============================================================
+    _detail_tabs(target_date, news_df, analysis_df, sig_df, trades_df)
 
-with st.container(border=True):
-    card_title("詳細データ", color=P)
-
-    tab_news, tab_analysis, tab_signals, tab_trades = st.tabs(
-        [
-            f"ニュース ({len(news_df)})",
-            f"AI分析 ({len(analysis_df)})",
-            f"シグナル ({len(sig_df)})",
-            f"取引 ({len(trades_df)})",
-        ]
+    # 前日・翌日のデータを裏で読み込んでおき、日送りを即時表示にする
+    _dm.prefetch_day_bundles(
+        [d.isoformat() for d in (prev_date, next_date) if d is not None]
     )
 
-    with tab_news:
-        if len(news_df) > 0:
-            view = news_df.copy()
-            cols = [
-                c
-                for c in [
-                    "created_at",
-                    "source",
-                    "title",
-                    "theme",
-                    "importance",
-                ]
-                if c in view.columns
-            ]
-            st.dataframe(
-                view[cols], use_container_width=True, hide_index=True
-            )
-        else:
-            st.info("ニュースなし")
-
-    with tab_analysis:
-        if len(analysis_df) > 0:
-            view = analysis_df.copy()
-            cols = [
-                c
-                for c in [
-                    "analyzed_at",
-                    "theme",
-                    "ticker",
-                    "analysis_type",
-                    "direction",
-                    "score",
-                    "recommendation",
-                ]
-                if c in view.columns
-            ]
-            st.dataframe(
-                view[cols], use_container_width=True, hide_index=True
-            )
-        else:
-            st.info("AI分析なし")
-
-    with tab_signals:
-        if len(sig_df) > 0:
-            view = sig_df.copy()
-            if "detected_at" in view.columns:
-                view = view.sort_values("detected_at", ascending=False)
-            cols = [
-                c
-                for c in [
-                    "detected_at",
-                    "ticker",
-                    "signal_type",
-                    "conviction",
-                    "confidence",
-                    "price",
-                    "status",
-                ]
-                if c in view.columns
-            ]
-            st.dataframe(
-                view[cols], use_container_width=True, hide_index=True
-            )
-        else:
-            st.info("シグナルなし")
-
-    with tab_trades:
-        if len(trades_df) > 0:
-            view = trades_df.copy()
-            if "entry_timestamp" in view.columns:
-                view = view.sort_values(
-                    "entry_timestamp", ascending=False
-                )
-            cols = [
-                c
-                for c in [
-                    "entry_timestamp",
-                    "exit_timestamp",
-                    "ticker",
-                    "action",
-                    "shares",
-                    "entry_price",
-                    "exit_price",
-                    "profit_loss",
-                    "status",
-                ]
-                if c in view.columns
-            ]
-            st.dataframe(
-                view[cols], use_container_width=True, hide_index=True
-            )
-        else:
-            st.info("取引なし")
+
+_date_view(available_dates, fresh)
 
 
 # ============================================================
@@ -460,3 +593,4 @@ with st.container(border=True):
         )
         with st.expander("詳細仕様を表示", expanded=False):
             st.markdown(spec_text)
+
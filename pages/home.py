@@ -2,12 +2,16 @@
 
 Design: Focused cards in 2-column grid.
 Each card = ONE purpose. Hero number at top.
+Fragments: equity chart (resolution) / KPI checklist (analysis dialog) /
+           trade history (view filter)
 """
 
 import logging
 from datetime import datetime
 
+import chart_data as _chart
 import dashboard_data as _dm
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
@@ -15,8 +19,9 @@ import streamlit as st
 from components.shared import (
     P, W, L, TEXT_SECONDARY,
     fmt_currency, fmt_pct, fmt_delta,
-    card_title, render_pill,
-    load_common_data,
+    fmt_currency_col, fmt_pct_col, esc_col, pill_col,
+    card_title, render_html_table, render_pill,
+    load_common_data, timed_fragment,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,6 +31,7 @@ d = load_common_data()
 start = d["start"]
 daily = d["daily"]
 spy = d["spy"]
+source_version = d["source_version"]
 trades = d["trades"]
 kpi = d["kpi"]
 verdict = d["verdict"]
@@ -56,13 +62,72 @@ else:
     total_val = cash_val = equity_val = 0
 
 
+# ── 一覧表のセル（列単位で組み立てて1つの表として描画する） ──
+
+_NUM_ALIGN = {"損益": "right", "評価損益": "right", "株数": "right"}
+
+
+def _pnl_cells(pnl: pd.Series, pct: pd.Series) -> pd.Series:
+    """損益額（損益率）を正負で色分けしたセル"""
+    v = pd.to_numeric(pnl, errors="coerce").fillna(0.0)
+    color = pd.Series(np.where(v >= 0, W, L), index=v.index)
+    return (
+        '<span style="color:' + color + ';font-weight:600">'
+        + fmt_currency_col(v, show_sign=True) + "</span> "
+        + '<span class="sub">(' + fmt_pct_col(pct, show_sign=True) + ")</span>"
+    )
+
+
+def _trade_cells(trades: pd.DataFrame, best_id, worst_id) -> pd.DataFrame:
+    """取引履歴のセル。決済済みは結果ラベルと損益、保有中はエントリー情報を出す"""
+    closed = trades["status"] == "CLOSED"
+    pnl = pd.to_numeric(trades["profit_loss"], errors="coerce").fillna(0.0)
+
+    label = pd.Series(np.where(pnl >= 0, "WIN", "LOSS"), index=trades.index)
+    label = label.mask((trades["id"] == best_id) & (pnl > 0), "BEST")
+    label = label.mask((trades["id"] == worst_id) & (pnl < 0), "WORST")
+    label = label.where(closed, "OPEN")
+    label_color = label.map(
+        {"BEST": "#d97706", "WORST": "#7c3aed", "WIN": W, "LOSS": L, "OPEN": P}
+    )
+
+    shares = pd.to_numeric(trades["shares"], errors="coerce").fillna(0).astype(int)
+    entry = pd.to_numeric(trades["entry_price"], errors="coerce").fillna(0.0)
+    exit_ = pd.to_numeric(trades["exit_price"], errors="coerce").fillna(0.0)
+    ed = trades["entry_timestamp"].fillna("").astype(str).str[:10]
+    xd = trades["exit_timestamp"].fillna("").astype(str).str[:10]
+    hd = pd.to_numeric(trades["holding_days"], errors="coerce")
+    hd_str = (" · " + hd.fillna(0).astype(int).astype(str) + "日").where(
+        hd.notna() & (hd != 0), ""
+    )
+    detail = (
+        shares.astype(str) + "株 · $" + entry.map("{:.2f}".format) + " → $"
+        + exit_.map("{:.2f}".format) + " · " + ed + "→" + xd + hd_str
+    ).where(
+        closed,
+        shares.astype(str) + "株 @ $" + entry.map("{:.2f}".format) + " · " + ed + "〜",
+    )
+
+    result = _pnl_cells(pnl, trades["profit_loss_pct"]).where(
+        closed, f'<span style="color:{P};font-weight:600">保有中</span>'
+    )
+    return pd.DataFrame(
+        {
+            "銘柄": "<b>" + esc_col(trades["ticker"]) + "</b>",
+            "結果": pill_col(label, label_color),
+            "内容": '<span class="sub">' + detail + "</span>",
+            "損益": result,
+        }
+    )
+
+
 # ── 詳細分析ダイアログ ──
 
 @st.dialog("パフォーマンス詳細分析", width="large")
-def show_analysis_dialog():
+def show_analysis_dialog(start: str):
     tr = _dm.get_trades(start)
     summary = _dm.get_trade_summary(tr)
-    patterns = _dm.get_trade_patterns(tr)
+    cube = _dm.get_trade_cube(start)
 
     st.subheader("損益の全体像", divider="gray")
     m1, m2, m3 = st.columns(3)
@@ -103,29 +168,21 @@ def show_analysis_dialog():
     for i in insights:
         st.warning(i)
 
-    closed = tr[tr["status"] == "CLOSED"]
-    if len(closed) > 0:
+    by_ticker = _dm.rollup_trade_cube(cube, ["ticker"])
+    if len(by_ticker) > 0:
         st.subheader("銘柄別パフォーマンス", divider="gray")
-        ticker_stats = []
-        for ticker, grp in closed.groupby("ticker"):
-            wins = len(grp[grp["profit_loss"] > 0])
-            ticker_stats.append({
-                "銘柄": ticker, "取引数": len(grp), "勝数": wins,
-                "損益": grp["profit_loss"].sum(),
-                "平均%": grp["profit_loss_pct"].mean(),
-            })
-        ticker_stats.sort(key=lambda x: x["損益"])
-        for ts in ticker_stats:
-            col_tk, col_pnl = st.columns([3, 2])
-            with col_tk:
-                st.markdown(f"**{ts['銘柄']}**  {ts['勝数']}/{ts['取引数']}勝")
-            with col_pnl:
-                pnl = ts["損益"]
-                color = "green" if pnl >= 0 else "red"
-                st.markdown(
-                    f":{color}[**{fmt_currency(pnl, show_sign=True)}** "
-                    f"({fmt_pct(ts['平均%'], show_sign=True)})]"
-                )
+        bt = by_ticker.sort_values("total_pnl")
+        render_html_table(
+            pd.DataFrame(
+                {
+                    "銘柄": "<b>" + esc_col(bt["ticker"]) + "</b>",
+                    "勝敗": bt["wins"].astype(int).astype(str) + "/"
+                    + bt["trades"].astype(int).astype(str) + "勝",
+                    "損益": _pnl_cells(bt["total_pnl"], bt["avg_return"]),
+                }
+            ),
+            align=_NUM_ALIGN,
+        )
 
 
 # ============================================================
@@ -216,25 +273,19 @@ with grid_right:
         card_title("保有銘柄", color=W)
 
         if alpaca_positions:
-            for i, p in enumerate(alpaca_positions):
-                if i > 0:
-                    st.divider()
-                p_pnl = p["unrealized_pnl"]
-                p_pct = p["unrealized_pnl_pct"]
-                col_name, col_val = st.columns([3, 2])
-                with col_name:
-                    st.markdown(
-                        f"**{p['ticker']}**  "
-                        f'<span style="color:#a1a1aa;font-size:0.8rem">'
-                        f'{p["shares"]}株</span>',
-                        unsafe_allow_html=True,
-                    )
-                with col_val:
-                    pnl_color = "green" if p_pnl >= 0 else "red"
-                    st.markdown(
-                        f":{pnl_color}[**{fmt_currency(p_pnl, show_sign=True)}** "
-                        f"({fmt_pct(p_pct, show_sign=True)})]"
-                    )
+            pos = pd.DataFrame(alpaca_positions)
+            render_html_table(
+                pd.DataFrame(
+                    {
+                        "銘柄": "<b>" + esc_col(pos["ticker"]) + "</b>",
+                        "株数": esc_col(pos["shares"]) + "株",
+                        "評価損益": _pnl_cells(
+                            pos["unrealized_pnl"], pos["unrealized_pnl_pct"]
+                        ),
+                    }
+                ),
+                align=_NUM_ALIGN,
+            )
         else:
             st.info("ポジションなし")
 
@@ -243,79 +294,111 @@ with grid_right:
 # ROW 3: チャート (full width)
 # ============================================================
 
-with st.container(border=True):
-    card_title("資産推移", color=P)
+# 表示 → 足（"spy" は取引履歴と市場価格からの日次再構築 + SPY比較）
+_CHART_VIEWS = {"5分足": "5m", "1時間足": "1h", "日足": "1d", "SPY比較": "spy"}
 
-    if len(daily) > 0:
-        pnl = total_val - capital
-        fill_color = ("rgba(34,197,94,0.08)" if pnl >= 0
-                      else "rgba(239,68,68,0.06)")
-        fig = go.Figure()
+
+def _add_trade_markers(fig: go.Figure, chart: dict, x_fmt: str) -> None:
+    for side, label, symbol, color in (
+        ("buy", "買い", "triangle-up", "#22c55e"),
+        ("sell", "売り", "triangle-down", "#ef4444"),
+    ):
+        m = chart[side]
+        if len(m["x"]) > 0:
+            fig.add_trace(go.Scatter(
+                x=m["x"], y=m["y"], name=label,
+                mode="markers",
+                marker=dict(symbol=symbol, size=10, color=color,
+                            line=dict(width=1, color="#18181b")),
+                hovertemplate=f"%{{x|{x_fmt}}} {label} %{{text}}<extra></extra>",
+                text=m["text"], showlegend=False,
+            ))
+
+
+def _daily_figure(chart: dict, pnl: float) -> go.Figure:
+    """日次再構築（build_daily_portfolio）+ SPY比較"""
+    fill_color = ("rgba(34,197,94,0.08)" if pnl >= 0
+                  else "rgba(239,68,68,0.06)")
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=chart["x"], y=np.full(len(chart["x"]), capital),
+        mode="lines", line=dict(width=0),
+        showlegend=False, hoverinfo="skip",
+    ))
+    fig.add_trace(go.Scatter(
+        x=chart["x"], y=chart["total"],
+        fill="tonexty", fillcolor=fill_color,
+        mode="none", showlegend=False, hoverinfo="skip",
+    ))
+    # 長期間では点が潰れるのでマーカーは間引きが効かない範囲だけ
+    fig.add_trace(go.Scatter(
+        x=chart["x"], y=chart["total"],
+        name="ポートフォリオ",
+        mode="lines+markers" if chart["shown"] <= 120 else "lines",
+        line=dict(color="#6366f1", width=2.5), marker=dict(size=4, color="#6366f1"),
+        hovertemplate="%{x|%m/%d}  $%{y:,.0f}<extra></extra>",
+    ))
+    if len(chart["spy_x"]) > 0:
         fig.add_trace(go.Scatter(
-            x=daily["date"], y=[capital] * len(daily),
-            mode="lines", line=dict(width=0),
-            showlegend=False, hoverinfo="skip",
+            x=chart["spy_x"], y=chart["spy_y"],
+            name="SPY", mode="lines",
+            line=dict(color="#71717a", width=1.2, dash="dot"),
+            hovertemplate="%{x|%m/%d}  SPY $%{y:,.0f}<extra></extra>",
         ))
-        fig.add_trace(go.Scatter(
-            x=daily["date"], y=daily["total"],
-            fill="tonexty", fillcolor=fill_color,
-            mode="none", showlegend=False, hoverinfo="skip",
+    _add_trade_markers(fig, chart, "%m/%d")
+    return fig
+
+
+def _snapshot_figure(chart: dict, x_fmt: str) -> go.Figure:
+    """portfolio_snapshots の足（本数が多ければ終値の線）"""
+    fig = go.Figure()
+    if chart["kind"] == "candle":
+        fig.add_trace(go.Candlestick(
+            x=chart["x"], open=chart["open"], high=chart["high"],
+            low=chart["low"], close=chart["close"], name="ポートフォリオ",
+            increasing=dict(line=dict(color="#22c55e", width=1), fillcolor="#22c55e"),
+            decreasing=dict(line=dict(color="#ef4444", width=1), fillcolor="#ef4444"),
+            showlegend=False,
         ))
+    else:
         fig.add_trace(go.Scatter(
-            x=daily["date"], y=daily["total"],
-            name="ポートフォリオ", mode="lines+markers",
-            line=dict(color="#6366f1", width=2.5), marker=dict(size=4, color="#6366f1"),
-            hovertemplate="%{x|%m/%d}  $%{y:,.0f}<extra></extra>",
+            x=chart["x"], y=chart["total"],
+            name="ポートフォリオ", mode="lines",
+            line=dict(color="#6366f1", width=2),
+            hovertemplate=f"%{{x|{x_fmt}}}  $%{{y:,.0f}}<extra></extra>",
         ))
-        if len(spy) > 0:
-            fig.add_trace(go.Scatter(
-                x=spy["date"], y=spy["spy_total"],
-                name="SPY", mode="lines",
-                line=dict(color="#71717a", width=1.2, dash="dot"),
-                hovertemplate="%{x|%m/%d}  SPY $%{y:,.0f}<extra></extra>",
-            ))
+    _add_trade_markers(fig, chart, x_fmt)
+    return fig
 
-        buy_rows = trades[
-            (trades["action"] == "BUY") & trades["entry_timestamp"].notna()
-        ].copy()
-        if len(buy_rows) > 0:
-            buy_rows["entry_date"] = pd.to_datetime(
-                buy_rows["entry_timestamp"], format="mixed"
-            ).dt.normalize()
-            merged = buy_rows.merge(
-                daily[["date", "total"]], left_on="entry_date",
-                right_on="date", how="inner",
-            )
-            if len(merged) > 0:
-                fig.add_trace(go.Scatter(
-                    x=merged["date"], y=merged["total"], name="買い",
-                    mode="markers",
-                    marker=dict(symbol="triangle-up", size=10, color="#22c55e",
-                                line=dict(width=1, color="#18181b")),
-                    hovertemplate="%{x|%m/%d} 買い %{text}<extra></extra>",
-                    text=merged["ticker"], showlegend=False,
-                ))
-
-        sell_rows = trades[
-            (trades["status"] == "CLOSED") & trades["exit_timestamp"].notna()
-        ].copy()
-        if len(sell_rows) > 0:
-            sell_rows["exit_date"] = pd.to_datetime(
-                sell_rows["exit_timestamp"], format="mixed"
-            ).dt.normalize()
-            merged = sell_rows.merge(
-                daily[["date", "total"]], left_on="exit_date",
-                right_on="date", how="inner",
-            )
-            if len(merged) > 0:
-                fig.add_trace(go.Scatter(
-                    x=merged["date"], y=merged["total"], name="売り",
-                    mode="markers",
-                    marker=dict(symbol="triangle-down", size=10, color="#ef4444",
-                                line=dict(width=1, color="#18181b")),
-                    hovertemplate="%{x|%m/%d} 売り %{text}<extra></extra>",
-                    text=merged["ticker"], showlegend=False,
-                ))
+
+@timed_fragment("資産推移")
+def _equity_chart_card(daily, spy, trades, source_version, pnl: float) -> None:
+    """資産推移。足の切り替えではこのカードだけが再実行される。"""
+    with st.container(border=True):
+        card_title("資産推移", color=P)
+
+        views = list(_CHART_VIEWS)
+        has_snapshots = len(_dm.get_snapshot_bars("1d", start)) > 0
+        view = st.radio(
+            "表示", views,
+            index=views.index("1時間足" if has_snapshots else "SPY比較"),
+            horizontal=True, label_visibility="collapsed", key="equity_view",
+        )
+        resolution = _CHART_VIEWS[view]
+
+        if resolution == "spy":
+            chart = _chart.get_equity_payload(daily, spy, trades, source_version)
+        else:
+            chart = _chart.get_snapshot_payload(resolution, trades, start)
+        if not chart:
+            st.info("資産推移データがありません。")
+            return
+
+        x_fmt = "%m/%d" if resolution in ("1d", "spy") else "%m/%d %H:%M"
+        if resolution == "spy":
+            fig = _daily_figure(chart, pnl)
+        else:
+            fig = _snapshot_figure(chart, x_fmt)
 
         fig.add_hline(y=capital, line_dash="dot", line_color="#3f3f46", line_width=1)
         fig.update_layout(
@@ -327,6 +410,7 @@ with st.container(border=True):
             xaxis=dict(
                 title="", gridcolor="#27272a", linecolor="#3f3f46",
                 tickfont=dict(size=11, color="#71717a"), showgrid=True,
+                rangeslider=dict(visible=False),
             ),
             yaxis=dict(
                 title="", tickprefix="$", tickformat=",.0f",
@@ -345,8 +429,13 @@ with st.container(border=True):
             ),
         )
         st.plotly_chart(fig, use_container_width=True, theme=None)
-    else:
-        st.info("資産推移データがありません。")
+        if chart["points"] > chart["shown"]:
+            st.caption(
+                f"{chart['points']:,}点を{chart['shown']:,}点に間引いて表示（LTTB）"
+            )
+
+
+_equity_chart_card(daily, spy, trades, source_version, total_val - capital)
 
 
 # ============================================================
@@ -403,138 +492,96 @@ kpi_checks.append({
 
 achieved = sum(1 for item in kpi_checks if item["ok"])
 
-with st.container(border=True):
-    title_col, btn_col = st.columns([5, 1])
-    with title_col:
-        card_title("実取引チェックリスト", color=P,
-                   subtitle=f"{achieved}/{len(kpi_checks)}達成")
-    with btn_col:
-        if st.button("詳細分析", type="secondary", use_container_width=True):
-            show_analysis_dialog()
-
-    if verdict["recommendations"]:
-        st.caption(f"優先改善: {' / '.join(verdict['recommendations'][:3])}")
-
-    kpi_cols = st.columns(len(kpi_checks))
-    for col, item in zip(kpi_cols, kpi_checks):
-        with col:
-            st.markdown(f"**{item['label']}**")
-            st.progress(min(1.0, max(0.0, item["bar_pct"])))
-            if item["ok"]:
-                st.markdown(f":green[**{item['current']}**]")
-            else:
-                st.markdown(f":red[**{item['current']}**]")
-            st.caption(f"目標 {item['target_str']}")
+
+@timed_fragment("実取引チェックリスト")
+def _checklist_card(kpi_checks: list[dict], achieved: int, verdict: dict, start: str) -> None:
+    """KPIチェックリスト。「詳細分析」はこのカードだけを再実行してダイアログを開く。"""
+    with st.container(border=True):
+        title_col, btn_col = st.columns([5, 1])
+        with title_col:
+            card_title("実取引チェックリスト", color=P,
+                       subtitle=f"{achieved}/{len(kpi_checks)}達成")
+        with btn_col:
+            if st.button("詳細分析", type="secondary", use_container_width=True):
+                show_analysis_dialog(start)
+
+        if verdict["recommendations"]:
+            st.caption(f"優先改善: {' / '.join(verdict['recommendations'][:3])}")
+
+        kpi_cols = st.columns(len(kpi_checks))
+        for col, item in zip(kpi_cols, kpi_checks):
+            with col:
+                st.markdown(f"**{item['label']}**")
+                st.progress(min(1.0, max(0.0, item["bar_pct"])))
+                if item["ok"]:
+                    st.markdown(f":green[**{item['current']}**]")
+                else:
+                    st.markdown(f":red[**{item['current']}**]")
+                st.caption(f"目標 {item['target_str']}")
+
+
+_checklist_card(kpi_checks, achieved, verdict, start)
 
 
 # ============================================================
 # ROW 5: 取引履歴 (collapsible)
 # ============================================================
 
-with st.container(border=True):
-    card_title("取引履歴", color=W)
 
-    if len(trades) > 0:
-        trades_sorted_all = trades.sort_values("entry_timestamp", ascending=False)
+@timed_fragment("取引履歴")
+def _trade_history_card(trades) -> None:
+    """取引履歴。表示対象の切り替えではこのカードだけが再実行される。"""
+    with st.container(border=True):
+        card_title("取引履歴", color=W)
 
-        view_mode = st.radio(
-            "表示対象", ["すべて", "決済済み", "保有中"],
-            horizontal=True, label_visibility="collapsed",
-        )
+        if len(trades) > 0:
+            trades_sorted_all = trades.sort_values("entry_timestamp", ascending=False)
 
-        if view_mode == "決済済み":
-            trades_sorted = trades_sorted_all[trades_sorted_all["status"] == "CLOSED"]
-        elif view_mode == "保有中":
-            trades_sorted = trades_sorted_all[trades_sorted_all["status"] == "OPEN"]
-        else:
-            trades_sorted = trades_sorted_all
-
-        closed_trades = trades_sorted_all[trades_sorted_all["status"] == "CLOSED"]
-        best_id = worst_id = None
-        if len(closed_trades) > 0:
-            best_id = closed_trades.loc[closed_trades["profit_loss"].idxmax(), "id"]
-            worst_id = closed_trades.loc[closed_trades["profit_loss"].idxmin(), "id"]
-
-            wins = len(closed_trades[closed_trades["profit_loss"] > 0])
-            losses = len(closed_trades) - wins
-            total_pnl = closed_trades["profit_loss"].sum()
-            avg_pnl = total_pnl / len(closed_trades)
-
-            sm1, sm2, sm3, sm4 = st.columns(4)
-            sm1.metric("決済回数", f"{len(closed_trades)}回")
-            sm2.metric("勝敗", f"{wins}勝 {losses}敗")
-            sm3.metric("累計損益", fmt_currency(total_pnl, show_sign=True))
-            sm4.metric("平均損益/回", fmt_currency(avg_pnl, show_sign=True))
-
-        if len(trades_sorted) == 0:
-            st.info(f"{view_mode}に該当する取引はありません。")
-        else:
-            st.divider()
-            _show_limit = 5
-            _trades_list = list(trades_sorted.iterrows())
-            _visible = _trades_list[:_show_limit]
-            _hidden = _trades_list[_show_limit:]
-
-            def _render_trade_row(t, best_id, worst_id):
-                ticker = t["ticker"]
-                shares = int(t["shares"])
-                if t["status"] == "CLOSED":
-                    pnl_val = t["profit_loss"] or 0
-                    pct_val = t["profit_loss_pct"] or 0
-                    if t["id"] == best_id and pnl_val > 0:
-                        label = "BEST"
-                    elif t["id"] == worst_id and pnl_val < 0:
-                        label = "WORST"
-                    else:
-                        label = "WIN" if pnl_val >= 0 else "LOSS"
-                    label_color = {"BEST": "#d97706", "WORST": "#7c3aed",
-                                   "WIN": W, "LOSS": L}.get(label, P)
-                    hd = t.get("holding_days")
-                    hd_str = f" · {int(hd)}日" if pd.notna(hd) and hd else ""
-                    ed = t["entry_timestamp"][:10] if pd.notna(
-                        t.get("entry_timestamp")) else ""
-                    xd = t["exit_timestamp"][:10] if pd.notna(
-                        t.get("exit_timestamp")) else ""
-                    pnl_color = "green" if pnl_val >= 0 else "red"
-
-                    col_info, col_result = st.columns([4, 2])
-                    with col_info:
-                        st.markdown(
-                            f"**{ticker}** {render_pill(label, label_color)}  "
-                            f'<span style="color:#a1a1aa;font-size:0.8rem">'
-                            f"{shares}株 · ${t['entry_price']:.2f} → "
-                            f"${t['exit_price']:.2f} · {ed}→{xd}{hd_str}</span>",
-                            unsafe_allow_html=True,
-                        )
-                    with col_result:
-                        st.markdown(
-                            f":{pnl_color}[**{fmt_currency(pnl_val, show_sign=True)}** "
-                            f"({fmt_pct(pct_val, show_sign=True)})]"
-                        )
-                elif t["status"] == "OPEN":
-                    ed = t["entry_timestamp"][:10] if pd.notna(
-                        t.get("entry_timestamp")) else ""
-                    col_info, col_result = st.columns([4, 2])
-                    with col_info:
-                        st.markdown(
-                            f"**{ticker}** {render_pill('OPEN', P)}  "
-                            f'<span style="color:#a1a1aa;font-size:0.8rem">'
-                            f"{shares}株 @ ${t['entry_price']:.2f} · {ed}〜</span>",
-                            unsafe_allow_html=True,
+            view_mode = st.radio(
+                "表示対象", ["すべて", "決済済み", "保有中"],
+                horizontal=True, label_visibility="collapsed",
+            )
+
+            if view_mode == "決済済み":
+                trades_sorted = trades_sorted_all[trades_sorted_all["status"] == "CLOSED"]
+            elif view_mode == "保有中":
+                trades_sorted = trades_sorted_all[trades_sorted_all["status"] == "OPEN"]
+            else:
+                trades_sorted = trades_sorted_all
+
+            closed_trades = trades_sorted_all[trades_sorted_all["status"] == "CLOSED"]
+            best_id = worst_id = None
+            if len(closed_trades) > 0:
+                best_id = closed_trades.loc[closed_trades["profit_loss"].idxmax(), "id"]
+                worst_id = closed_trades.loc[closed_trades["profit_loss"].idxmin(), "id"]
+
+                wins = len(closed_trades[closed_trades["profit_loss"] > 0])
+                losses = len(closed_trades) - wins
+                total_pnl = closed_trades["profit_loss"].sum()
+                avg_pnl = total_pnl / len(closed_trades)
+
+                sm1, sm2, sm3, sm4 = st.columns(4)
+                sm1.metric("決済回数", f"{len(closed_trades)}回")
+                sm2.metric("勝敗", f"{wins}勝 {losses}敗")
+                sm3.metric("累計損益", fmt_currency(total_pnl, show_sign=True))
+                sm4.metric("平均損益/回", fmt_currency(avg_pnl, show_sign=True))
+
+            if len(trades_sorted) == 0:
+                st.info(f"{view_mode}に該当する取引はありません。")
+            else:
+                _show_limit = 5
+                cells = _trade_cells(trades_sorted, best_id, worst_id)
+                render_html_table(cells.iloc[:_show_limit], align=_NUM_ALIGN)
+
+                if len(cells) > _show_limit:
+                    with st.expander(
+                        f"過去の取引をすべて表示（残り{len(cells) - _show_limit}件）"
+                    ):
+                        render_html_table(
+                            cells.iloc[_show_limit:], align=_NUM_ALIGN, max_height=600
                         )
-                    with col_result:
-                        st.markdown(":blue[**保有中**]")
-
-            for i, (_, t) in enumerate(_visible):
-                if i > 0:
-                    st.divider()
-                _render_trade_row(t, best_id, worst_id)
-
-            if _hidden:
-                with st.expander(f"過去の取引をすべて表示（残り{len(_hidden)}件）"):
-                    for i, (_, t) in enumerate(_hidden):
-                        if i > 0:
-                            st.divider()
-                        _render_trade_row(t, best_id, worst_id)
-    else:
-        st.info("まだ取引がありません")
+        else:
+            st.info("まだ取引がありません")
+
+
+_trade_history_card(trades)
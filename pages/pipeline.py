@@ -3,32 +3,43 @@
 Design: Focused cards — each card = ONE purpose.
 ROW 1: Today's summary metrics
 ROW 2: 5-step pipeline visualization
-ROW 3: [Quality metrics] | [Date drill-down]
+ROW 3: [Quality metrics] | [Date drill-down (fragment)]
 ROW 4: Daily calendar
+ROW 5: Ticker funnel (14 days)
 Expander: News/analysis deep dive
+
+Live mode: 監視テーブルの変化を LIVE_POLL_SEC 秒ごとに確認し、変化時だけ依存キャッシュを更新
 """
 
 import logging
 from datetime import date as _date
-from datetime import datetime as _datetime
 
 import dashboard_data as _dm
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
 from components.shared import (
+    INFO,
     L,
     MODE_LABELS,
     P,
+    TEXT_MUTED,
     W,
     WEEKDAY_JP,
     card_title,
+    esc_col,
+    render_html_table,
     render_pill,
     status_badge,
     status_dot_html,
     load_pipeline_status,
     load_runs_timeline,
     load_health_metrics,
+    live_poller,
+    timed_fragment,
+    LIVE_POLL_SEC,
 )
 
 logger = logging.getLogger(__name__)
@@ -41,6 +52,14 @@ health = load_health_metrics()
 st.title("パイプライン")
 st.caption("自動売買プロセスの稼働状況")
 
+# ライブ更新（壁掛け表示用）: system_runs / signals / trades の変化を検知して自動更新
+live_col, status_col = st.columns([1, 4])
+with live_col:
+    live = st.toggle("ライブ更新", key="pipeline_live")
+with status_col:
+    if live:
+        st.fragment(run_every=LIVE_POLL_SEC)(live_poller)("pipeline")
+
 runs_today = pipeline["runs_today"]
 completed_runs = sum(1 for r in runs_today if r.get("status") == "completed")
 run_success_rate = (completed_runs / len(runs_today) * 100) if runs_today else 0.0
@@ -194,6 +213,46 @@ with st.container(border=True):
         st.caption("本日はまだ実行されていません")
 
 
+@timed_fragment("運用履歴")
+def _history_card(date_options: list[_date]) -> None:
+    """日付選択カード。選択の変更ではこのカードだけが再実行される。"""
+    with st.container(border=True):
+        card_title("運用履歴", color="#d97706", subtitle="日付選択")
+
+        pick_col, move_col = st.columns([3, 1])
+        with pick_col:
+            selected_date = st.selectbox(
+                "対象日",
+                options=date_options,
+                format_func=lambda dd: (
+                    f"{dd.isoformat()} ({WEEKDAY_JP[dd.weekday()]})"
+                ),
+                index=0,
+            )
+        with move_col:
+            st.markdown("")
+            st.markdown("")
+            if st.button("詳細へ", key="goto_selected_date",
+                         use_container_width=True):
+                st.query_params["date"] = selected_date.isoformat()
+                st.switch_page("pages/date_detail.py")
+
+        with st.expander("最近14日をクイック選択", expanded=False):
+            for row_start in range(0, min(14, len(date_options)), 7):
+                row_dates = date_options[row_start: row_start + 7]
+                cols = st.columns(7)
+                for j, dd in enumerate(row_dates):
+                    wd = WEEKDAY_JP[dd.weekday()]
+                    with cols[j]:
+                        label = f"{dd.month}/{dd.day}({wd})"
+                        if st.button(
+                            label, key=f"goto_date_{dd}",
+                            use_container_width=True,
+                        ):
+                            st.query_params["date"] = dd.isoformat()
+                            st.switch_page("pages/date_detail.py")
+
+
 # ============================================================
 # ROW 3: [運用品質] | [日付ドリルダウン] — 2-column grid
 # ============================================================
@@ -231,49 +290,70 @@ with grid_left:
         else:
             st.warning("品質基準にやや届いていません")
 
+log_dates = _dm.get_available_log_dates(30)
 with grid_right:
-    with st.container(border=True):
-        card_title("運用履歴", color="#d97706", subtitle="日付選択")
+    _history_card(
+        sorted([_date.fromisoformat(d) for d in log_dates], reverse=True)
+        if log_dates
+        else [_date.today()]
+    )
 
-        log_dates = _dm.get_available_log_dates(30)
-        date_options = (
-            sorted([_date.fromisoformat(d) for d in log_dates], reverse=True)
-            if log_dates
-            else [_date.today()]
-        )
 
-        pick_col, move_col = st.columns([3, 1])
-        with pick_col:
-            selected_date = st.selectbox(
-                "対象日",
-                options=date_options,
-                format_func=lambda dd: (
-                    f"{dd.isoformat()} ({WEEKDAY_JP[dd.weekday()]})"
-                ),
-                index=0,
-            )
-        with move_col:
-            st.markdown("")
-            st.markdown("")
-            if st.button("詳細へ", key="goto_selected_date",
-                         use_container_width=True):
-                st.query_params["date"] = selected_date.isoformat()
-                st.switch_page("pages/date_detail.py")
+def _calendar_cells(timeline_df: pd.DataFrame) -> pd.DataFrame:
+    """日次カレンダーのセル（HTML）を列単位で組み立てる"""
+    run_date = timeline_df["run_date"].fillna("").astype(str)
+    counts = {
+        c: pd.to_numeric(timeline_df[c], errors="coerce").fillna(0).astype(int)
+        for c in ("failed", "interrupted", "completed", "total_runs",
+                  "total_errors", "total_signals", "total_trades")
+    }
+
+    dt = pd.to_datetime(run_date, format="%Y-%m-%d", errors="coerce")
+    wd = dt.dt.weekday.map(dict(enumerate(WEEKDAY_JP)))
+    date_label = run_date.str[5:].where(dt.isna(), run_date.str[5:] + " (" + wd + ")")
+
+    dot_status = pd.Series(
+        np.select(
+            [
+                counts["failed"] > 0,
+                (counts["total_errors"] > 0) | (counts["interrupted"] > 0),
+                counts["completed"] > 0,
+            ],
+            ["failed", "interrupted", "completed"],
+            "pending",
+        ),
+        index=timeline_df.index,
+    )
 
-        with st.expander("最近14日をクイック選択", expanded=False):
-            for row_start in range(0, min(14, len(date_options)), 7):
-                row_dates = date_options[row_start: row_start + 7]
-                cols = st.columns(7)
-                for j, dd in enumerate(row_dates):
-                    wd = WEEKDAY_JP[dd.weekday()]
-                    with cols[j]:
-                        label = f"{dd.month}/{dd.day}({wd})"
-                        if st.button(
-                            label, key=f"goto_date_{dd}",
-                            use_container_width=True,
-                        ):
-                            st.query_params["date"] = dd.isoformat()
-                            st.switch_page("pages/date_detail.py")
+    modes = timeline_df["modes"].fillna("").astype(str).str.split(",").explode().str.strip()
+    modes = modes[modes != ""].map(lambda m: MODE_LABELS.get(m, m))
+    mode_display = modes.groupby(level=0).agg(", ".join).reindex(timeline_df.index).fillna("-")
+
+    def _count(col: str, color: str) -> pd.Series:
+        n = counts[col]
+        return pd.Series(
+            np.where(
+                n > 0,
+                f'<span style="color:{color};font-weight:600">' + n.astype(str) + "件</span>",
+                f'<span style="color:{TEXT_MUTED}">-</span>',
+            ),
+            index=timeline_df.index,
+        )
+
+    return pd.DataFrame(
+        {
+            "日付": "<b>" + esc_col(date_label) + "</b>",
+            "状態": dot_status.map({k: status_dot_html(k) for k in set(dot_status)}),
+            "実行モード": esc_col(mode_display),
+            "正常完了": (
+                counts["completed"].astype(str) + "/"
+                + counts["total_runs"].astype(str) + "回"
+            ),
+            "判断": _count("total_signals", INFO),
+            "約定": _count("total_trades", W),
+            "異常": _count("total_errors", L),
+        }
+    )
 
 
 # ============================================================
@@ -292,70 +372,136 @@ with st.container(border=True):
     )
 
     if len(timeline_df) > 0:
-        for idx, (_, day) in enumerate(timeline_df.iterrows()):
-            if idx > 0:
-                st.divider()
-
-            run_date = day["run_date"]
-            try:
-                dt_obj = _datetime.strptime(run_date, "%Y-%m-%d")
-                wd = WEEKDAY_JP[dt_obj.weekday()]
-                date_label = f"{run_date[5:]} ({wd})"
-            except Exception:
-                date_label = run_date[5:] if len(run_date) > 5 else run_date
-
-            failed = int(day["failed"] or 0)
-            interrupted = int(day["interrupted"] or 0)
-            completed = int(day["completed"] or 0)
-            total_runs = int(day["total_runs"] or 0)
-            errors = int(day["total_errors"] or 0)
-            signals = int(day["total_signals"] or 0)
-            t_trades = int(day["total_trades"] or 0)
-            modes_raw = day["modes"] or ""
-
-            if failed > 0:
-                dot_status = "failed"
-            elif errors > 0 or interrupted > 0:
-                dot_status = "interrupted"
-            elif completed > 0:
-                dot_status = "completed"
-            else:
-                dot_status = "pending"
-
-            mode_parts = [
-                MODE_LABELS.get(m.strip(), m.strip())
-                for m in modes_raw.split(",")
-                if m.strip()
-            ]
-            mode_display = ", ".join(mode_parts) if mode_parts else "-"
-
-            nums_parts = []
-            if signals > 0:
-                nums_parts.append(f":blue[判断 {signals}件]")
-            if t_trades > 0:
-                nums_parts.append(f":green[約定 {t_trades}件]")
-            if errors > 0:
-                nums_parts.append(f":red[異常 {errors}件]")
-            nums_str = " · ".join(nums_parts) if nums_parts else "-"
-
-            col_date, col_dot, col_info, col_nums = st.columns(
-                [2, 0.5, 4, 3]
-            )
-            with col_date:
-                st.markdown(f"**{date_label}**")
-            with col_dot:
-                st.markdown(
-                    status_dot_html(dot_status), unsafe_allow_html=True
-                )
-            with col_info:
-                st.markdown(f"{mode_display}")
-                st.caption(f"{completed}/{total_runs}回 正常完了")
-            with col_nums:
-                st.markdown(nums_str)
+        render_html_table(
+            _calendar_cells(timeline_df),
+            align={"状態": "center", "判断": "right", "約定": "right", "異常": "right"},
+        )
     else:
         st.info("直近14日間の実行記録なし")
 
 
+# ============================================================
+# ROW 5: 銘柄ファネル（直近14日）
+# ============================================================
+
+funnel = _dm.get_ticker_flow_funnel(
+    14, end_date=_dm.get_data_latest_dates().get("latest") or None
+)
+ft = funnel["totals"]
+
+with st.container(border=True):
+    card_title(
+        "銘柄ファネル",
+        color=W,
+        subtitle=f"{funnel['start']} 〜 {funnel['end']}",
+    )
+    st.caption(
+        "銘柄×日ごとの最終到達段階。ニュース → 分析 → シグナル → 売買 の各段で"
+        "どれだけ脱落しているかを示す。"
+    )
+
+    if ft.get("tickers", 0) == 0:
+        st.info("この期間の銘柄データなし")
+    else:
+        fn_left, fn_right = st.columns([1, 1.4])
+        with fn_left:
+            fig_funnel = go.Figure(
+                go.Funnel(
+                    y=["ニュース以上", "分析以上", "シグナル以上", "売買"],
+                    x=[
+                        ft["tickers"],
+                        ft["to_analysis"],
+                        ft["to_signal"],
+                        ft["to_trade"],
+                    ],
+                    textinfo="value+percent initial",
+                    marker=dict(color=["#71717a", P, "#d97706", W]),
+                )
+            )
+            fig_funnel.update_layout(
+                height=240,
+                margin=dict(l=0, r=0, t=10, b=0),
+                plot_bgcolor="#18181b",
+                paper_bgcolor="#18181b",
+                font=dict(family="Inter, sans-serif", color="#a1a1aa", size=11),
+            )
+            st.plotly_chart(fig_funnel, use_container_width=True, theme=None)
+
+        with fn_right:
+            by_day = funnel["by_day"]
+            fig_states = go.Figure()
+            for state, color in (
+                ("traded", W),
+                ("signal_only", "#d97706"),
+                ("analysis_only", P),
+                ("news_only", "#71717a"),
+            ):
+                fig_states.add_trace(
+                    go.Bar(
+                        x=by_day["date"],
+                        y=by_day[state],
+                        name=_dm.TICKER_FLOW_STATES[state],
+                        marker_color=color,
+                    )
+                )
+            fig_states.update_layout(
+                height=240,
+                margin=dict(l=0, r=0, t=25, b=0),
+                plot_bgcolor="#18181b",
+                paper_bgcolor="#18181b",
+                font=dict(family="Inter, sans-serif", color="#a1a1aa", size=11),
+                legend=dict(
+                    orientation="h",
+                    yanchor="top",
+                    y=1.15,
+                    xanchor="center",
+                    x=0.5,
+                    font=dict(size=11, color="#a1a1aa"),
+                ),
+                xaxis=dict(showgrid=False, tickfont=dict(size=10, color="#71717a")),
+                yaxis=dict(
+                    showgrid=True,
+                    gridcolor="#27272a",
+                    tickfont=dict(size=10, color="#71717a"),
+                ),
+                barmode="stack",
+                bargap=0.3,
+            )
+            st.plotly_chart(fig_states, use_container_width=True, theme=None)
+
+        by_theme = funnel["by_theme"].copy()
+        by_theme["分析率"] = by_theme["to_analysis"] / by_theme["tickers"] * 100
+        by_theme["シグナル率"] = (
+            by_theme["to_signal"] / by_theme["to_analysis"].where(by_theme["to_analysis"] > 0)
+            * 100
+        )
+        by_theme["約定率"] = (
+            by_theme["to_trade"] / by_theme["to_signal"].where(by_theme["to_signal"] > 0)
+            * 100
+        )
+        st.dataframe(
+            by_theme[
+                ["theme", "tickers", "to_analysis", "to_signal", "to_trade",
+                 "分析率", "シグナル率", "約定率"]
+            ].rename(
+                columns={
+                    "theme": "テーマ",
+                    "tickers": "銘柄×日",
+                    "to_analysis": "分析以上",
+                    "to_signal": "シグナル以上",
+                    "to_trade": "売買",
+                }
+            ),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "分析率": st.column_config.NumberColumn(format="%.0f%%"),
+                "シグナル率": st.column_config.NumberColumn(format="%.0f%%"),
+                "約定率": st.column_config.NumberColumn(format="%.0f%%"),
+            },
+        )
+
+
 # ============================================================
 # ニュース・分析活用（expander）
 # ============================================================
@@ -0,0 +1,143 @@
+"""Search — ニュース・AI分析・シグナル理由の全文検索
+
+Design: Focused cards — each card = ONE purpose.
+NAV: Query + filters
+ROW 1: Ranked results (highlighted snippets)
+"""
+
+import logging
+from datetime import date
+
+import dashboard_data as _dm
+import streamlit as st
+
+from components.shared import (
+    P,
+    TEXT_MUTED,
+    WARN,
+    card_title,
+    esc_md,
+    render_pill,
+)
+
+logger = logging.getLogger(__name__)
+
+# 種別 → (表示名, 色)
+KIND_LABELS = {
+    "news": ("ニュース", TEXT_MUTED),
+    "analysis": ("AI分析", P),
+    "signal": ("シグナル理由", WARN),
+}
+
+# 一致箇所の目印（HTML・Markdown のエスケープ後に <mark> へ置き換える）
+_MARK = ("\x02", "\x03")
+
+MAX_RESULTS = 100
+
+
+def _highlight(text: str) -> str:
+    escaped = esc_md(text)
+    return escaped.replace(_MARK[0], "<mark>").replace(_MARK[1], "</mark>")
+
+
+st.title("全文検索")
+st.caption("ニュース本文・AI分析サマリー・シグナル理由を横断検索")
+
+tickers_df = _dm.get_timeline_tickers()
+phase_start = date.fromisoformat(_dm.PHASE3_START)
+latest = _dm.get_data_latest_dates().get("latest") or date.today().isoformat()
+latest_d = max(date.fromisoformat(latest), phase_start)
+
+
+# ============================================================
+# NAV: 検索語・フィルタ
+# ============================================================
+
+with st.container(border=True):
+    query = st.text_input(
+        "検索語",
+        value=st.query_params.get("q", ""),
+        placeholder="例: 決算 見送り（空白区切りはすべて含む）",
+    )
+    f1, f2, f3 = st.columns([2, 1.2, 2])
+    with f1:
+        kinds = st.multiselect(
+            "対象",
+            list(KIND_LABELS),
+            default=list(KIND_LABELS),
+            format_func=lambda k: KIND_LABELS[k][0],
+        )
+    with f2:
+        ticker = st.selectbox(
+            "銘柄",
+            ["(すべて)"] + tickers_df["ticker"].tolist(),
+        )
+    with f3:
+        period = st.date_input(
+            "期間",
+            value=(phase_start, latest_d),
+            format="YYYY-MM-DD",
+        )
+    if query != st.query_params.get("q", ""):
+        st.query_params["q"] = query
+
+if isinstance(period, (tuple, list)) and len(period) == 2:
+    start_d, end_d = period
+else:
+    start_d = period[0] if isinstance(period, (tuple, list)) else period
+    end_d = latest_d
+
+
+# ============================================================
+# ROW 1: 検索結果
+# ============================================================
+
+if not query.strip():
+    st.info("検索語を入力してください。")
+    st.stop()
+
+if not kinds:
+    st.info("検索対象を1つ以上選択してください。")
+    st.stop()
+
+results = _dm.search_text(
+    query,
+    kinds=kinds,
+    ticker=None if ticker == "(すべて)" else ticker,
+    start_date=start_d.isoformat(),
+    end_date=end_d.isoformat(),
+    limit=MAX_RESULTS,
+    mark=_MARK,
+)
+
+with st.container(border=True):
+    card_title(
+        "検索結果",
+        color=P,
+        subtitle=(
+            f"{len(results)}件以上" if len(results) >= MAX_RESULTS else f"{len(results)}件"
+        ),
+    )
+
+    if results.empty:
+        st.caption("一致する記録はありません。")
+    else:
+        for i, (_, r) in enumerate(results.iterrows()):
+            if i > 0:
+                st.divider()
+            label, color = KIND_LABELS.get(r["kind"], (r["kind"], TEXT_MUTED))
+            tickers = esc_md(r["tickers"])
+            st.markdown(
+                f"{render_pill(label, color)} "
+                f"<span style='color:{TEXT_MUTED};font-size:0.8rem'>"
+                f"{esc_md(r['timestamp'][:16])}  {tickers}</span><br>"
+                f"<b>{_highlight(r['title'])}</b><br>"
+                f"<span style='font-size:0.88rem'>{_highlight(r['snippet'])}</span>",
+                unsafe_allow_html=True,
+            )
+            st.page_link(
+                "pages/date_detail.py",
+                label="この日の詳細を開く",
+                icon="📅",
+                query_params={"date": r["date"]},
+            )
@@ -0,0 +1,227 @@
+"""Ticker Timeline — 銘柄別タイムライン（全期間）
+
+Design: Focused cards — each card = ONE purpose.
+NAV: Ticker / period selection
+ROW 1: Event counts
+ROW 2: Timeline (grouped by date, paged newest first)
+Expander: Export
+"""
+
+import logging
+from datetime import date
+
+import dashboard_data as _dm
+import pandas as pd
+import streamlit as st
+
+from components.shared import (
+    INFO,
+    L,
+    P,
+    TEXT_MUTED,
+    W,
+    WARN,
+    WEEKDAY_JP,
+    card_title,
+    esc_md,
+    export_buttons,
+    render_pill,
+)
+
+logger = logging.getLogger(__name__)
+
+# 種別 → (表示名, 色)
+KIND_LABELS = {
+    "news": ("ニュース", TEXT_MUTED),
+    "analysis": ("AI分析", P),
+    "signal": ("シグナル", WARN),
+    "tracking": ("追跡", INFO),
+    "trade_entry": ("エントリー", W),
+    "trade_exit": ("決済", L),
+}
+
+# 1日あたり個別表示するニュースの上限（超過分は件数のみ）
+NEWS_PER_DAY = 5
+
+
+def _as_date(s: str | None, fallback: date) -> date:
+    if not s:
+        return fallback
+    try:
+        return date.fromisoformat(s)
+    except Exception:
+        return fallback
+
+
+def _fmt_event(row) -> str:
+    """タイムライン1行分の説明文（title / status はエスケープ済みで埋め込む）。"""
+    kind = row["kind"]
+    title = esc_md(row["title"])
+    status = esc_md(row["status"])
+    score, value = row["score"], row["value"]
+    if kind == "news":
+        text = f"{title}  ({status})" if status else title
+        if pd.notna(score):
+            text += f"  感情 {float(score):+.2f}"
+        return text
+    if kind == "analysis":
+        head = f"{status} / スコア {float(score):.0f}" if pd.notna(score) else status
+        return f"{head} — {title}" if title else head
+    if kind == "signal":
+        price = f" @ ${float(value):.2f}" if pd.notna(value) else ""
+        return f"{title}{price}  [{status}]"
+    if kind == "tracking":
+        ret = f"  {float(value):+.1f}%" if pd.notna(value) else ""
+        return f"{title} → {status}{ret}"
+    if kind == "trade_exit":
+        pnl = f"  ${float(value):+,.0f}" if pd.notna(value) else ""
+        pct = f" ({float(score):+.1f}%)" if pd.notna(score) else ""
+        return f"{title}{pnl}{pct}"
+    return f"{title}  [{status}]" if status else title
+
+
+tickers_df = _dm.get_timeline_tickers()
+
+st.title("銘柄タイムライン")
+st.caption("1銘柄のニュース→分析→シグナル→取引→追跡を全期間で時系列表示")
+
+if tickers_df.empty:
+    st.info("タイムラインを表示できる銘柄がありません。")
+    st.stop()
+
+tickers = tickers_df["ticker"].tolist()
+event_counts = dict(zip(tickers, tickers_df["events"].astype(int)))
+query_ticker = st.query_params.get("ticker")
+if query_ticker not in tickers:
+    query_ticker = tickers[0]
+
+latest = _as_date(str(tickers_df["last_ts"].max())[:10], date.today())
+phase_start = date.fromisoformat(_dm.PHASE3_START)
+
+
+# ============================================================
+# NAV: 銘柄・期間
+# ============================================================
+
+with st.container(border=True):
+    nav1, nav2 = st.columns([1.2, 2.5])
+    with nav1:
+        ticker = st.selectbox(
+            "銘柄",
+            tickers,
+            index=tickers.index(query_ticker),
+            format_func=lambda t: f"{t} ({event_counts[t]}件)",
+        )
+    with nav2:
+        period = st.date_input(
+            "期間",
+            value=(phase_start, max(latest, phase_start)),
+            format="YYYY-MM-DD",
+        )
+    if ticker != query_ticker:
+        st.query_params["ticker"] = ticker
+        st.rerun()
+
+if isinstance(period, (tuple, list)) and len(period) == 2:
+    start_d, end_d = period
+else:
+    start_d = period[0] if isinstance(period, (tuple, list)) else period
+    end_d = latest
+
+counts = _dm.get_ticker_event_counts(ticker, start_d.isoformat(), end_d.isoformat())
+total_events = sum(counts.values())
+pages = max(1, -(-total_events // _dm.TICKER_TIMELINE_PAGE_SIZE))
+
+
+# ============================================================
+# ROW 1: 件数サマリー
+# ============================================================
+
+with st.container(border=True):
+    card_title(
+        ticker,
+        color=P,
+        subtitle=f"{start_d.isoformat()} 〜 {end_d.isoformat()}",
+    )
+    cols = st.columns(len(KIND_LABELS))
+    for col, (kind, (label, _)) in zip(cols, KIND_LABELS.items()):
+        col.metric(label, f"{int(counts.get(kind, 0))}件")
+
+
+# ============================================================
+# ROW 2: タイムライン（日付ごと）
+# ============================================================
+
+with st.container(border=True):
+    page = 1
+    if pages > 1:
+        page = st.number_input(
+            f"ページ（新しい順・1ページ {_dm.TICKER_TIMELINE_PAGE_SIZE}件 / 全{pages}ページ）",
+            min_value=1, max_value=pages, value=1, step=1,
+        )
+    timeline = _dm.get_ticker_timeline(
+        ticker,
+        start_d.isoformat(),
+        end_d.isoformat(),
+        offset=(int(page) - 1) * _dm.TICKER_TIMELINE_PAGE_SIZE,
+    )
+    card_title(
+        "タイムライン",
+        color=W,
+        subtitle=f"{timeline['date'].nunique()}日",
+    )
+
+    if timeline.empty:
+        st.caption("この期間のイベントはありません。")
+    else:
+        for day, grp in reversed(list(timeline.groupby("date", sort=True))):
+            d = date.fromisoformat(day)
+            kinds = set(grp["kind"])
+            with st.expander(
+                f"{day} ({WEEKDAY_JP[d.weekday()]})  —  {len(grp)}件",
+                expanded=bool(kinds & {"signal", "trade_entry", "trade_exit"}),
+            ):
+                news = grp[grp["kind"] == "news"]
+                others = grp[grp["kind"] != "news"]
+                lines = []
+                for _, r in pd.concat([news.head(NEWS_PER_DAY), others]).sort_values(
+                    "timestamp", kind="stable"
+                ).iterrows():
+                    label, color = KIND_LABELS.get(r["kind"], (r["kind"], TEXT_MUTED))
+                    lines.append(
+                        f"`{r['timestamp'][11:16]}` {render_pill(label, color)} "
+                        f"{_fmt_event(r)}"
+                    )
+                st.markdown("  \n".join(lines), unsafe_allow_html=True)
+                if len(news) > NEWS_PER_DAY:
+                    st.caption(f"ほか ニュース {len(news) - NEWS_PER_DAY}件")
+                st.page_link(
+                    "pages/date_detail.py",
+                    label="この日の詳細を開く",
+                    icon="📅",
+                    query_params={"date": day},
+                )
+
+
+# ============================================================
+# エクスポート（expander）
+# ============================================================
+
+with st.expander("エクスポート", expanded=False):
+    st.caption("この銘柄・期間の行をテーブル単位で書き出します。")
+    for name, label in (
+        ("news", "ニュース"),
+        ("ai_analysis", "AI分析"),
+        ("signals", "シグナル"),
+        ("trades", "取引"),
+        ("signal_tracking", "シグナル追跡"),
+    ):
+        st.markdown(f"**{label}**")
+        export_buttons(
+            name,
+            f"{ticker}_{name}_{start_d.isoformat()}_{end_d.isoformat()}",
+            f"export_{ticker}_{name}",
+            ticker=ticker,
+            start_date=start_d.isoformat(),
+            end_date=end_d.isoformat(),
+        )
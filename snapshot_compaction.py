@@ -0,0 +1,171 @@
+"""
+portfolio_snapshots の圧縮（段階的保持）
+
+最新スナップショットから SNAPSHOT_RAW_RETENTION_DAYS 日より古い生データを
+portfolio_snapshots_daily の1日1行（OHLC + cash / equity の終値 + 件数 +
+ドローダウン用の (高値, 安値) の組）に畳み、元の行を削除する。
+読み出し側（dashboard_data）は両方の段を透過的に読み、最大ドローダウンは
+生データで計算した場合と同じ値になる。
+
+基準日は壁時計ではなくDB内の最新スナップショットなので、同じDBに対しては
+何度実行しても同じ結果になる（sync_db.sh の差分チェックを壊さない）。
+すでに日次行がある日に後から生データが届いた場合は、日次行の後ろにつなげて畳み直す。
+
+CLI:
+    python snapshot_compaction.py data/ai_investor.db
+    python snapshot_compaction.py /tmp/gcp_ai_investor_sync.db --retention-days 30 --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import dashboard_data as _dm
+
+logger = logging.getLogger(__name__)
+
+DAILY_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {_dm.SNAPSHOT_DAILY_TABLE} (
+    date TEXT PRIMARY KEY,
+    open REAL, high REAL, low REAL, close REAL,
+    cash REAL, equity REAL,
+    samples INTEGER,
+    first_ts TEXT, last_ts TEXT,
+    dd_pairs TEXT
+)
+"""
+
+
+def _summarize_day(rows: pd.DataFrame, existing: dict | None) -> dict:
+    """1日分の生データ（時系列順）を日次行にする。existing があれば後ろにつなげる。"""
+    values = rows["total_value"].to_numpy(dtype=float)
+    pairs = _dm.drawdown_pairs(values)
+    row = {
+        "open": float(values[0]),
+        "high": float(values.max()),
+        "low": float(values.min()),
+        "close": float(values[-1]),
+        "cash": rows["cash_balance"].iloc[-1],
+        "equity": rows["equity_value"].iloc[-1],
+        "samples": len(rows),
+        "first_ts": rows["timestamp"].iloc[0],
+        "last_ts": rows["timestamp"].iloc[-1],
+    }
+    if existing is not None:
+        before = np.asarray(json.loads(existing["dd_pairs"]), dtype=float).reshape(-1, 2)
+        pairs = _dm.merge_drawdown_pairs(np.vstack([before, pairs]))
+        row.update(
+            {
+                "open": existing["open"],
+                "high": max(existing["high"], row["high"]),
+                "low": min(existing["low"], row["low"]),
+                "samples": existing["samples"] + row["samples"],
+                "first_ts": existing["first_ts"],
+            }
+        )
+    row["dd_pairs"] = json.dumps(pairs.tolist())
+    return row
+
+
+def compact_snapshots(
+    db_path: str | Path,
+    retention_days: int = _dm.SNAPSHOT_RAW_RETENTION_DAYS,
+    dry_run: bool = False,
+) -> dict:
+    """古い生スナップショットを日次行に畳む。
+
+    Returns:
+        dict with keys: cutoff（この日付より前を圧縮）, days, rows_compacted,
+        rows_kept（生のまま残った行数）, skipped_days（既存の日次行より前の時刻を含む日）
+    """
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        latest = conn.execute("SELECT MAX(timestamp) FROM portfolio_snapshots").fetchone()[0]
+        if not latest:
+            return {"cutoff": None, "days": 0, "rows_compacted": 0, "rows_kept": 0, "skipped_days": []}
+        cutoff = (date.fromisoformat(latest[:10]) - timedelta(days=retention_days)).isoformat()
+
+        raw = pd.read_sql_query(
+            "SELECT id, timestamp, total_value, cash_balance, equity_value "
+            "FROM portfolio_snapshots WHERE date(timestamp) < ? AND total_value IS NOT NULL "
+            "ORDER BY timestamp, id",
+            conn,
+            params=[cutoff],
+        )
+        if not dry_run:
+            conn.execute(DAILY_SCHEMA)
+        existing = {}
+        if _dm._has_table(conn, _dm.SNAPSHOT_DAILY_TABLE):
+            existing = {
+                r["date"]: dict(r)
+                for r in conn.execute(f"SELECT * FROM {_dm.SNAPSHOT_DAILY_TABLE}")
+            }
+
+        rows, ids, skipped = [], [], []
+        for day, group in raw.groupby(raw["timestamp"].str[:10], sort=True):
+            prev = existing.get(day)
+            if prev is not None and group["timestamp"].iloc[0] < prev["last_ts"]:
+                # 畳んだ後の時刻より前の行が届いた: 順序が保証できないので生のまま残す
+                logger.warning(f"snapshot compaction: {day} は既存の日次行より前の行を含むためスキップ")
+                skipped.append(day)
+                continue
+            rows.append({"date": day, **_summarize_day(group, prev)})
+            ids.extend(group["id"].tolist())
+
+        if rows and not dry_run:
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {_dm.SNAPSHOT_DAILY_TABLE} "
+                    "(date, open, high, low, close, cash, equity, samples, first_ts, last_ts, dd_pairs) "
+                    "VALUES (:date, :open, :high, :low, :close, :cash, :equity, :samples, "
+                    ":first_ts, :last_ts, :dd_pairs)",
+                    rows,
+                )
+                conn.executemany(
+                    "DELETE FROM portfolio_snapshots WHERE id = ?", [(i,) for i in ids]
+                )
+        kept = conn.execute("SELECT COUNT(*) FROM portfolio_snapshots").fetchone()[0]
+        return {
+            "cutoff": cutoff,
+            "days": len(rows),
+            "rows_compacted": len(ids),
+            "rows_kept": kept if not dry_run else kept - len(ids),
+            "skipped_days": skipped,
+        }
+    finally:
+        conn.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="portfolio_snapshots の古い生データを日次行に圧縮")
+    parser.add_argument("db", type=Path, help="対象のSQLite（同期直後のレプリカ）")
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=_dm.SNAPSHOT_RAW_RETENTION_DAYS,
+        help="生データを残す日数（最新スナップショット基準）",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに件数だけ表示")
+    args = parser.parse_args(argv)
+
+    result = compact_snapshots(args.db, args.retention_days, args.dry_run)
+    print(
+        f"snapshots: cutoff {result['cutoff']} / {result['days']} days, "
+        f"{result['rows_compacted']} rows compacted, {result['rows_kept']} raw rows kept"
+        + (" (dry run)" if args.dry_run else "")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
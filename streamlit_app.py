@@ -4,8 +4,10 @@ import logging
 from datetime import datetime
 
 import dashboard_data as _dm
+import external_calls as _ext
 import streamlit as st
 
+from components.shared import begin_full_run, end_full_run, status_dot_html, timings_enabled
 from components.styles import inject_css
 
 logger = logging.getLogger(__name__)
@@ -18,6 +20,8 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+begin_full_run()
+
 # 最小限のCSS注入
 inject_css()
 
@@ -25,10 +29,12 @@ inject_css()
 home_page = st.Page("pages/home.py", title="ポートフォリオ", icon="📊", default=True)
 pipeline_page = st.Page("pages/pipeline.py", title="パイプライン", icon="⚙️")
 date_detail_page = st.Page("pages/date_detail.py", title="日付詳細", icon="📅")
+ticker_page = st.Page("pages/ticker.py", title="銘柄タイムライン", icon="🔎")
+search_page = st.Page("pages/search.py", title="全文検索", icon="🔍")
 reference_page = st.Page("pages/reference.py", title="システム仕様", icon="📋")
 
 nav = st.navigation(
-    [home_page, pipeline_page, date_detail_page, reference_page],
+    [home_page, pipeline_page, date_detail_page, ticker_page, search_page, reference_page],
     position="sidebar",
 )
 
@@ -69,10 +75,46 @@ with st.sidebar:
     else:
         st.info("実行記録なし")
 
+    # 外部API状態（サーキットブレーカー / キャッシュ鮮度）
+    state_labels = {
+        "closed": ("completed", "正常"),
+        "half_open": ("interrupted", "再試行中"),
+        "open": ("failed", "停止中"),
+    }
+    for h in _ext.provider_health():
+        dot, label = state_labels.get(h["state"], ("pending", h["state"]))
+        if h["state"] == "closed" and h["consecutive_failures"] > 0:
+            dot = "interrupted"
+        age = h["staleness_sec"]
+        if age is None:
+            age_txt = "未取得"
+        elif age < 120:
+            age_txt = f"{age:.0f}秒前"
+        else:
+            age_txt = f"{age / 60:.0f}分前"
+        st.markdown(
+            f'{status_dot_html(dot)} <span style="font-size:0.8rem">'
+            f'{h["label"]}</span> '
+            f'<span style="font-size:0.72rem;color:#71717a">'
+            f"{label} · 更新 {age_txt}</span>",
+            unsafe_allow_html=True,
+        )
+        if h["state"] != "closed" and h["last_error"]:
+            st.caption(h["last_error"][:100])
+
     st.divider()
 
     if st.button("データを再読込", use_container_width=True):
         st.cache_data.clear()
+        _ext.invalidate()
         st.rerun()
 
+    # 処理時間（カードごとの部分再実行との比較用）
+    st.toggle("処理時間を表示", key="show_timings")
+    perf_slot = st.empty()
+
 nav.run()
+
+full_ms = end_full_run()
+if timings_enabled():
+    perf_slot.caption(f"⏱ ページ全体: {full_ms:.0f} ms（最終の全体実行）")
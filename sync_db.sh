@@ -17,7 +17,7 @@ echo "=== AI Investor Dashboard DB Sync ==="
 echo "$(date '+%Y-%m-%d %H:%M:%S')"
 
 # 1. GCPからDBダウンロード
-echo "[1/4] Downloading DB from GCP..."
+echo "[1/5] Downloading DB from GCP..."
 gcloud compute scp \
     "${GCP_INSTANCE}:${GCP_DB_PATH}" \
     "$TMP_DB" \
@@ -25,8 +25,9 @@ gcloud compute scp \
     --project="$GCP_PROJECT" \
     --quiet
 
-# 2. VACUUM（WAL/SHMを統合＋コンパクト化）
-echo "[2/4] Vacuuming DB..."
+# 2. スナップショット圧縮（古い生データ → 日次OHLC）＋ VACUUM（WAL/SHMを統合＋コンパクト化）
+echo "[2/5] Compacting snapshots & vacuuming DB..."
+python3 "$SCRIPT_DIR/snapshot_compaction.py" "$TMP_DB"
 sqlite3 "$TMP_DB" "VACUUM;"
 
 # 3. 差分チェック＆コピー
@@ -34,18 +35,18 @@ if [ -f "$LOCAL_DB" ]; then
     OLD_HASH=$(md5 -q "$LOCAL_DB" 2>/dev/null || md5sum "$LOCAL_DB" | cut -d' ' -f1)
     NEW_HASH=$(md5 -q "$TMP_DB" 2>/dev/null || md5sum "$TMP_DB" | cut -d' ' -f1)
     if [ "$OLD_HASH" = "$NEW_HASH" ]; then
-        echo "[3/4] DB unchanged, skipping."
+        echo "[3/5] DB unchanged, skipping."
         rm -f "$TMP_DB"
         exit 0
     fi
 fi
 
-echo "[3/4] Copying updated DB..."
+echo "[3/5] Copying updated DB..."
 cp "$TMP_DB" "$LOCAL_DB"
 rm -f "$TMP_DB"
 
 # 4. Git commit & push
-echo "[4/4] Committing and pushing..."
+echo "[4/5] Committing and pushing..."
 cd "$SCRIPT_DIR"
 
 # 取引サマリを取得してコミットメッセージに含める
@@ -66,5 +67,11 @@ git commit -m "data: sync GCP DB — ${TRADE_SUMMARY}" || {
 }
 git push origin main
 
+# 5. date_detail の日付バンドルを事前計算（変わった日だけ。失敗しても同期は成功扱い）
+#    DBを開くと journal_mode が切り替わるため、コミットの後に実行する
+echo "[5/5] Precomputing day bundles..."
+AI_INVESTOR_DB_PATH="$LOCAL_DB" python3 "$SCRIPT_DIR/bundle_precompute.py" \
+    || echo "warning: bundle precompute failed (date_detail will build on demand)"
+
 echo "=== Sync complete ==="
 echo "Summary: $TRADE_SUMMARY"